@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The repository root holds the `shared` package this app has in common with core/
+_ROOT = str(Path(__file__).resolve().parents[2])
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
@@ -0,0 +1,166 @@
+"""
+Shared cache for external data-source lookups
+TTL per source, size-bounded LRU eviction and single-flight collapsing of
+concurrent identical lookups. Storage is pluggable: an in-process backend
+by default, or any Redis-compatible client
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+import asyncio
+import functools
+import json
+import time
+
+# Seconds each data source stays fresh
+DEFAULT_SOURCE_TTLS = {
+    "air_quality": 3600,
+    "healthcare": 86400,
+    "safety": 86400,
+    "cost_of_living": 3600,
+    "exchange_rates": 3600,
+    "regulatory": 86400
+}
+
+@dataclass
+class SourceStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0  # lookups that waited on an identical in-flight call
+
+class InMemoryBackend:
+    """
+    In-process LRU store with per-entry expiry
+    """
+    
+    def __init__(self, max_entries: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return False, None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+    
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisBackend:
+    """
+    Backend for any Redis-compatible async client (e.g. redis.asyncio.Redis)
+    Expiry uses native key TTLs; size bounds and LRU eviction are left to
+    the server's maxmemory policy (allkeys-lru)
+    """
+    
+    def __init__(self, client, prefix: str = "equinox:source:"):
+        self.client = client
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # tracked server-side (INFO stats evicted_keys)
+        self.expirations = 0
+    
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, json.loads(raw)
+    
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+class SourceCache:
+    """
+    Cache front shared by all agents
+    """
+    
+    def __init__(self, backend=None, ttls: Optional[Dict[str, float]] = None):
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.ttls = {**DEFAULT_SOURCE_TTLS, **(ttls or {})}
+        self.sources: Dict[str, SourceStats] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    async def get_or_fetch(self, source: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for (source, key), calling fetch on a miss
+        Concurrent misses for the same key share a single fetch
+        """
+        stats = self.sources.setdefault(source, SourceStats())
+        cache_key = f"{source}:{key}"
+        
+        found, value = await self.backend.get(cache_key)
+        if found:
+            stats.hits += 1
+            return value
+        
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            stats.coalesced += 1
+            return await asyncio.shield(pending)
+        
+        stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            value = await fetch()
+            await self.backend.set(cache_key, value, self.ttls.get(source, 3600))
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters get the exception; don't also log it as never retrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[cache_key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per source plus the backend's own lookup and eviction counts"""
+        return {
+            "sources": {source: asdict(stats) for source, stats in self.sources.items()},
+            "hits": self.backend.hits,
+            "misses": self.backend.misses,
+            "evictions": self.backend.evictions,
+            "expirations": self.backend.expirations
+        }
+
+def cached(source: str):
+    """
+    Decorator for agent lookup coroutines: serves results from the agent's
+    `source_cache`, keyed by the call arguments
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args):
+            key = ":".join(str(arg) for arg in args)
+            return await self.source_cache.get_or_fetch(source, key, lambda: func(self, *args))
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+"""
+Per-data-source concurrency limits for agent lookups
+Agents fan out every per-location lookup at once; these limits cap how many
+requests are in flight against any single external source
+"""
+
+from typing import Dict, Optional
+import asyncio
+import functools
+import weakref
+
+# Maximum in-flight requests per external data source
+DEFAULT_SOURCE_LIMITS = {
+    "air_quality": 10,
+    "healthcare": 10,
+    "safety": 10,
+    "cost_of_living": 10,
+    "exchange_rates": 20,
+    "tax_engine": 10,
+    "regulatory": 5
+}
+
+class SourceLimiter:
+    """
+    Holds one semaphore per data source, shared by every agent using it
+    """
+    
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 10):
+        self.limits = {**DEFAULT_SOURCE_LIMITS, **(limits or {})}
+        self.default_limit = default_limit
+        # asyncio primitives belong to one event loop, so keep a set per loop
+        self._semaphores = weakref.WeakKeyDictionary()
+    
+    def limit_for(self, source: str) -> int:
+        return self.limits.get(source, self.default_limit)
+    
+    def slot(self, source: str) -> asyncio.Semaphore:
+        """Semaphore guarding requests to the given source"""
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.setdefault(loop, {})
+        if source not in semaphores:
+            semaphores[source] = asyncio.Semaphore(self.limit_for(source))
+        return semaphores[source]
+
+def limited(source: str):
+    """
+    Decorator for agent lookup coroutines: waits for a free slot on the
+    agent's `source_limiter` before calling the data source
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            async with self.source_limiter.slot(source):
+                return await func(self, *args, **kwargs)
+        return wrapper
+    return decorator
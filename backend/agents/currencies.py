@@ -0,0 +1,20 @@
+"""
+Currency of a location, for converting with the shared exchange-rate
+snapshot (shared/fx.py)
+
+Locations are mapped to currencies through the treaty store's country
+resolution and COUNTRY_CURRENCIES
+"""
+
+from .treaties import get_treaty_store
+
+# ISO country code -> currency, for the countries the treaty store resolves
+COUNTRY_CURRENCIES = {
+    "US": "USD", "GB": "GBP", "PT": "EUR", "ES": "EUR", "DE": "EUR", "FR": "EUR", "NL": "EUR", "IE": "EUR",
+    "CH": "CHF", "SG": "SGD", "AE": "AED", "IN": "INR", "CA": "CAD", "AU": "AUD", "JP": "JPY", "MX": "MXN",
+    "BR": "BRL", "TH": "THB"
+}
+
+def currency_for(location: str, default: str) -> str:
+    """Currency of a location ('City, Country', a country or a known city), default if unresolved"""
+    return COUNTRY_CURRENCIES.get(get_treaty_store().country_code(location), default)
@@ -0,0 +1,112 @@
+"""
+Pooled HTTP client for external data sources
+One keep-alive connection pool shared by every agent, with a cap on
+connections per host and explicit timeouts. Sources without a configured
+base URL are not fetched over HTTP; their agents keep the built-in mock data
+"""
+
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import asyncio
+import os
+
+import httpx
+
+from shared.instrumentation import span
+
+from .concurrency import DEFAULT_SOURCE_LIMITS
+from .instrumentation import EXTERNAL_REQUESTS
+
+# Base URL serving every source under /<source>/..., and per-source overrides
+DATA_SOURCE_URL_ENV = "DATA_SOURCE_URL"
+SOURCE_URL_ENV_PREFIX = "DATA_SOURCE_URL_"
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_PER_HOST_LIMIT = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+
+# Simulated round trip of the built-in mock data (seconds); read on every call
+MOCK_LATENCY = float(os.getenv("MOCK_SOURCE_LATENCY", "0.1"))
+
+async def simulate_latency():
+    """Stand-in for a data-source round trip where an agent serves mock data"""
+    await asyncio.sleep(MOCK_LATENCY)
+
+class DataSourceClient:
+    """
+    Fetches JSON from data sources through one shared httpx.AsyncClient
+    Create it once per process (e.g. in the app lifespan) and close it with
+    `aclose` on shutdown; the pool belongs to the event loop that first uses it
+    """
+
+    def __init__(self, base_urls: Optional[Dict[str, str]] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE,
+                 per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                 timeout: httpx.Timeout = DEFAULT_TIMEOUT):
+        self.base_urls = {source: url.rstrip("/") for source, url in (base_urls or {}).items()}
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY
+        )
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.requests = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def from_env(cls, sources=None, **kwargs) -> "DataSourceClient":
+        """
+        Base URLs from DATA_SOURCE_URL (all sources) and
+        DATA_SOURCE_URL_<SOURCE> (one source, e.g. DATA_SOURCE_URL_AIR_QUALITY)
+        """
+        base_url = os.getenv(DATA_SOURCE_URL_ENV)
+        base_urls = {}
+        for source in sources or DEFAULT_SOURCE_LIMITS:
+            url = os.getenv(SOURCE_URL_ENV_PREFIX + source.upper(), base_url and f"{base_url.rstrip('/')}/{source}")
+            if url:
+                base_urls[source] = url
+        return cls(base_urls, **kwargs)
+
+    def configured(self, source: str) -> bool:
+        return source in self.base_urls
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared pool, opened on first request"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_slots[host]
+
+    async def get_json(self, source: str, path: str = "", params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET <source base URL>/<path>; raises httpx.HTTPError on failure"""
+        url = f"{self.base_urls[source]}/{path.lstrip('/')}" if path else self.base_urls[source]
+        with span("external.request", source=source):
+            try:
+                async with self._host_slot(url):
+                    self.requests += 1
+                    response = await self._send(url, params)
+                response.raise_for_status()
+            except httpx.HTTPError:
+                EXTERNAL_REQUESTS.labels(source, "error").inc()
+                raise
+            EXTERNAL_REQUESTS.labels(source, "ok").inc()
+            return response.json()
+
+    async def _send(self, url: str, params: Optional[Dict[str, Any]]) -> httpx.Response:
+        return await self.client.get(url, params=params)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
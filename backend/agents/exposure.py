@@ -0,0 +1,51 @@
+"""
+Hourly air quality and safety history per city, for the Actuary
+
+The store itself (memory-mapped hourly series and their monthly
+aggregates) is shared.exposure, the same one the core app uses. Here
+histories are keyed by the normalized city name
+
+Append hourly rows from a CSV with an hour column (ISO timestamps, UTC) and
+any of the metric columns:
+    python -m agents.exposure append "Lisbon" lisbon_hourly.csv
+"""
+
+from typing import Optional
+from pathlib import Path
+import os
+import sys
+
+from shared import exposure
+from shared.exposure import METRICS, CityHistory, hour_label, to_hour  # noqa: F401  used through this module
+
+from .treaties import normalize_name
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+EXPOSURE_DIR = Path(os.getenv("EXPOSURE_DB_DIR", DATA_DIR / "exposure"))
+
+def city_key(city: str) -> str:
+    """Directory name for a city: 'Lisbon, Portugal' and 'lisbon' share one"""
+    key = "-".join(normalize_name(city.split(",")[0]).split())
+    if not key:
+        raise ValueError(f"Not a city name: {city!r}")
+    return key
+
+class ExposureStore(exposure.ExposureStore):
+    def city_key(self, city: str) -> str:
+        return city_key(city)
+
+_store: Optional[ExposureStore] = None
+
+def get_exposure_store() -> ExposureStore:
+    """Shared store; cities without a history fall back to point-in-time data"""
+    global _store
+    if _store is None:
+        _store = ExposureStore(EXPOSURE_DIR)
+    return _store
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "append":
+        print("usage: python -m agents.exposure append CITY CSV")
+        sys.exit(1)
+    history = get_exposure_store().append_csv(sys.argv[2], Path(sys.argv[3]))
+    print(f"{history.name}: {history.hours} hours from {hour_label(history.start_hour)} to {hour_label(history.end_hour)}")
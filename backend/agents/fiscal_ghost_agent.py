@@ -3,47 +3,80 @@ The Fiscal Ghost (Expense Agent)
 Replays specific spending habits in new city's local prices
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
 
+from shared import fx
+
+from .cache import SourceCache, cached
+from .concurrency import SourceLimiter, limited
+from .currencies import currency_for
+from .data_sources import DataSourceClient, simulate_latency
+from .instrumentation import instrumented
+from .nexus_agent import NexusAgent
+from .plan import SimulationPlan
+from . import spending
+
+@instrumented("fiscal_ghost")
 class FiscalGhostAgent:
     """
     Specializes in expense analysis and cost-of-living simulation
     """
     
-    def __init__(self):
+    def __init__(self, source_limiter: Optional[SourceLimiter] = None, source_cache: Optional[SourceCache] = None,
+                 data_sources: Optional[DataSourceClient] = None):
         self.cost_api_key = "your_cost_api_key"
         self.exchange_api_key = "your_exchange_api_key"
+        self.source_limiter = source_limiter or SourceLimiter()
+        self.source_cache = source_cache or SourceCache()
+        self.data_sources = data_sources or DataSourceClient.from_env()
     
-    async def analyze_expenses(self, context) -> Dict[str, Any]:
+    async def analyze_expenses(self, context, plan: Optional[SimulationPlan] = None) -> Dict[str, Any]:
         """
         Analyze and replay spending patterns in target locations
         """
-        results = {}
+        # Regulatory figures and setup costs are shared with Nexus through the request's plan
+        plan = plan or SimulationPlan(context, NexusAgent(self.source_limiter, self.source_cache, self.data_sources))
         
         # Extract spending patterns from financial data
         spending_profile = self._extract_spending_profile(context.financial_data)
         
-        for location in context.target_locations:
-            # Get local pricing data
-            local_prices = await self._get_local_prices(location)
-            exchange_rate = await self._get_exchange_rate(context.currency, location)
-            
-            # Replay spending habits with local prices
-            projected_expenses = self._replay_expenses(spending_profile, local_prices, exchange_rate)
-            
-            # Calculate hidden costs
-            hidden_costs = self._calculate_hidden_costs(location, context.salary)
-            
-            results[location] = {
-                "monthly_expenses": projected_expenses,
-                "hidden_costs": hidden_costs,
-                "total_cost_increase": self._calculate_cost_delta(projected_expenses, spending_profile),
-                "purchasing_power": self._calculate_purchasing_power(context.salary, projected_expenses, exchange_rate),
-                "lifestyle_maintenance_cost": self._calculate_lifestyle_cost(spending_profile, local_prices)
-            }
+        # Prices, exchange rates and regulatory figures for all locations are fetched concurrently
+        locations = context.target_locations
+        local_prices, (exchange_rates, fx_version), regulatory, setup = await asyncio.gather(
+            asyncio.gather(*(self._get_local_prices(location) for location in locations)),
+            self._get_exchange_rates(context.currency, locations),
+            asyncio.gather(*(plan.regulatory(location) for location in locations)),
+            asyncio.gather(*(plan.setup_costs(location) for location in locations))
+        )
         
-        return results
+        # Replay spending habits against every location's prices in one pass
+        projected = spending.replayed_dicts(spending.replay(spending_profile, local_prices, exchange_rates))
+        
+        return {
+            location: self._analyze_location(
+                context, spending_profile, prices, rate, fx_version, expenses, regulatory_reqs, setup_costs
+            )
+            for location, prices, rate, expenses, regulatory_reqs, setup_costs
+            in zip(locations, local_prices, exchange_rates, projected, regulatory, setup)
+        }
+    
+    def _analyze_location(self, context, spending_profile: Dict[str, float], local_prices: Dict,
+                          exchange_rate: float, fx_version: str, projected_expenses: Dict[str, float],
+                          regulatory_reqs: Dict, setup_costs: Dict[str, float]) -> Dict[str, Any]:
+        """Analyze a single location"""
+        # Calculate hidden costs
+        hidden_costs = self._calculate_hidden_costs(context.salary, regulatory_reqs, setup_costs)
+        
+        return {
+            "exchange_rate": exchange_rate,
+            "fx_version": fx_version,
+            "monthly_expenses": projected_expenses,
+            "hidden_costs": hidden_costs,
+            "total_cost_increase": self._calculate_cost_delta(projected_expenses, spending_profile),
+            "purchasing_power": self._calculate_purchasing_power(context.salary, projected_expenses, exchange_rate),
+            "lifestyle_maintenance_cost": self._calculate_lifestyle_cost(spending_profile, local_prices)
+        }
     
     def _extract_spending_profile(self, financial_data: Dict) -> Dict[str, float]:
         """Extract spending patterns from bank data"""
@@ -62,12 +95,20 @@ class FiscalGhostAgent:
                 "subscriptions": 75
             }
         
-        # Process actual bank data (Plaid integration would go here)
+        # Full transaction history (Plaid /transactions/get or /transactions/sync),
+        # streamed through in chunks into monthly averages
+        if "transactions" in financial_data:
+            return spending.profile_from_transactions(financial_data["transactions"])
+        
         return financial_data.get("spending_categories", {})
     
+    @cached("cost_of_living")
+    @limited("cost_of_living")
     async def _get_local_prices(self, location: str) -> Dict[str, float]:
         """Fetch local pricing data from cost-of-living APIs"""
-        await asyncio.sleep(0.1)  # Simulate API call
+        if self.data_sources.configured("cost_of_living"):
+            return await self.data_sources.get_json("cost_of_living", location)
+        await simulate_latency()  # Simulate API call
         
         # Mock data - replace with Zyla Cost of Living API
         return {
@@ -81,42 +122,44 @@ class FiscalGhostAgent:
             "utilities_index": 1.3
         }
     
+    async def _get_exchange_rates(self, from_currency: str, locations: List[str]) -> Tuple[List[float], str]:
+        """
+        Rates from the user's currency to each location's, with the version
+        they came from: live quotes when the source is configured, otherwise
+        one gather from the current rates snapshot
+        """
+        if self.data_sources.configured("exchange_rates"):
+            rates = await asyncio.gather(*(self._get_exchange_rate(from_currency, location) for location in locations))
+            return list(rates), "live"
+        snapshot = fx.current()
+        currencies = [currency_for(location, from_currency) for location in locations]
+        return snapshot.rates(from_currency, currencies).tolist(), snapshot.version
+    
+    @cached("exchange_rates")
+    @limited("exchange_rates")
     async def _get_exchange_rate(self, from_currency: str, to_location: str) -> float:
         """Get current exchange rate"""
-        await asyncio.sleep(0.1)  # Simulate API call
-        return 1.0  # Mock rate - replace with ExchangeRate-API
+        if self.data_sources.configured("exchange_rates"):
+            quote = await self.data_sources.get_json("exchange_rates", to_location, {"base": from_currency})
+            return quote["rate"]
+        return fx.current().rate(from_currency, currency_for(to_location, from_currency))
     
     def _replay_expenses(self, spending_profile: Dict, local_prices: Dict, exchange_rate: float) -> Dict[str, float]:
         """Replay user's specific spending habits with local prices"""
-        projected = {}
-        
-        # Apply local price indices to spending categories
-        projected["housing"] = spending_profile.get("housing", 0) * local_prices.get("housing_index", 1.0)
-        projected["food_dining"] = spending_profile.get("food_dining", 0) * local_prices.get("food_index", 1.0)
-        projected["transportation"] = spending_profile.get("transportation", 0) * local_prices.get("transportation_index", 1.0)
-        projected["entertainment"] = spending_profile.get("entertainment", 0) * local_prices.get("entertainment_index", 1.0)
-        projected["healthcare"] = spending_profile.get("healthcare", 0) * local_prices.get("healthcare_index", 1.0)
-        
-        # Specific brand/service tracking
-        projected["coffee"] = (spending_profile.get("coffee", 0) / 3.50) * local_prices.get("coffee_price", 3.50)
-        projected["gym"] = local_prices.get("gym_membership", 50)
-        
-        # Apply exchange rate
-        for category in projected:
-            projected[category] *= exchange_rate
-        
-        return projected
+        # Price indices scale their category, coffee is replayed per cup and the
+        # gym at the local membership price; see spending.MAPPING
+        return spending.replayed_dicts(spending.replay(spending_profile, [local_prices], [exchange_rate]))[0]
     
-    def _calculate_hidden_costs(self, location: str, salary: float) -> Dict[str, float]:
+    def _calculate_hidden_costs(self, salary: float, regulatory_reqs: Dict, setup_costs: Dict[str, float]) -> Dict[str, float]:
         """Calculate bureaucracy and compliance costs"""
         return {
-            "visa_fees": 500,
+            "visa_fees": setup_costs["visa_and_permits"],
             "apostille_costs": 200,
-            "translation_fees": 300,
+            "translation_fees": setup_costs["document_translation"],
             "health_insurance_surcharge": salary * 0.02,  # 2% surcharge for foreigners
-            "social_security_contributions": salary * 0.15,  # EU/LatAm social solidarity
-            "banking_setup": 150,
-            "legal_consultation": 800
+            "social_security_contributions": salary * regulatory_reqs["social_security"]["contribution_rate"],
+            "banking_setup": setup_costs["banking_setup"],
+            "legal_consultation": setup_costs["legal_consultation"]
         }
     
     def _calculate_cost_delta(self, projected: Dict, current: Dict) -> float:
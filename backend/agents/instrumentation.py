@@ -0,0 +1,32 @@
+"""
+Agent and data-source metrics, on top of shared.instrumentation
+
+Every agent and orchestrator method is timed through `instrumented`, each
+call a span of the request's trace
+"""
+
+from typing import Callable
+import inspect
+
+from shared.instrumentation import Counter, Histogram, timed
+
+CALL_SECONDS = Histogram("agent_call_seconds", "Duration of agent and orchestrator methods", ("component", "method"))
+CALL_ERRORS = Counter("agent_call_errors", "Agent and orchestrator methods that raised", ("component", "method"))
+EXTERNAL_REQUESTS = Counter("external_requests", "HTTP requests to external data sources", ("source", "outcome"))
+
+def _timed(component: str, method: str, func: Callable) -> Callable:
+    return timed(f"{component}.{method}", func, CALL_SECONDS.labels(component, method), CALL_ERRORS.labels(component, method))
+
+def instrumented(component: str):
+    """
+    Class decorator timing every method defined on the class (duration
+    histogram, error counter and a span per call); async generators and
+    dunder methods are left alone
+    """
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("__") or not inspect.isfunction(value) or inspect.isasyncgenfunction(value):
+                continue
+            setattr(cls, attr, _timed(component, attr, value))
+        return cls
+    return decorator
@@ -1,107 +1,137 @@
 """
 The Nexus (Compliance Agent)
-Uses RAG on Double Taxation Treaties to calculate real-time Net-Wealth
+Uses retrieval over Double Taxation Treaties to calculate real-time Net-Wealth
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Optional
 import asyncio
 
+from shared.montecarlo import simulate_income
+from shared.projection import PROJECTION_YEARS, project_wealth
+
+from .cache import SourceCache, cached
+from .concurrency import SourceLimiter, limited
+from .data_sources import DataSourceClient, simulate_latency
+from .plan import SimulationPlan
+from .tax_engine import get_tax_engine
+from .treaties import get_treaty_store
+from .instrumentation import instrumented
+
+# Article search used to surface the treaty text behind the tax analysis
+TREATY_ARTICLE_QUERY = "salaries employment income resident elimination of double taxation"
+# Flat income tax rate for target countries without a bracket schedule
+FALLBACK_TAX_RATE = 0.30
+
+@instrumented("nexus")
 class NexusAgent:
     """
     Specializes in tax compliance and regulatory analysis across 190+ jurisdictions
     """
     
-    def __init__(self):
-        self.tax_treaties_db = "path/to/tax_treaties_rag_db"
+    def __init__(self, source_limiter: Optional[SourceLimiter] = None, source_cache: Optional[SourceCache] = None,
+                 data_sources: Optional[DataSourceClient] = None):
+        self.treaty_store = get_treaty_store()
+        self.tax_engine = get_tax_engine()
         self.compliance_api_key = "your_compliance_api_key"
+        self.source_limiter = source_limiter or SourceLimiter()
+        self.source_cache = source_cache or SourceCache()
+        self.data_sources = data_sources or DataSourceClient.from_env()
     
-    async def analyze_compliance(self, context) -> Dict[str, Any]:
+    async def analyze_compliance(self, context, plan: Optional[SimulationPlan] = None) -> Dict[str, Any]:
         """
         Analyze tax compliance and regulatory requirements
         """
-        results = {}
+        # Facts shared with the other agents come from the request's plan
+        plan = plan or SimulationPlan(context, self)
         
-        for location in context.target_locations:
-            # Get tax treaty information
-            tax_treaty = await self._get_tax_treaty_info(context.current_location, location)
-            
-            # Calculate tax obligations
-            tax_analysis = await self._calculate_tax_obligations(
-                context.salary, 
-                context.current_location, 
-                location,
-                tax_treaty
-            )
-            
-            # Analyze regulatory requirements
-            regulatory_reqs = await self._get_regulatory_requirements(location, context.salary)
-            
-            # Generate portable trust score
-            trust_score = self._generate_trust_score(context.financial_data, context.salary)
-            
-            results[location] = {
-                "tax_analysis": tax_analysis,
-                "regulatory_requirements": regulatory_reqs,
-                "net_wealth_projection": self._calculate_net_wealth(tax_analysis, context.salary),
-                "compliance_costs": self._calculate_compliance_costs(regulatory_reqs),
-                "portable_trust_score": trust_score,
-                "double_taxation_relief": tax_treaty.get("relief_percentage", 0)
-            }
+        # All locations are analyzed concurrently
+        analyses = await asyncio.gather(*(
+            self._analyze_location(location, context, plan)
+            for location in context.target_locations
+        ))
         
-        return results
+        return dict(zip(context.target_locations, analyses))
     
-    async def _get_tax_treaty_info(self, origin_country: str, target_country: str) -> Dict[str, Any]:
-        """
-        Query RAG system for Double Taxation Treaty information
-        """
-        await asyncio.sleep(0.1)  # Simulate RAG query
+    async def _analyze_location(self, location: str, context, plan: SimulationPlan) -> Dict[str, Any]:
+        """Analyze a single location"""
+        # Treaty lookup and the facts shared through the plan are independent
+        tax_treaty, regulatory_reqs, setup_costs, trust_score = await asyncio.gather(
+            self._get_tax_treaty_info(context.current_location, location),
+            plan.regulatory(location),
+            plan.setup_costs(location),
+            plan.trust_score()
+        )
+        
+        # Calculate tax obligations (needs the treaty)
+        tax_analysis = await self._calculate_tax_obligations(
+            context.salary, 
+            context.current_location, 
+            location,
+            tax_treaty
+        )
         
-        # Mock treaty data - replace with actual RAG implementation
         return {
-            "treaty_exists": True,
-            "relief_percentage": 0.15,  # 15% relief on double taxation
-            "exempt_categories": ["pension", "royalties"],
-            "withholding_rates": {
-                "dividends": 0.05,
-                "interest": 0.10,
-                "royalties": 0.08
-            },
-            "tie_breaker_rules": "residence_based",
-            "treaty_year": 2023
+            "tax_analysis": tax_analysis,
+            "regulatory_requirements": regulatory_reqs,
+            "net_wealth_projection": self._calculate_net_wealth(tax_analysis, context.salary),
+            "compliance_costs": self._calculate_compliance_costs(regulatory_reqs, setup_costs),
+            "portable_trust_score": trust_score,
+            "double_taxation_relief": tax_treaty.get("relief_percentage", 0),
+            "treaty_articles": tax_treaty.get("relevant_articles", [])
         }
     
+    async def _get_tax_treaty_info(self, origin_country: str, target_country: str) -> Dict[str, Any]:
+        """
+        Look up the Double Taxation Treaty between two locations in the local
+        treaty store, with the articles most relevant to employment income
+        """
+        treaty = self.treaty_store.lookup(origin_country, target_country)
+        if treaty["treaty_exists"]:
+            treaty["relevant_articles"] = self.treaty_store.search(
+                TREATY_ARTICLE_QUERY, origin_country, target_country, top_k=2
+            )
+        return treaty
+    
+    @limited("tax_engine")
     async def _calculate_tax_obligations(self, salary: float, origin: str, target: str, treaty: Dict) -> Dict[str, Any]:
         """
         Calculate comprehensive tax obligations in both jurisdictions
-        """
-        await asyncio.sleep(0.1)
-        
-        # Mock tax calculation - replace with actual tax engine
-        origin_tax_rate = 0.25  # 25% in origin country
-        target_tax_rate = 0.30  # 30% in target country
         
-        origin_tax = salary * origin_tax_rate
-        target_tax = salary * target_tax_rate
-        
-        # Apply treaty relief
-        relief_amount = min(origin_tax, target_tax) * treaty.get("relief_percentage", 0)
+        Progressive brackets and social security come from the tax engine.
+        The origin only keeps taxing a mover if it taxes its citizens abroad,
+        and the treaty's relief percentage applies to that double taxation
+        """
+        origin_code = self.treaty_store.country_code(origin)
+        target_code = self.treaty_store.country_code(target)
+        tax = self.tax_engine.compute_aligned(
+            [target_code], salary, [FALLBACK_TAX_RATE], origin_code,
+            relief_percentage=treaty.get("relief_percentage", 0)
+        )
+        origin_tax, target_tax, relief_amount, social_security, total_tax = (
+            float(tax[key][0]) for key in ("origin_tax", "income_tax", "treaty_relief", "social_security", "total_tax")
+        )
         
         return {
             "origin_country_tax": origin_tax,
             "target_country_tax": target_tax,
             "treaty_relief": relief_amount,
             "total_tax_burden": origin_tax + target_tax - relief_amount,
-            "effective_tax_rate": ((origin_tax + target_tax - relief_amount) / salary) * 100,
-            "social_security_origin": salary * 0.12,  # 12% social security
-            "social_security_target": salary * 0.15,  # 15% social solidarity
-            "net_after_all_taxes": salary - (origin_tax + target_tax - relief_amount) - (salary * 0.27)
+            "effective_tax_rate": ((origin_tax + target_tax - relief_amount) / salary) * 100 if salary else 0.0,
+            "social_security_origin": 0.0,  # contributions follow the place of work
+            "social_security_target": social_security,
+            "net_after_all_taxes": salary - total_tax
         }
     
+    @cached("regulatory")
+    @limited("regulatory")
     async def _get_regulatory_requirements(self, location: str, salary: float) -> Dict[str, Any]:
         """
         Get regulatory and compliance requirements for the target location
         """
-        await asyncio.sleep(0.1)
+        if self.data_sources.configured("regulatory"):
+            return await self.data_sources.get_json("regulatory", location, {"salary": salary})
+        
+        await simulate_latency()
         
         return {
             "visa_requirements": {
@@ -164,27 +194,34 @@ class NexusAgent:
             "valid_until": "2025-12-26"  # 1 year validity
         }
     
-    def _calculate_net_wealth(self, tax_analysis: Dict, salary: float) -> Dict[str, float]:
+    def _calculate_net_wealth(self, tax_analysis: Dict, salary: float) -> Dict[str, Any]:
         """
-        Calculate true net wealth after all taxes and obligations
+        Calculate true net wealth after all taxes and obligations: the
+        expected projection of the after-tax income invested each year, and
+        Monte Carlo percentile bands around it
         """
         net_after_taxes = tax_analysis["net_after_all_taxes"]
+        projection = project_wealth(0.0, net_after_taxes, PROJECTION_YEARS)
+        bands = simulate_income(net_after_taxes)
         
         return {
-            "year_1": net_after_taxes,
-            "year_3": net_after_taxes * 3 * 1.05,  # 5% growth assumption
-            "year_5": net_after_taxes * 5 * 1.08,  # 8% growth assumption
-            "net_wealth_delta": ((net_after_taxes - salary * 0.7) / (salary * 0.7)) * 100  # vs 70% baseline
+            "year_1": projection[0],
+            "year_3": projection[2],
+            "year_5": projection[4],
+            "net_wealth_delta": ((net_after_taxes - salary * 0.7) / (salary * 0.7)) * 100,  # vs 70% baseline
+            "percentiles": bands["percentiles"],
+            "probability_of_loss": bands["probability_of_loss"]
         }
     
-    def _calculate_compliance_costs(self, regulatory_reqs: Dict) -> Dict[str, float]:
+    def _calculate_compliance_costs(self, regulatory_reqs: Dict, setup_costs: Dict[str, float]) -> Dict[str, float]:
         """
         Calculate total compliance and bureaucracy costs
         """
-        visa_costs = regulatory_reqs["visa_requirements"]["cost"]
-        banking_setup = 500  # Banking setup costs
-        legal_fees = 1200   # Legal consultation
-        translation_costs = 400  # Document translation
+        # One-off costs shared with the Fiscal Ghost (see plan.setup_costs)
+        visa_costs = setup_costs["visa_and_permits"]
+        banking_setup = setup_costs["banking_setup"]
+        legal_fees = setup_costs["legal_consultation"]
+        translation_costs = setup_costs["document_translation"]
         
         annual_compliance = (
             regulatory_reqs["health_insurance"]["monthly_cost"] * 12 +
@@ -3,13 +3,18 @@ Multi-Agent Orchestrator using LangGraph
 Coordinates the three specialized agents: Actuary, Fiscal Ghost, and Nexus
 """
 
-from typing import Dict, List, Any
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import asyncio
 
+from .cache import SourceCache
+from .concurrency import SourceLimiter
+from .data_sources import DataSourceClient
 from .actuary_agent import ActuaryAgent
 from .fiscal_ghost_agent import FiscalGhostAgent  
 from .nexus_agent import NexusAgent
+from .plan import SimulationPlan
+from .instrumentation import instrumented
 
 @dataclass
 class SimulationContext:
@@ -20,27 +25,47 @@ class SimulationContext:
     preferences: Dict
     financial_data: Dict = None
 
+@instrumented("orchestrator")
 class AgentOrchestrator:
     """
     Orchestrates the three-agent simulation workflow
     """
     
-    def __init__(self):
-        self.actuary = ActuaryAgent()
-        self.fiscal_ghost = FiscalGhostAgent()
-        self.nexus = NexusAgent()
+    def __init__(self, source_limits: Optional[Dict[str, int]] = None, source_cache: Optional[SourceCache] = None,
+                 data_sources: Optional[DataSourceClient] = None):
+        # One limiter, one cache and one connection pool for all agents so a
+        # data source's limit, cached lookups and keep-alive connections
+        # hold across them
+        self.source_limiter = SourceLimiter(source_limits)
+        self.source_cache = source_cache or SourceCache()
+        self.data_sources = data_sources or DataSourceClient.from_env()
+        self.actuary = ActuaryAgent(self.source_limiter, self.source_cache, self.data_sources)
+        self.fiscal_ghost = FiscalGhostAgent(self.source_limiter, self.source_cache, self.data_sources)
+        self.nexus = NexusAgent(self.source_limiter, self.source_cache, self.data_sources)
+    
+    def plan(self, context: SimulationContext) -> SimulationPlan:
+        """
+        Request-scoped plan: user- and (user, city)-level facts the agents
+        share are computed once for the whole request
+        """
+        return SimulationPlan(context, self.nexus)
+    
+    async def aclose(self):
+        """Close the shared connection pool"""
+        await self.data_sources.aclose()
     
     async def run_simulation(self, **kwargs) -> Dict[str, Any]:
         """
         Execute the full simulation workflow across all agents
         """
         context = SimulationContext(**kwargs)
+        plan = self.plan(context)
         
         # Run agents in parallel where possible
         tasks = [
             self.actuary.analyze_life_quality(context),
-            self.fiscal_ghost.analyze_expenses(context),
-            self.nexus.analyze_compliance(context)
+            self.fiscal_ghost.analyze_expenses(context, plan),
+            self.nexus.analyze_compliance(context, plan)
         ]
         
         actuary_result, fiscal_result, nexus_result = await asyncio.gather(*tasks)
@@ -53,6 +78,36 @@ class AgentOrchestrator:
             "recommendations": self._generate_recommendations(actuary_result, fiscal_result, nexus_result)
         }
     
+    async def stream_simulation(self, **kwargs) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Same workflow as run_simulation, yielding (section, result) pairs as
+        each agent finishes, then the synthesized scenarios and recommendations
+        """
+        context = SimulationContext(**kwargs)
+        plan = self.plan(context)
+        
+        sections = {
+            asyncio.ensure_future(self.actuary.analyze_life_quality(context)): "risk_analysis",
+            asyncio.ensure_future(self.fiscal_ghost.analyze_expenses(context, plan)): "expense_analysis",
+            asyncio.ensure_future(self.nexus.analyze_compliance(context, plan)): "compliance_summary"
+        }
+        results = {}
+        pending = set(sections)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[sections[task]] = task.result()
+                    yield sections[task], results[sections[task]]
+        finally:
+            # Client went away or an agent failed: stop the others
+            for task in pending:
+                task.cancel()
+        
+        agent_results = (results["risk_analysis"], results["expense_analysis"], results["compliance_summary"])
+        yield "scenarios", self._generate_scenarios(*agent_results)
+        yield "recommendations", self._generate_recommendations(*agent_results)
+    
     def _generate_scenarios(self, actuary_result: Dict, fiscal_result: Dict, nexus_result: Dict) -> List[Dict]:
         """Generate 5-year wealth trajectory scenarios"""
         return [
@@ -0,0 +1,85 @@
+"""
+Request-scoped computation plan shared by the three agents
+Facts that depend only on the user (the portable trust score) or on the
+user and one target city (regulatory requirements, the one-off setup costs
+derived from them) are computed once per request and handed to every agent
+that needs them, instead of each agent deriving its own copy per location.
+Concurrent requests for a fact still being computed wait for the same
+result
+"""
+
+from typing import Any, Awaitable, Callable, Dict
+from dataclasses import dataclass, asdict
+import asyncio
+
+# One-off relocation costs besides the visa, shared by the compliance and expense views
+BANKING_SETUP = 500
+LEGAL_CONSULTATION = 1200
+DOCUMENT_TRANSLATION = 400
+
+@dataclass
+class FactStats:
+    requested: int = 0
+    computed: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.requested - self.computed
+
+def setup_costs(regulatory_reqs: Dict[str, Any]) -> Dict[str, float]:
+    """One-off costs of moving to a location, from its regulatory requirements"""
+    return {
+        "visa_and_permits": regulatory_reqs["visa_requirements"]["cost"],
+        "banking_setup": BANKING_SETUP,
+        "legal_consultation": LEGAL_CONSULTATION,
+        "document_translation": DOCUMENT_TRANSLATION
+    }
+
+class SimulationPlan:
+    """
+    Memoized facts for one simulation request. `nexus` provides the
+    regulatory lookup and trust score, so they keep going through its data
+    source limits and cache
+    """
+
+    def __init__(self, context, nexus):
+        self.context = context
+        self.nexus = nexus
+        self.stats: Dict[str, FactStats] = {}
+        self._facts: Dict[tuple, asyncio.Future] = {}
+
+    def _future(self, key: tuple, compute: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        future = self._facts.get(key)
+        if future is None:
+            self.stats.setdefault(key[0], FactStats()).computed += 1
+            future = self._facts[key] = asyncio.ensure_future(compute())
+        return future
+
+    async def _fact(self, key: tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Fact requested by an agent; counted, so stats show what sharing saved"""
+        self.stats.setdefault(key[0], FactStats()).requested += 1
+        # shield: one caller being cancelled must not cancel the others' result
+        return await asyncio.shield(self._future(key, compute))
+
+    async def trust_score(self) -> Dict[str, Any]:
+        """Portable trust score; depends on the user only"""
+        async def compute():
+            return self.nexus._generate_trust_score(self.context.financial_data, self.context.salary)
+        return await self._fact(("trust_score",), compute)
+
+    def _regulatory(self, location: str) -> Callable[[], Awaitable[Any]]:
+        return lambda: self.nexus._get_regulatory_requirements(location, self.context.salary)
+
+    async def regulatory(self, location: str) -> Dict[str, Any]:
+        """Regulatory requirements for the user in one location"""
+        return await self._fact(("regulatory", location), self._regulatory(location))
+
+    async def setup_costs(self, location: str) -> Dict[str, float]:
+        """Visa, banking, legal and translation costs for one location"""
+        async def compute():
+            # Derived from the same lookup the agents share, without counting as a request
+            return setup_costs(await asyncio.shield(self._future(("regulatory", location), self._regulatory(location))))
+        return await self._fact(("setup_costs", location), compute)
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        return {fact: {**asdict(stats), "saved": stats.saved} for fact, stats in self.stats.items()}
@@ -0,0 +1,215 @@
+"""
+Spending replay over full transaction histories
+Transactions are ingested in fixed-size chunks: each chunk is categorized
+into a compact columnar form (int8 category codes, float64 amounts, int32
+month ordinals) and folded into per-category totals, so memory stays the
+same whether a history holds a hundred rows or a million. Replaying the
+resulting monthly profile against many cities is one matrix multiply of the
+cities' price features by a precomputed category mapping matrix
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+import itertools
+
+import numpy as np
+
+# Spending categories, in column order
+CATEGORIES = (
+    "housing", "food_dining", "transportation", "entertainment", "healthcare",
+    "shopping", "utilities", "coffee", "gym", "subscriptions", "other"
+)
+CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+SKIP = -1  # income, transfers and loan principal are not spending
+
+# Cost-of-living fields a city's prices are read from, with the value used when missing
+PRICE_FEATURES = {
+    "housing_index": 1.0,
+    "food_index": 1.0,
+    "transportation_index": 1.0,
+    "entertainment_index": 1.0,
+    "healthcare_index": 1.0,
+    "utilities_index": 1.0,
+    "coffee_price": 3.50,
+    "gym_membership": 50.0
+}
+FEATURE_INDEX = {feature: i for i, feature in enumerate(PRICE_FEATURES)}
+
+# Price the coffee habit was measured at, so spend / price = cups
+HOME_COFFEE_PRICE = 3.50
+
+# Plaid personal_finance_category codes: detailed first, then primary
+DETAILED_CATEGORIES = {
+    "FOOD_AND_DRINK_COFFEE": "coffee",
+    "RENT_AND_UTILITIES_RENT": "housing",
+    "LOAN_PAYMENTS_MORTGAGE_PAYMENT": "housing",
+    "PERSONAL_CARE_GYMS_AND_FITNESS_CENTERS": "gym",
+    "ENTERTAINMENT_TV_AND_MOVIES": "subscriptions",
+    "ENTERTAINMENT_MUSIC_AND_AUDIO": "subscriptions",
+    "GENERAL_SERVICES_INSURANCE": "other"
+}
+PRIMARY_CATEGORIES = {
+    "FOOD_AND_DRINK": "food_dining",
+    "TRANSPORTATION": "transportation",
+    "ENTERTAINMENT": "entertainment",
+    "MEDICAL": "healthcare",
+    "GENERAL_MERCHANDISE": "shopping",
+    "HOME_IMPROVEMENT": "shopping",
+    "RENT_AND_UTILITIES": "utilities",
+    "INCOME": None,
+    "TRANSFER_IN": None,
+    "TRANSFER_OUT": None,
+    "LOAN_PAYMENTS": None
+}
+
+CHUNK_SIZE = 8192
+
+def _mapping_matrices():
+    """
+    (features, categories) matrices: SCALE turns a city's prices into a
+    multiplier on each category's spend, FIXED into a flat monthly amount.
+    Categories with neither (shopping, utilities, subscriptions, other) are
+    not replayed
+    """
+    scale = np.zeros((len(PRICE_FEATURES), len(CATEGORIES)))
+    fixed = np.zeros_like(scale)
+    for feature, category in [
+        ("housing_index", "housing"),
+        ("food_index", "food_dining"),
+        ("transportation_index", "transportation"),
+        ("entertainment_index", "entertainment"),
+        ("healthcare_index", "healthcare")
+    ]:
+        scale[FEATURE_INDEX[feature], CATEGORY_INDEX[category]] = 1.0
+    scale[FEATURE_INDEX["coffee_price"], CATEGORY_INDEX["coffee"]] = 1.0 / HOME_COFFEE_PRICE
+    fixed[FEATURE_INDEX["gym_membership"], CATEGORY_INDEX["gym"]] = 1.0
+    return np.hstack([scale, fixed])
+
+# Both matrices side by side, so replay is a single (cities, features) @ (features, 2 x categories)
+MAPPING = _mapping_matrices()
+REPLAYED = tuple(
+    category for i, category in enumerate(CATEGORIES)
+    if MAPPING[:, i].any() or MAPPING[:, len(CATEGORIES) + i].any()
+)
+REPLAYED_INDEX = np.array([CATEGORY_INDEX[category] for category in REPLAYED])
+
+def category_code(label: Optional[str]) -> int:
+    """Category column for a Plaid detailed or primary category code (or one of CATEGORIES)"""
+    if label in CATEGORY_INDEX:
+        return CATEGORY_INDEX[label]
+    if label in DETAILED_CATEGORIES:
+        return CATEGORY_INDEX[DETAILED_CATEGORIES[label]]
+    primary = label
+    while primary:
+        if primary in PRIMARY_CATEGORIES:
+            category = PRIMARY_CATEGORIES[primary]
+            return SKIP if category is None else CATEGORY_INDEX[category]
+        primary = primary.rpartition("_")[0]
+    return CATEGORY_INDEX["other"]
+
+def _label(transaction: Mapping[str, Any]) -> Optional[str]:
+    pfc = transaction.get("personal_finance_category")
+    if pfc:
+        return pfc.get("detailed") or pfc.get("primary")
+    return transaction.get("category")
+
+def _month(date: str) -> int:
+    # "YYYY-MM-DD" -> months since year 0
+    return int(date[:4]) * 12 + int(date[5:7]) - 1
+
+class SpendingHistory:
+    """
+    Running per-category totals over a transaction history, fed chunk by
+    chunk. Holds one float per category and the month range seen, however
+    many transactions go through it
+    """
+
+    def __init__(self):
+        self.totals = np.zeros(len(CATEGORIES))
+        self.transactions = 0
+        self.first_month: Optional[int] = None
+        self.last_month: Optional[int] = None
+        self._codes: Dict[str, int] = {}
+
+    def ingest(self, transactions: Iterable[Mapping[str, Any]], chunk_size: int = CHUNK_SIZE) -> "SpendingHistory":
+        """
+        Plaid-style transaction dicts (amount > 0 is money out, date
+        "YYYY-MM-DD", personal_finance_category or category); any iterable,
+        consumed lazily
+        """
+        iterator = iter(transactions)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                return self
+            self.ingest_columns(
+                [_label(transaction) for transaction in chunk],
+                np.fromiter((transaction["amount"] for transaction in chunk), np.float64, len(chunk)),
+                np.fromiter((_month(transaction["date"]) for transaction in chunk), np.int32, len(chunk))
+            )
+
+    def ingest_columns(self, labels: Sequence, amounts: np.ndarray, months: np.ndarray):
+        """One columnar chunk: category labels, amounts and month ordinals"""
+        # Categorize each distinct label once, then map the whole column
+        unique, inverse = np.unique(np.array([label or "" for label in labels], dtype=str), return_inverse=True)
+        lookup = np.array([self._code(label) for label in unique], dtype=np.int8)
+        codes = lookup[inverse]
+
+        spending = codes != SKIP
+        self.totals += np.bincount(codes[spending], weights=amounts[spending], minlength=len(CATEGORIES))
+        self.transactions += int(spending.sum())
+        if len(months):
+            low, high = int(months.min()), int(months.max())
+            self.first_month = low if self.first_month is None else min(self.first_month, low)
+            self.last_month = high if self.last_month is None else max(self.last_month, high)
+
+    def _code(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = category_code(label)
+        return code
+
+    @property
+    def months(self) -> int:
+        if self.first_month is None:
+            return 0
+        return self.last_month - self.first_month + 1
+
+    def monthly(self) -> Dict[str, float]:
+        """Average monthly spend per category over the months the history covers"""
+        if not self.months:
+            return {}
+        averages = self.totals / self.months
+        return {category: float(averages[i]) for i, category in enumerate(CATEGORIES) if averages[i]}
+
+def profile_from_transactions(transactions: Iterable[Mapping[str, Any]]) -> Dict[str, float]:
+    """Average monthly spending profile of a transaction history"""
+    return SpendingHistory().ingest(transactions).monthly()
+
+def profile_vector(spending_profile: Mapping[str, float]) -> np.ndarray:
+    vector = np.zeros(len(CATEGORIES))
+    for category, amount in spending_profile.items():
+        vector[CATEGORY_INDEX.get(category, CATEGORY_INDEX["other"])] += amount
+    return vector
+
+def price_matrix(local_prices: Sequence[Mapping[str, float]]) -> np.ndarray:
+    """(cities, features) from each city's cost-of-living fields"""
+    return np.array([
+        [prices.get(feature, default) for feature, default in PRICE_FEATURES.items()]
+        for prices in local_prices
+    ], dtype=np.float64).reshape(len(local_prices), len(PRICE_FEATURES))
+
+def replay(spending_profile: Mapping[str, float], local_prices: Sequence[Mapping[str, float]],
+           exchange_rates: Sequence[float]) -> np.ndarray:
+    """
+    (cities, len(REPLAYED)) monthly cost of the spending profile at each
+    city's prices, converted at that city's exchange rate
+    """
+    spend = profile_vector(spending_profile)
+    factors = price_matrix(local_prices) @ MAPPING
+    scale, fixed = factors[:, :len(CATEGORIES)], factors[:, len(CATEGORIES):]
+    projected = scale * spend + fixed
+    return projected[:, REPLAYED_INDEX] * np.asarray(exchange_rates, dtype=np.float64)[:, None]
+
+def replayed_dicts(projected: np.ndarray) -> List[Dict[str, float]]:
+    """Rows of replay as {category: amount} dicts"""
+    return [dict(zip(REPLAYED, row)) for row in projected.tolist()]
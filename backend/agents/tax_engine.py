@@ -0,0 +1,179 @@
+"""
+Progressive income tax engine
+
+Each jurisdiction's bracket schedule in data/tax_brackets.json (the same
+file the core app ships) is compiled once into sorted threshold/rate
+arrays plus the cumulative tax owed at each threshold. Tax for a whole
+vector of incomes is then one searchsorted pass and a fused multiply-add
+
+Moving abroad only leaves the origin's tax behind if the origin taxes by
+residence. Origins that tax their citizens wherever they live (the US) also
+levy their income tax; a double taxation treaty then relieves
+relief_percentage of the smaller of the two income taxes. The Nexus passes
+the relief from the treaty store; the file's own treaty table is the
+fallback
+"""
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import os
+
+import numpy as np
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+BRACKETS_PATH = Path(os.getenv("TAX_BRACKETS_PATH", DATA_DIR / "tax_brackets.json"))
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+@dataclass(frozen=True)
+class CompiledSchedule:
+    allowance: float
+    thresholds: np.ndarray  # lower bound of each bracket, ascending, starts at 0
+    rates: np.ndarray  # marginal rate of each bracket
+    base_tax: np.ndarray  # tax owed on income up to each threshold
+    social_rates: np.ndarray
+    social_floors: np.ndarray
+    social_caps: np.ndarray  # inf when uncapped
+    taxes_citizens_abroad: bool = False
+
+    @classmethod
+    def compile(cls, schedule: Dict) -> "CompiledSchedule":
+        brackets = sorted(schedule["brackets"])
+        thresholds = np.array([lower for lower, _ in brackets], dtype=np.float64)
+        rates = np.array([rate for _, rate in brackets], dtype=np.float64)
+        if thresholds[0] != 0:
+            raise ValueError("The first bracket must start at 0")
+
+        base_tax = np.zeros_like(thresholds)
+        base_tax[1:] = np.cumsum(np.diff(thresholds) * rates[:-1])
+
+        social = schedule.get("social_security", [])
+        return cls(
+            allowance=float(schedule.get("allowance", 0)),
+            thresholds=thresholds,
+            rates=rates,
+            base_tax=base_tax,
+            social_rates=np.array([part["rate"] for part in social], dtype=np.float64),
+            social_floors=np.array([part.get("floor", 0) for part in social], dtype=np.float64),
+            social_caps=np.array([part.get("cap", np.inf) for part in social], dtype=np.float64),
+            taxes_citizens_abroad=bool(schedule.get("taxes_citizens_abroad", False))
+        )
+
+    def income_tax(self, incomes: np.ndarray) -> np.ndarray:
+        taxable = np.maximum(incomes - self.allowance, 0.0)
+        bracket = np.searchsorted(self.thresholds, taxable, side="right") - 1
+        return self.base_tax[bracket] + (taxable - self.thresholds[bracket]) * self.rates[bracket]
+
+    def social_security(self, incomes: np.ndarray) -> np.ndarray:
+        if len(self.social_rates) == 0:
+            return np.zeros_like(incomes)
+        # (incomes, components): salary slice between each floor and cap
+        insured = np.clip(incomes[..., None], self.social_floors, self.social_caps) - self.social_floors
+        return insured @ self.social_rates
+
+class TaxEngine:
+    def __init__(self, schedules: Dict[str, CompiledSchedule], version: str,
+                 treaties: Optional[Dict[Tuple[str, str], float]] = None):
+        self.schedules = schedules
+        self.version = version
+        self.treaties = treaties or {}
+
+    @classmethod
+    def from_json(cls, path: Path = BRACKETS_PATH) -> "TaxEngine":
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        schedules = {
+            code: CompiledSchedule.compile(schedule)
+            for code, schedule in data["jurisdictions"].items()
+        }
+        # Treaties bind both ways
+        treaties = {}
+        for treaty in data.get("treaties", []):
+            first, second = treaty["countries"]
+            treaties[first, second] = treaties[second, first] = float(treaty["relief_percentage"])
+        return cls(schedules, data.get("version", ""), treaties)
+
+    def has(self, jurisdiction: Optional[str]) -> bool:
+        return jurisdiction in self.schedules
+
+    def relief_percentage(self, origin: Optional[str], jurisdiction: Optional[str]) -> float:
+        """Share of the doubly taxed amount relieved by the pair's treaty, 0 without one"""
+        return self.treaties.get((origin, jurisdiction), 0.0)
+
+    def origin_tax(self, origin: Optional[str], jurisdiction: Optional[str], incomes: np.ndarray) -> np.ndarray:
+        """Income tax the origin still levies on someone who moved to jurisdiction"""
+        schedule = self.schedules.get(origin)
+        if schedule is None or origin == jurisdiction or not schedule.taxes_citizens_abroad:
+            return np.zeros_like(incomes)
+        return schedule.income_tax(incomes)
+
+    def compute(self, jurisdiction: str, incomes: ArrayLike, origin: Optional[str] = None,
+                relief_percentage: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Income tax, social security, origin tax, treaty relief, total and
+        effective rate for every income in one jurisdiction, for someone
+        moving there from origin; relief_percentage overrides the treaty table
+        """
+        schedule = self.schedules[jurisdiction]
+        incomes = np.asarray(incomes, dtype=np.float64)
+        return self._totals(
+            incomes,
+            schedule.income_tax(incomes),
+            schedule.social_security(incomes),
+            self.origin_tax(origin, jurisdiction, incomes),
+            self.relief_percentage(origin, jurisdiction) if relief_percentage is None else relief_percentage
+        )
+
+    def compute_aligned(self, jurisdictions: Sequence[Optional[str]], incomes: ArrayLike,
+                        fallback_rates: Optional[np.ndarray] = None, origin: Optional[str] = None,
+                        relief_percentage: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Element-wise: incomes[i] taxed in jurisdictions[i], one schedule
+        evaluation per jurisdiction; jurisdictions without a schedule pay a
+        flat fallback_rates[i] (0 if not given) as their income tax
+        """
+        codes = np.asarray([code or "" for code in jurisdictions])
+        incomes = np.broadcast_to(np.asarray(incomes, dtype=np.float64), codes.shape)
+        income_tax = np.zeros(codes.shape)
+        social_security = np.zeros(codes.shape)
+        origin_tax = np.zeros(codes.shape)
+        relief = np.zeros(codes.shape)
+        unique_codes, groups = np.unique(codes, return_inverse=True)
+        for group, code in enumerate(unique_codes):
+            rows = groups == group
+            if code in self.schedules:
+                schedule = self.schedules[code]
+                income_tax[rows] = schedule.income_tax(incomes[rows])
+                social_security[rows] = schedule.social_security(incomes[rows])
+            elif fallback_rates is not None:
+                income_tax[rows] = incomes[rows] * np.asarray(fallback_rates)[rows]
+            origin_tax[rows] = self.origin_tax(origin, code, incomes[rows])
+            relief[rows] = self.relief_percentage(origin, code) if relief_percentage is None else relief_percentage
+        return self._totals(incomes, income_tax, social_security, origin_tax, relief)
+
+    @staticmethod
+    def _totals(incomes: np.ndarray, income_tax: np.ndarray, social_security: np.ndarray,
+                origin_tax: np.ndarray, relief_percentage: ArrayLike) -> Dict[str, np.ndarray]:
+        treaty_relief = np.minimum(origin_tax, income_tax) * relief_percentage
+        total = income_tax + social_security + origin_tax - treaty_relief
+        with np.errstate(divide="ignore", invalid="ignore"):
+            effective_rate = np.where(incomes > 0, total / incomes, 0.0)
+        return {
+            "income_tax": income_tax,
+            "social_security": social_security,
+            "origin_tax": origin_tax,
+            "treaty_relief": treaty_relief,
+            "total_tax": total,
+            "effective_rate": effective_rate
+        }
+
+_engine: Optional[TaxEngine] = None
+
+def get_tax_engine() -> TaxEngine:
+    """Shared engine, compiled on first use"""
+    global _engine
+    if _engine is None:
+        _engine = TaxEngine.from_json(BRACKETS_PATH)
+    return _engine
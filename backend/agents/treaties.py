@@ -0,0 +1,344 @@
+"""
+Offline Double Taxation Treaty store for the Nexus agent
+Structured treaty terms live in a direct-address pair index and article
+text in a BM25 search index; both are written by the ingestion command
+into flat .npy files that are memory-mapped when the store is opened
+
+Ingest a source directory (treaties.jsonl + countries.csv):
+    python -m agents.treaties ingest data/treaties/source data/treaties/compiled
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from pathlib import Path
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+
+import numpy as np
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "treaties"
+SOURCE_DIR = Path(os.getenv("TREATY_SOURCE_DIR", DATA_DIR / "source"))
+COMPILED_DIR = Path(os.getenv("TREATY_DB_DIR", DATA_DIR / "compiled"))
+
+# Country ids are one byte, so the pair table is 256 x 256 row numbers
+MAX_COUNTRIES = 256
+NO_TREATY = -1
+
+WITHHOLDING_CATEGORIES = ["dividends", "interest", "royalties"]
+
+TREATY_DTYPE = np.dtype([
+    ("relief_percentage", "f8"),
+    ("dividends", "f8"),
+    ("interest", "f8"),
+    ("royalties", "f8"),
+    ("treaty_year", "u2"),
+    ("tie_breaker", "u1"),
+    ("exempt_mask", "u4"),
+    ("chunk_start", "u4"),
+    ("chunk_count", "u4"),
+])
+
+CHUNK_DTYPE = np.dtype([
+    ("treaty", "u4"),
+    ("article", "u2"),
+    ("length", "u2"),  # tokens, for BM25 length normalization
+])
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "any", "as", "be", "by", "for", "in", "is", "it", "of",
+    "on", "or", "shall", "such", "that", "the", "this", "to", "which", "with"
+}
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+def normalize_name(name: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", name.lower()))
+
+def ingest(source_dir: Path = SOURCE_DIR, out_dir: Path = COMPILED_DIR) -> Dict[str, int]:
+    """
+    Build the on-disk store from a source directory
+    Each treaty is indexed under both (origin, target) and (target, origin)
+    """
+    source_dir, out_dir = Path(source_dir), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    codes: List[str] = []
+    names: Dict[str, str] = {}
+    with open(source_dir / "countries.csv", newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            code = row["code"].upper()
+            codes.append(code)
+            for name in [code, row["name"], *(row.get("aliases") or "").split("|")]:
+                if name:
+                    names[normalize_name(name)] = code
+            for city in (row.get("cities") or "").split("|"):
+                if city:
+                    names.setdefault(normalize_name(city), code)
+    if len(codes) > MAX_COUNTRIES:
+        raise ValueError(f"At most {MAX_COUNTRIES} countries are supported")
+    country_ids = {code: i for i, code in enumerate(codes)}
+
+    pair_table = np.full((MAX_COUNTRIES, MAX_COUNTRIES), NO_TREATY, dtype=np.int32)
+    treaties: List[tuple] = []
+    tie_breakers: List[str] = []
+    exempt_categories: List[str] = []
+    chunk_meta: List[tuple] = []
+    chunk_texts: List[str] = []
+    postings: Dict[str, Dict[int, int]] = {}
+
+    for treaty in _read_jsonl(source_dir / "treaties.jsonl"):
+        row = len(treaties)
+        origin = country_ids[treaty["origin"].upper()]
+        target = country_ids[treaty["target"].upper()]
+        pair_table[origin, target] = row
+        pair_table[target, origin] = row
+
+        rule = treaty.get("tie_breaker_rules", "residence_based")
+        if rule not in tie_breakers:
+            tie_breakers.append(rule)
+        mask = 0
+        for category in treaty.get("exempt_categories", []):
+            if category not in exempt_categories:
+                exempt_categories.append(category)
+            mask |= 1 << exempt_categories.index(category)
+
+        chunk_start = len(chunk_meta)
+        for article in treaty.get("articles", []):
+            chunk = len(chunk_meta)
+            text = f"Article {article['number']} - {article['title']}\n{article['text']}"
+            tokens = tokenize(text)
+            chunk_meta.append((row, article["number"], min(len(tokens), 65535)))
+            chunk_texts.append(text)
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[chunk] = counts.get(chunk, 0) + 1
+
+        rates = treaty.get("withholding_rates", {})
+        treaties.append((
+            treaty.get("relief_percentage", 0.0),
+            *(rates.get(category, math.nan) for category in WITHHOLDING_CATEGORIES),
+            treaty.get("treaty_year", 0),
+            tie_breakers.index(rule),
+            mask,
+            chunk_start,
+            len(chunk_meta) - chunk_start
+        ))
+
+    if len(exempt_categories) > 32:
+        raise ValueError("At most 32 exempt categories are supported")
+
+    # Chunk text: one UTF-8 blob plus offsets
+    encoded = [text.encode("utf-8") for text in chunk_texts]
+    text_offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(blob) for blob in encoded], out=text_offsets[1:])
+    (out_dir / "chunks.bin").write_bytes(b"".join(encoded))
+
+    # Inverted index: sorted terms, offsets into flat posting arrays
+    terms = sorted(postings)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    np.cumsum([len(postings[term]) for term in terms], out=term_offsets[1:])
+    posting_chunks = np.empty(int(term_offsets[-1]), dtype=np.uint32)
+    posting_tf = np.empty(int(term_offsets[-1]), dtype=np.uint16)
+    for i, term in enumerate(terms):
+        start, end = int(term_offsets[i]), int(term_offsets[i + 1])
+        posting_chunks[start:end] = list(postings[term].keys())
+        posting_tf[start:end] = list(postings[term].values())
+
+    np.save(out_dir / "pair_table.npy", pair_table)
+    np.save(out_dir / "treaties.npy", np.array(treaties, dtype=TREATY_DTYPE))
+    np.save(out_dir / "chunks.npy", np.array(chunk_meta, dtype=CHUNK_DTYPE))
+    np.save(out_dir / "text_offsets.npy", text_offsets)
+    np.save(out_dir / "terms.npy", np.array(terms, dtype=str))
+    np.save(out_dir / "term_offsets.npy", term_offsets)
+    np.save(out_dir / "posting_chunks.npy", posting_chunks)
+    np.save(out_dir / "posting_tf.npy", posting_tf)
+    # Written last and replaced atomically: a store is complete once meta.json exists
+    staging = out_dir / "meta.json.tmp"
+    staging.write_text(json.dumps({
+        "source_version": source_version(source_dir),
+        "countries": codes,
+        "names": names,
+        "tie_breakers": tie_breakers,
+        "exempt_categories": exempt_categories
+    }))
+    os.replace(staging, out_dir / "meta.json")
+
+    return {"countries": len(codes), "treaties": len(treaties), "chunks": len(chunk_meta), "terms": len(terms)}
+
+def source_version(source_dir: Path = SOURCE_DIR) -> str:
+    """Hash of the source files a compiled store is built from"""
+    digest = hashlib.sha256()
+    for name in ("countries.csv", "treaties.jsonl"):
+        digest.update((Path(source_dir) / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+def is_current(source_dir: Path = SOURCE_DIR, out_dir: Path = COMPILED_DIR) -> bool:
+    """
+    Whether out_dir holds a store built from the current source; a compiled
+    store deployed without its source is taken as current
+    """
+    meta_path = Path(out_dir) / "meta.json"
+    if not meta_path.exists():
+        return False
+    if not (Path(source_dir) / "treaties.jsonl").exists():
+        return True
+    return json.loads(meta_path.read_text()).get("source_version") == source_version(source_dir)
+
+def _read_jsonl(path: Path) -> Iterable[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+class TreatyStore:
+    """
+    Read-only view over a compiled treaty store
+    """
+
+    def __init__(self, directory: Path = COMPILED_DIR):
+        directory = Path(directory)
+        self.pair_table = np.load(directory / "pair_table.npy", mmap_mode="r")
+        self.treaties = np.load(directory / "treaties.npy", mmap_mode="r")
+        self.chunks = np.load(directory / "chunks.npy", mmap_mode="r")
+        self.text_offsets = np.load(directory / "text_offsets.npy", mmap_mode="r")
+        self.terms = np.load(directory / "terms.npy", mmap_mode="r")
+        self.term_offsets = np.load(directory / "term_offsets.npy", mmap_mode="r")
+        self.posting_chunks = np.load(directory / "posting_chunks.npy", mmap_mode="r")
+        self.posting_tf = np.load(directory / "posting_tf.npy", mmap_mode="r")
+        
+        # np.memmap refuses empty files (a store without article text)
+        text_path = directory / "chunks.bin"
+        self.text = np.memmap(text_path, dtype=np.uint8, mode="r") if text_path.stat().st_size else np.empty(0, np.uint8)
+
+        meta = json.loads((directory / "meta.json").read_text())
+        self.country_ids = {code: i for i, code in enumerate(meta["countries"])}
+        self.names = meta["names"]
+        self.tie_breakers = meta["tie_breakers"]
+        self.exempt_categories = meta["exempt_categories"]
+        self.average_chunk_length = float(self.chunks["length"].mean()) if len(self.chunks) else 1.0
+
+    def country_code(self, location: str) -> Optional[str]:
+        """
+        Resolve 'City, Country', a country name/code or a known city to an ISO code
+        """
+        for candidate in (location.rsplit(",", 1)[-1], location):
+            code = self.names.get(normalize_name(candidate))
+            if code:
+                return code
+        return None
+
+    def treaty_row(self, origin: str, target: str) -> int:
+        origin_code, target_code = self.country_code(origin), self.country_code(target)
+        if origin_code is None or target_code is None:
+            return NO_TREATY
+        return int(self.pair_table[self.country_ids[origin_code], self.country_ids[target_code]])
+
+    def lookup(self, origin: str, target: str) -> Dict[str, Any]:
+        """
+        Structured treaty terms for a location pair
+        """
+        row = self.treaty_row(origin, target)
+        if row == NO_TREATY:
+            return {
+                "treaty_exists": False,
+                "relief_percentage": 0,
+                "exempt_categories": [],
+                "withholding_rates": {},
+                "tie_breaker_rules": None,
+                "treaty_year": None
+            }
+
+        treaty = self.treaties[row]
+        mask = int(treaty["exempt_mask"])
+        return {
+            "treaty_exists": True,
+            "relief_percentage": float(treaty["relief_percentage"]),
+            "exempt_categories": [name for bit, name in enumerate(self.exempt_categories) if mask & (1 << bit)],
+            "withholding_rates": {
+                category: float(treaty[category])
+                for category in WITHHOLDING_CATEGORIES
+                if not math.isnan(treaty[category])
+            },
+            "tie_breaker_rules": self.tie_breakers[int(treaty["tie_breaker"])],
+            "treaty_year": int(treaty["treaty_year"])
+        }
+
+    def chunk_text(self, chunk: int) -> str:
+        start, end = int(self.text_offsets[chunk]), int(self.text_offsets[chunk + 1])
+        return bytes(self.text[start:end]).decode("utf-8")
+
+    def search(self, query: str, origin: Optional[str] = None, target: Optional[str] = None, top_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        BM25 search over article text, optionally restricted to one treaty
+        """
+        chunk_range = None
+        if origin is not None and target is not None:
+            row = self.treaty_row(origin, target)
+            if row == NO_TREATY:
+                return []
+            start = int(self.treaties[row]["chunk_start"])
+            chunk_range = (start, start + int(self.treaties[row]["chunk_count"]))
+
+        scores = np.zeros(len(self.chunks), dtype=np.float64)
+        total_chunks = len(self.chunks)
+
+        for term in set(tokenize(query)):
+            position = int(np.searchsorted(self.terms, term))
+            if position >= len(self.terms) or self.terms[position] != term:
+                continue
+            start, end = int(self.term_offsets[position]), int(self.term_offsets[position + 1])
+            chunk_ids = np.asarray(self.posting_chunks[start:end], dtype=np.intp)
+            tf = np.asarray(self.posting_tf[start:end], dtype=np.float64)
+
+            if chunk_range is not None:
+                keep = (chunk_ids >= chunk_range[0]) & (chunk_ids < chunk_range[1])
+                chunk_ids, tf = chunk_ids[keep], tf[keep]
+
+            idf = math.log(1 + (total_chunks - (end - start) + 0.5) / ((end - start) + 0.5))
+            lengths = self.chunks["length"][chunk_ids] / self.average_chunk_length
+            scores[chunk_ids] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths))
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) == 0:
+            return []
+        best = candidates[np.argsort(-scores[candidates], kind="stable")[:top_k]]
+
+        return [
+            {
+                "article": int(self.chunks[chunk]["article"]),
+                "score": round(float(scores[chunk]), 4),
+                "text": self.chunk_text(int(chunk))
+            }
+            for chunk in best
+        ]
+
+_store: Optional[TreatyStore] = None
+
+def get_treaty_store() -> TreatyStore:
+    """
+    Shared store; ingests the bundled source data on first use if there is
+    no compiled store yet or it was built from different source data
+    """
+    global _store
+    if _store is None:
+        if not is_current(SOURCE_DIR, COMPILED_DIR):
+            ingest(SOURCE_DIR, COMPILED_DIR)
+        _store = TreatyStore(COMPILED_DIR)
+    return _store
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 4) or sys.argv[1] != "ingest":
+        print("usage: python -m agents.treaties ingest [SOURCE_DIR OUT_DIR]")
+        sys.exit(1)
+    source, out = (sys.argv[2], sys.argv[3]) if len(sys.argv) == 4 else (SOURCE_DIR, COMPILED_DIR)
+    counts = ingest(Path(source), Path(out))
+    print(f"Ingested {counts['treaties']} treaties ({counts['chunks']} article chunks, {counts['terms']} terms) into {out}")
@@ -0,0 +1,119 @@
+"""
+Exposure history benchmark: decade-long hourly series for many cities
+
+Backfills synthetic hourly PM2.5, AQI and safety series (a decade per city
+by default, appended a year at a time) into a temporary ExposureStore,
+then appends one new day to every city, which re-aggregates only the
+current month. Summaries (trailing year, long-term, per-year and seasonal
+statistics) for every city come from the monthly aggregates; for a sample
+of cities, per-year PM2.5 statistics are also computed with a full pass
+over the memory-mapped hours (np.nanpercentile per year), for speed and
+for the histogram percentile's error. Reports
+the peak memory Python allocated while summarizing every city
+(tracemalloc; memory-mapped pages are file cache, not heap)
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_exposure [--cities 200] [--years 10]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from agents import exposure
+
+START = exposure.to_hour("2015-01-01T00")
+HOURS_PER_YEAR = 24 * 365
+SAMPLE = 20
+
+def synthetic_year(rng: np.random.Generator, first_hour: int, hours: int):
+    t = np.arange(first_hour, first_hour + hours)
+    # Winter peaks, a daily cycle and heavy-tailed noise
+    season = 1 + 0.6 * np.cos(2 * np.pi * (t / (24 * 365.25)))
+    daily = 1 + 0.2 * np.sin(2 * np.pi * (t % 24) / 24)
+    pm25 = rng.gamma(2.0, rng.uniform(4, 20), hours) * season * daily
+    pm25[rng.random(hours) < 0.01] = np.nan
+    return {
+        "pm25": pm25,
+        "aqi": np.minimum(pm25 * 3.2, 500),
+        "safety": np.clip(rng.normal(rng.uniform(55, 90), 6, hours), 0, 100)
+    }
+
+def full_pass(history: exposure.CityHistory, metric: str):
+    """Per-year mean and p95 straight from the hourly series"""
+    values = np.asarray(history.series(metric), dtype=np.float64)
+    years = (history.start_hour + np.arange(history.hours)).astype("datetime64[h]").astype("datetime64[Y]")
+    return [
+        (np.nanmean(values[years == year]), np.nanpercentile(values[years == year], 95))
+        for year in np.unique(years)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type=int, default=200)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+    rng = np.random.default_rng(7)
+    cities = [f"City {i}" for i in range(args.cities)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = exposure.ExposureStore(Path(directory))
+
+        start = time.perf_counter()
+        for year in range(args.years):
+            first_hour = START + year * HOURS_PER_YEAR
+            for city in cities:
+                store.append(city, first_hour, synthetic_year(rng, first_hour, HOURS_PER_YEAR))
+        backfill_time = time.perf_counter() - start
+        hours = args.years * HOURS_PER_YEAR
+        series_bytes = sum(path.stat().st_size for path in Path(directory).rglob("*.f4"))
+        months_bytes = sum(path.stat().st_size for path in Path(directory).rglob("*.months"))
+
+        first_hour = START + hours
+        start = time.perf_counter()
+        for city in cities:
+            store.append(city, first_hour, synthetic_year(rng, first_hour, 24))
+        append_time = (time.perf_counter() - start) / args.cities
+
+        start = time.perf_counter()
+        for city in cities:
+            store.history(city).summary()
+        summary_time = (time.perf_counter() - start) / args.cities
+
+        # Again, traced (tracemalloc slows every allocation down)
+        tracemalloc.start()
+        for city in cities:
+            store.history(city).summary()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        histories = [store.history(city) for city in cities[:SAMPLE]]
+        start = time.perf_counter()
+        annual = [history.annual("pm25") for history in histories]
+        annual_time = (time.perf_counter() - start) / SAMPLE
+        start = time.perf_counter()
+        scanned = [full_pass(history, "pm25") for history in histories]
+        scan_time = (time.perf_counter() - start) / SAMPLE
+
+        errors = []
+        for rows, exact in zip(annual, scanned):
+            for row, (mean, p95) in zip(rows, exact):
+                assert abs(row["mean"] - mean) < 1e-6
+                errors.append(abs(row["p95"] - p95))
+
+        print(f"{args.cities} cities x {args.years} years = {args.cities * (hours + 24) * len(exposure.METRICS):,} hourly values")
+        print(f"On disk: series {series_bytes / 2**20:,.1f} MB, monthly aggregates {months_bytes / 2**20:,.1f} MB")
+        print(f"Backfill, a year per append: {backfill_time:.1f} s ({args.cities * hours * len(exposure.METRICS) / backfill_time:,.0f} values/s)")
+        print(f"Append one day to a city (re-aggregates the current month): {append_time * 1000:.2f} ms")
+        print(f"Summary per city from the aggregates: {summary_time * 1000:.2f} ms "
+              f"(peak Python memory over all cities {peak / 2**20:.1f} MB)")
+        print(f"PM2.5 per-year statistics for a city: {annual_time * 1000:.2f} ms from the aggregates, "
+              f"{scan_time * 1000:.2f} ms from a full pass over the hours")
+        print(f"Histogram p95 vs exact, per city-year: max error {max(errors):.3f}, mean {np.mean(errors):.3f}")
+
+if __name__ == "__main__":
+    main()
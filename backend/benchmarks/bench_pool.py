@@ -0,0 +1,128 @@
+"""
+Pooled vs per-call connections to the data sources
+
+Starts the stub data-source server (stub_sources.py) in a subprocess and
+runs full orchestrator simulations against it, first with the shared
+keep-alive pool and then with a fresh connection for every lookup. Each
+simulation uses new location names so every lookup misses the cache and
+goes over HTTP
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_pool
+    python -m benchmarks.bench_pool --latency-ms 5 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+import httpx
+
+from agents.concurrency import DEFAULT_SOURCE_LIMITS
+from agents.data_sources import DataSourceClient
+from agents.orchestrator import AgentOrchestrator
+
+CITIES_PER_SIMULATION = 5
+# Lookups per city: 3 actuary, 2 fiscal ghost, 1 nexus
+LOOKUPS_PER_CITY = 6
+
+class PerCallClient(DataSourceClient):
+    """Opens and closes a connection for every lookup"""
+
+    async def _send(self, url, params):
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            return await client.get(url, params=params)
+
+def start_stub(latency_ms: float, workers: int):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "stub_sources:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env={**os.environ, "STUB_LATENCY_MS": str(latency_ms)},
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"{base_url}/air_quality/ping")
+            return base_url, process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Stub server did not start within 30s")
+
+async def run_mode(name: str, client: DataSourceClient, simulations: int, concurrency: int):
+    # No agent-side queueing, so the connection handling is what is measured
+    orchestrator = AgentOrchestrator(
+        source_limits={source: 1000 for source in DEFAULT_SOURCE_LIMITS},
+        data_sources=client
+    )
+    counter = itertools.count()
+    latencies: List[float] = []
+
+    async def simulate():
+        batch = next(counter)
+        start = time.perf_counter()
+        await orchestrator.run_simulation(
+            current_location="San Francisco",
+            target_locations=[f"City {batch}-{i}" for i in range(CITIES_PER_SIMULATION)],
+            salary=120000,
+            currency="USD",
+            preferences={}
+        )
+        latencies.append(time.perf_counter() - start)
+
+    async def worker(runs: int):
+        for _ in range(runs):
+            await simulate()
+
+    # Warm up (connections, treaty store)
+    await simulate()
+    latencies.clear()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(simulations // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await orchestrator.aclose()
+
+    lookups = len(latencies) * CITIES_PER_SIMULATION * LOOKUPS_PER_CITY
+    ordered = sorted(latencies)
+    print(
+        f"{name:<9} | {len(latencies) / elapsed:8.1f} | {lookups / elapsed:9.0f} | "
+        f"{statistics.median(ordered) * 1000:8.1f} | {ordered[int(0.99 * (len(ordered) - 1))] * 1000:8.1f}"
+    )
+
+async def main(base_url: str, simulations: int, concurrency: int):
+    sources = ["air_quality", "healthcare", "safety", "cost_of_living", "exchange_rates", "regulatory"]
+    base_urls = {source: f"{base_url}/{source}" for source in sources}
+
+    print(f"{simulations} simulations x {CITIES_PER_SIMULATION} cities, {concurrency} concurrent")
+    print("mode      |  sims/s  | lookups/s | p50 (ms) | p99 (ms)")
+    await run_mode("pooled", DataSourceClient(base_urls), simulations, concurrency)
+    await run_mode("per-call", PerCallClient(base_urls), simulations, concurrency)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-call data-source connections")
+    parser.add_argument("--latency-ms", type=float, default=2, help="Stub server latency per lookup")
+    parser.add_argument("--simulations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--stub-workers", type=int, default=1, help="Stub server processes")
+    args = parser.parse_args()
+
+    url, stub = start_stub(args.latency_ms, args.stub_workers)
+    try:
+        asyncio.run(main(url, args.simulations, args.concurrency))
+    finally:
+        stub.terminate()
+        stub.wait()
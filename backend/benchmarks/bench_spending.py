@@ -0,0 +1,96 @@
+"""
+Spending replay benchmark over long transaction histories
+
+Streams synthetic Plaid-style histories of 10k to 500k transactions through
+SpendingHistory (generated lazily, never held as a list) and reports
+throughput and the peak memory of ingestion, which should stay flat as the
+history grows. Then replays one profile against 1,000 cities with a
+single matrix multiply, next to the per-city dict replay it replaces
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_spending
+"""
+
+import random
+import time
+import tracemalloc
+
+from agents import spending
+from agents.fiscal_ghost_agent import FiscalGhostAgent
+
+HISTORY_SIZES = [10_000, 100_000, 500_000]
+CITY_COUNT = 1000
+REPLAYS = 200
+
+CATEGORIES = [
+    ("RENT_AND_UTILITIES", "RENT_AND_UTILITIES_RENT", 1500.0),
+    ("RENT_AND_UTILITIES", "RENT_AND_UTILITIES_GAS_AND_ELECTRICITY", 90.0),
+    ("FOOD_AND_DRINK", "FOOD_AND_DRINK_COFFEE", 5.0),
+    ("FOOD_AND_DRINK", "FOOD_AND_DRINK_RESTAURANT", 35.0),
+    ("FOOD_AND_DRINK", "FOOD_AND_DRINK_GROCERIES", 60.0),
+    ("TRANSPORTATION", "TRANSPORTATION_TAXIS_AND_RIDE_SHARES", 18.0),
+    ("ENTERTAINMENT", "ENTERTAINMENT_TV_AND_MOVIES", 15.0),
+    ("GENERAL_MERCHANDISE", "GENERAL_MERCHANDISE_CLOTHING_AND_ACCESSORIES", 80.0),
+    ("MEDICAL", "MEDICAL_PHARMACIES_AND_SUPPLEMENTS", 25.0),
+    ("PERSONAL_CARE", "PERSONAL_CARE_GYMS_AND_FITNESS_CENTERS", 50.0),
+    ("TRANSFER_OUT", "TRANSFER_OUT_SAVINGS", 500.0)
+]
+
+def transactions(count: int, seed: int = 7):
+    # ~3,000 transactions a month, oldest first
+    rng = random.Random(seed)
+    for i in range(count):
+        month = i // 3000
+        primary, detailed, typical = rng.choice(CATEGORIES)
+        yield {
+            "date": f"{2000 + month // 12}-{month % 12 + 1:02d}-{rng.randint(1, 28):02d}",
+            "amount": round(typical * rng.uniform(0.5, 1.5), 2),
+            "personal_finance_category": {"primary": primary, "detailed": detailed}
+        }
+
+def city_prices(rng: random.Random):
+    return {
+        "housing_index": rng.uniform(0.4, 2.0),
+        "food_index": rng.uniform(0.5, 1.5),
+        "transportation_index": rng.uniform(0.5, 1.5),
+        "entertainment_index": rng.uniform(0.5, 1.5),
+        "healthcare_index": rng.uniform(0.3, 1.5),
+        "utilities_index": rng.uniform(0.5, 1.5),
+        "coffee_price": rng.uniform(1.0, 7.0),
+        "gym_membership": rng.uniform(15, 120)
+    }
+
+def main():
+    print(f"{'transactions':>12} | {'seconds':>8} | {'rows/s':>10} | {'peak KB':>8}")
+    profile = None
+    for count in HISTORY_SIZES:
+        tracemalloc.start()
+        start = time.perf_counter()
+        history = spending.SpendingHistory().ingest(transactions(count))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profile = history.monthly()
+        print(f"{count:>12,} | {elapsed:>8.2f} | {count / elapsed:>10,.0f} | {peak / 1024:>8,.1f}")
+    print("(rows/s includes generating the synthetic transactions)")
+    
+    rng = random.Random(11)
+    prices = [city_prices(rng) for _ in range(CITY_COUNT)]
+    rates = [rng.uniform(0.5, 40) for _ in range(CITY_COUNT)]
+    agent = FiscalGhostAgent()
+    
+    start = time.perf_counter()
+    for _ in range(REPLAYS):
+        vectorized = spending.replayed_dicts(spending.replay(profile, prices, rates))
+    matrix_time = (time.perf_counter() - start) / REPLAYS
+    
+    start = time.perf_counter()
+    per_city = [agent._replay_expenses(profile, city, rate) for city, rate in zip(prices, rates)]
+    loop_time = time.perf_counter() - start
+    assert all(abs(a[k] - b[k]) < 1e-6 for a, b in zip(vectorized, per_city) for k in a)
+    
+    print(f"Replay against {CITY_COUNT:,} cities (one matmul): {matrix_time * 1000:8.2f} ms")
+    print(f"Replay against {CITY_COUNT:,} cities (per city):   {loop_time * 1000:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Treaty store benchmark at ~3,000 bilateral treaties
+
+Generates a synthetic source with 200 countries and 3,000 treaties
+(7 articles each), ingests it, then measures cold-start open time, pair
+lookup latency and article search latency (global and per treaty)
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_treaties
+"""
+
+import csv
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agents.treaties import TreatyStore, ingest
+
+COUNTRY_COUNT = 200
+TREATY_COUNT = 3000
+LOOKUPS = 100_000
+SEARCHES = 500
+
+ARTICLES = [
+    (4, "Resident", "person liable to tax by reason of domicile residence place of management permanent home centre of vital interests"),
+    (10, "Dividends", "dividends paid by a company resident may be taxed gross amount withholding rate beneficial owner"),
+    (11, "Interest", "interest arising in a contracting state paid to a resident may be taxed where it arises"),
+    (12, "Royalties", "royalties arising beneficially owned payments for the use of copyright patent trade mark"),
+    (15, "Income from Employment", "salaries wages remuneration employment exercised present 183 days employer permanent establishment"),
+    (18, "Pensions", "pensions and other similar remuneration in consideration of past employment taxable only in residence state"),
+    (23, "Elimination of Double Taxation", "deduction from the tax on income equal to income tax paid credit exemption with progression")
+]
+
+QUERIES = [
+    "salary employment 183 days",
+    "dividends withholding beneficial owner",
+    "pension past employment",
+    "tie breaker permanent home vital interests",
+    "credit for foreign tax paid"
+]
+
+def write_source(directory: Path, rng: random.Random):
+    codes = [f"C{i:03d}" for i in range(COUNTRY_COUNT)]
+    with open(directory / "countries.csv", "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["code", "name", "aliases", "cities"])
+        for code in codes:
+            writer.writerow([code, f"Country {code}", "", f"capital {code.lower()}"])
+    
+    pairs = set()
+    while len(pairs) < TREATY_COUNT:
+        origin, target = rng.sample(codes, 2)
+        pairs.add(tuple(sorted((origin, target))))
+    
+    with open(directory / "treaties.jsonl", "w") as handle:
+        for origin, target in sorted(pairs):
+            handle.write(json.dumps({
+                "origin": origin,
+                "target": target,
+                "treaty_year": rng.randint(1960, 2024),
+                "relief_percentage": round(rng.uniform(0, 0.25), 3),
+                "exempt_categories": rng.sample(["pension", "royalties", "students", "government_service"], 2),
+                "withholding_rates": {
+                    "dividends": rng.choice([0.0, 0.05, 0.10, 0.15]),
+                    "interest": rng.choice([0.0, 0.10, 0.15]),
+                    "royalties": rng.choice([0.0, 0.05, 0.10])
+                },
+                "tie_breaker_rules": rng.choice(["permanent_home", "centre_of_vital_interests", "residence_based"]),
+                "articles": [
+                    {"number": number, "title": title, "text": f"{text} {origin} {target} " * 3}
+                    for number, title, text in ARTICLES
+                ]
+            }) + "\n")
+    return sorted(pairs)
+
+def percentile_us(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] * 1e6
+
+def main():
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        source, compiled = Path(tmp) / "source", Path(tmp) / "compiled"
+        source.mkdir()
+        pairs = write_source(source, rng)
+        
+        start = time.perf_counter()
+        counts = ingest(source, compiled)
+        ingest_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        store = TreatyStore(compiled)
+        open_time = time.perf_counter() - start
+        
+        queries = [rng.choice(pairs) for _ in range(LOOKUPS)]
+        start = time.perf_counter()
+        first = store.lookup(*queries[0])
+        first_lookup_time = time.perf_counter() - start
+        assert first["treaty_exists"]
+        
+        start = time.perf_counter()
+        for origin, target in queries:
+            store.treaty_row(origin, target)
+        row_time = (time.perf_counter() - start) / LOOKUPS
+        
+        lookup_samples = []
+        for origin, target in queries[:20_000]:
+            start = time.perf_counter()
+            store.lookup(origin, target)
+            lookup_samples.append(time.perf_counter() - start)
+        
+        pair_search, global_search = [], []
+        for i in range(SEARCHES):
+            query = QUERIES[i % len(QUERIES)]
+            origin, target = queries[i]
+            start = time.perf_counter()
+            store.search(query, origin, target)
+            pair_search.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            store.search(query)
+            global_search.append(time.perf_counter() - start)
+    
+    print(f"Treaties: {counts['treaties']:,}  chunks: {counts['chunks']:,}  terms: {counts['terms']:,}")
+    print(f"Ingest:                      {ingest_time * 1000:9.1f} ms")
+    print(f"Cold start (open, mmap):     {open_time * 1000:9.2f} ms")
+    print(f"First lookup after open:     {first_lookup_time * 1e6:9.1f} us")
+    print(f"Pair row lookup (mean):      {row_time * 1e6:9.2f} us")
+    print(f"Treaty terms lookup p50/p99: {percentile_us(lookup_samples, 50):9.2f} / {percentile_us(lookup_samples, 99):.2f} us")
+    print(f"Search in one treaty p50/p99:{statistics.median(pair_search) * 1000:9.3f} / {percentile_us(pair_search, 99) / 1000:.3f} ms")
+    print(f"Search all treaties p50/p99: {statistics.median(global_search) * 1000:9.3f} / {percentile_us(global_search, 99) / 1000:.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark harness behind benchmarks/suite.py
+
+A case is a zero-argument callable, sync or async, run a fixed number of
+times after a warmup. Each case reports ops/sec, latency percentiles and
+the peak memory Python allocated during one operation (tracemalloc, in a
+separate pass so tracing does not slow the timed runs). Results are saved
+as JSON with the environment they were measured in, and compared with a
+baseline file: a case whose ops/sec dropped by more than the allowed
+percentage fails the run
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class Case:
+    name: str
+    group: str
+    func: Callable[[], Any]
+    iterations: int
+    warmup: int
+
+
+class Suite:
+    def __init__(self, name: str):
+        self.name = name
+        self.cases: List[Case] = []
+
+    def case(self, group: str, name: str, iterations: int = 200, warmup: int = 10):
+        """Decorator registering a zero-argument callable as `group.name`"""
+        def decorator(func):
+            self.cases.append(Case(f"{group}.{name}", group, func, iterations, warmup))
+            return func
+        return decorator
+
+
+async def _call(func: Callable[[], Any]):
+    result = func()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def _measure(case: Case, iterations: int) -> Dict[str, float]:
+    for _ in range(case.warmup):
+        await _call(case.func)
+
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        await _call(case.func)
+        timings[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        await _call(case.func)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) * 1000
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / timings.sum(), 2),
+        "mean_ms": round(timings.mean() * 1000, 4),
+        "p50_ms": round(p50, 4),
+        "p95_ms": round(p95, 4),
+        "p99_ms": round(p99, 4),
+        "max_ms": round(timings.max() * 1000, 4),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+async def _run_cases(cases: List[Case], scale: float) -> Dict[str, Any]:
+    results = {}
+    for case in cases:
+        iterations = max(1, int(case.iterations * scale))
+        results[case.name] = {"group": case.group, **await _measure(case, iterations)}
+        print(f"  {case.name:<40} {results[case.name]['ops_per_sec']:>12,.1f} ops/s", file=sys.stderr)
+    return results
+
+
+def run(suite: Suite, only: Optional[str] = None, scale: float = 1.0) -> Dict[str, Any]:
+    """Run the suite's cases (those whose name contains `only`) in one event loop"""
+    cases = [case for case in suite.cases if not only or only in case.name]
+    results = asyncio.run(_run_cases(cases, scale))
+    return {
+        "suite": suite.name,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Names of cases whose ops/sec fell more than max_regression percent below the baseline"""
+    regressed = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        drop = (before["ops_per_sec"] - result["ops_per_sec"]) / before["ops_per_sec"] * 100
+        result["baseline_ops_per_sec"] = before["ops_per_sec"]
+        result["change_pct"] = round(-drop, 1)
+        if drop > max_regression:
+            regressed.append(name)
+    return regressed
+
+
+def print_table(report: Dict[str, Any]):
+    print(f"{'case':<40} | {'ops/s':>11} | {'p50 ms':>9} | {'p95 ms':>9} | {'p99 ms':>9} | {'peak KB':>9} | vs baseline")
+    for name, result in report["results"].items():
+        change = f"{result['change_pct']:+.1f}%" if "change_pct" in result else "-"
+        print(
+            f"{name:<40} | {result['ops_per_sec']:>11,.1f} | {result['p50_ms']:>9.3f} | {result['p95_ms']:>9.3f}"
+            f" | {result['p99_ms']:>9.3f} | {result['peak_memory_kb']:>9,.1f} | {change}"
+        )
+
+
+def main(suite: Suite, argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=f"{suite.name} benchmark suite")
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every case's iteration count")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--max-regression", type=float, default=float(os.getenv("BENCH_MAX_REGRESSION", "15")),
+                        help="fail when a case's ops/sec drops by more than this percent (default 15)")
+    args = parser.parse_args(argv)
+
+    report = run(suite, args.only, args.scale)
+    regressed = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressed = compare(report, json.load(f), args.max_regression)
+    print_table(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    if regressed:
+        print(f"Regressed by more than {args.max_regression:g}%: {', '.join(regressed)}")
+        return 1
+    return 0
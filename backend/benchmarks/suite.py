@@ -0,0 +1,94 @@
+"""
+Benchmark suite for the backend simulation pipeline
+
+Covers each agent's analysis, AgentOrchestrator.run_simulation for 1 and
+25 locations, and the HTTP layer through an in-process ASGI client. The
+agents' built-in mock data normally sleeps 100 ms per lookup to stand in
+for a data source; the suite sets that to zero (MOCK_LATENCY) so the
+numbers reflect the agents' own work. Pooled-HTTP behaviour against real
+latency is what benchmarks/bench_pool.py measures
+
+Run from the backend/ directory:
+    python -m benchmarks.suite --output benchmarks/results/backend.json
+    python -m benchmarks.suite --baseline benchmarks/results/backend.json --max-regression 10
+
+Exits with status 1 when any case's ops/sec falls more than
+--max-regression percent (default 15, or BENCH_MAX_REGRESSION) below the
+baseline
+"""
+
+import sys
+
+import httpx
+
+from agents import data_sources
+from agents.orchestrator import AgentOrchestrator, SimulationContext
+from benchmarks.harness import Suite, main
+from main import app
+
+LOCATIONS = ["Lisbon", "Berlin", "Dubai", "Singapore", "Austin", "Mexico City", "Bangkok", "London", "Tokyo",
+             "Toronto", "Paris", "Madrid", "Amsterdam", "Zurich", "Sydney", "Seoul", "Dublin", "Prague",
+             "Vienna", "Warsaw", "Bali", "Cape Town", "Buenos Aires", "Montreal", "Barcelona"]
+
+SIMULATION = {
+    "current_location": "San Francisco",
+    "target_locations": LOCATIONS[:1],
+    "salary": 120000,
+    "currency": "USD",
+    "preferences": {},
+    "financial_data": None
+}
+PAYLOAD = {
+    "current_location": "San Francisco",
+    "target_locations": LOCATIONS[:1],
+    "current_salary": 120000,
+    "currency": "USD",
+    "lifestyle_preferences": {}
+}
+
+suite = Suite("backend")
+
+orchestrator = AgentOrchestrator(data_sources=data_sources.DataSourceClient())
+context = SimulationContext(**SIMULATION)
+_client = None
+
+def client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        app.state.orchestrator = AgentOrchestrator(data_sources=data_sources.DataSourceClient())
+        _client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    return _client
+
+@suite.case("agents", "actuary.analyze_life_quality", iterations=1000)
+async def actuary_analyze():
+    await orchestrator.actuary.analyze_life_quality(context)
+
+@suite.case("agents", "fiscal_ghost.analyze_expenses", iterations=1000)
+async def fiscal_ghost_analyze():
+    await orchestrator.fiscal_ghost.analyze_expenses(context)
+
+@suite.case("agents", "nexus.analyze_compliance", iterations=1000)
+async def nexus_analyze():
+    await orchestrator.nexus.analyze_compliance(context)
+
+@suite.case("orchestrator", "run_simulation_1", iterations=500)
+async def run_simulation_one():
+    await orchestrator.run_simulation(**SIMULATION)
+
+@suite.case("orchestrator", "run_simulation_25", iterations=100)
+async def run_simulation_many():
+    await orchestrator.run_simulation(**{**SIMULATION, "target_locations": LOCATIONS})
+
+@suite.case("http", "simulate_1", iterations=300)
+async def http_simulate_one():
+    response = await client().post("/simulate", json=PAYLOAD)
+    response.raise_for_status()
+
+@suite.case("http", "simulate_25", iterations=100)
+async def http_simulate_many():
+    response = await client().post("/simulate", json={**PAYLOAD, "target_locations": LOCATIONS})
+    response.raise_for_status()
+
+if __name__ == "__main__":
+    data_sources.MOCK_LATENCY = 0
+    sys.exit(main(suite))
@@ -1,9 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+import json
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Any, AsyncIterator, List, Dict, Optional
+
+from agents.data_sources import DataSourceClient
+from agents.orchestrator import AgentOrchestrator
+from shared import encoding, fx, instrumentation
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One orchestrator and connection pool for the whole process
+    app.state.orchestrator = AgentOrchestrator(data_sources=DataSourceClient.from_env())
+    yield
+    await app.state.orchestrator.aclose()
+
+instrumentation.configure_logging()
+
+app = FastAPI(title="Equinox Flow API", version="1.0.0", lifespan=lifespan)
 
-app = FastAPI(title="Equinox Flow API", version="1.0.0")
+app.add_middleware(instrumentation.InstrumentationMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,21 +39,98 @@ class SimulationRequest(BaseModel):
     current_salary: float
     currency: str
     lifestyle_preferences: Dict
+    financial_data: Optional[Dict] = None
+
+def simulation_kwargs(request: SimulationRequest) -> Dict[str, Any]:
+    return {
+        "current_location": request.current_location,
+        "target_locations": request.target_locations,
+        "salary": request.current_salary,
+        "currency": request.currency,
+        "preferences": request.lifestyle_preferences,
+        "financial_data": request.financial_data
+    }
 
 @app.get("/")
 async def root():
     return {"message": "Equinox Flow - Agentic Financial Digital Twin"}
 
+def response_format(http_request: Request) -> str:
+    """Media type negotiated from Accept (see shared/encoding.py); 406 if none fits"""
+    media_type = encoding.negotiate(http_request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Supported formats: {', '.join(encoding.available_formats())}"
+        )
+    return media_type
+
 @app.post("/simulate")
-async def run_simulation(request: SimulationRequest):
+async def run_simulation(request: SimulationRequest, http_request: Request):
     """Run the full agentic simulation"""
-    return {
-        "scenarios": [],
-        "risk_analysis": {},
-        "compliance_summary": {},
-        "recommendations": []
-    }
+    media_type = response_format(http_request)
+    try:
+        result = await http_request.app.state.orchestrator.run_simulation(**simulation_kwargs(request))
+    except fx.UnknownCurrency as e:
+        raise HTTPException(status_code=422, detail=e.args[0])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return encoding.encoded_response(result, media_type)
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+async def stream_events(orchestrator: AgentOrchestrator, kwargs: Dict[str, Any]) -> AsyncIterator[str]:
+    try:
+        async for section, result in orchestrator.stream_simulation(**kwargs):
+            yield sse_event(section, result)
+    except Exception as e:
+        yield sse_event("error", {"detail": str(e)})
+        return
+    yield sse_event("done", {"status": "success"})
+
+@app.post("/simulate/stream")
+async def run_simulation_stream(request: SimulationRequest, http_request: Request):
+    """Run the simulation, sending each agent's section as Server-Sent Events as soon as it is ready"""
+    orchestrator = http_request.app.state.orchestrator
+    if not orchestrator.data_sources.configured("exchange_rates"):
+        # Rates come from the snapshot: reject a currency it lacks before the stream starts
+        try:
+            fx.current().rate(request.currency, request.currency)
+        except fx.UnknownCurrency as e:
+            raise HTTPException(status_code=422, detail=e.args[0])
+    return StreamingResponse(
+        stream_events(orchestrator, simulation_kwargs(request)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def source_cache_families(orchestrator: AgentOrchestrator) -> List[instrumentation.Family]:
+    stats = orchestrator.source_cache.stats()
+    lookups = instrumentation.Family(
+        "source_cache_lookups", "counter", "Data-source cache lookups by result", ("source", "result")
+    )
+    for source, counts in stats["sources"].items():
+        for result, count in counts.items():
+            lookups.values[(source, result)] = count
+    backend = instrumentation.Family(
+        "source_cache_backend_lookups", "counter", "Lookups answered by the cache backend, by result", ("result",)
+    )
+    backend.values = {("hit",): stats["hits"], ("miss",): stats["misses"]}
+    removals = instrumentation.Family("source_cache_removals", "counter", "Entries dropped from the source cache", ("reason",))
+    removals.values = {("eviction",): stats["evictions"], ("expiration",): stats["expirations"]}
+    return [lookups, backend, removals]
+
+@app.get("/metrics")
+async def metrics(http_request: Request):
+    """Prometheus metrics: request, agent method and external call timings, cache lookups"""
+    body = instrumentation.REGISTRY.render(source_cache_families(http_request.app.state.orchestrator))
+    return Response(body, media_type=instrumentation.CONTENT_TYPE)
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy"}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,81 @@
+"""
+Local stub of the external data sources
+Serves the same payloads the agents mock, over HTTP, with a configurable
+latency, so the pooled client can be exercised and benchmarked locally
+
+    STUB_LATENCY_MS=20 uvicorn stub_sources:app --port 9000
+    DATA_SOURCE_URL=http://127.0.0.1:9000 uvicorn main:app
+"""
+
+import asyncio
+import os
+
+from fastapi import FastAPI
+
+LATENCY = float(os.getenv("STUB_LATENCY_MS", "20")) / 1000
+
+app = FastAPI(title="Equinox Flow data-source stub")
+
+async def respond(payload):
+    await asyncio.sleep(LATENCY)
+    return payload
+
+@app.get("/air_quality/{location}")
+async def air_quality(location: str):
+    return await respond({"aqi": 45, "pm25": 12, "status": "good"})
+
+@app.get("/healthcare/{location}")
+async def healthcare(location: str):
+    return await respond({"wait_time_days": 5, "quality_score": 0.85, "cost_index": 1.2})
+
+@app.get("/safety/{location}")
+async def safety(location: str):
+    return await respond({"safety_score": 0.82, "crime_rate": 0.03, "political_stability": 0.9})
+
+@app.get("/cost_of_living/{location}")
+async def cost_of_living(location: str):
+    return await respond({
+        "housing_index": 1.2,
+        "food_index": 0.9,
+        "transportation_index": 1.1,
+        "entertainment_index": 1.0,
+        "healthcare_index": 0.8,
+        "coffee_price": 4.50,
+        "gym_membership": 60,
+        "utilities_index": 1.3
+    })
+
+@app.get("/exchange_rates/{location}")
+async def exchange_rates(location: str, base: str = "USD"):
+    return await respond({"base": base, "rate": 1.0})
+
+@app.get("/regulatory/{location}")
+async def regulatory(location: str, salary: float = 0):
+    return await respond({
+        "visa_requirements": {
+            "type": "work_visa",
+            "processing_time_days": 45,
+            "renewal_frequency_years": 2,
+            "cost": 1200
+        },
+        "banking_requirements": {
+            "minimum_deposit": 5000,
+            "documentation_needed": ["apostilled_bank_statements", "employment_contract", "tax_returns"],
+            "processing_time_days": 14
+        },
+        "tax_registration": {
+            "required": True,
+            "deadline_days": 30,
+            "penalties_for_late": salary * 0.05
+        },
+        "health_insurance": {
+            "mandatory": True,
+            "minimum_coverage": 50000,
+            "monthly_cost": salary * 0.08 / 12
+        },
+        "social_security": {
+            "contribution_rate": 0.15,
+            "employer_contribution": 0.20,
+            "benefits_eligibility_years": 5
+        }
+    })
@@ -0,0 +1,238 @@
+import asyncio
+import inspect
+import time
+
+import numpy as np
+
+from agents import exposure, spending, tax_engine, treaties
+from agents.actuary_agent import ActuaryAgent
+from agents.concurrency import SourceLimiter, limited
+from agents.fiscal_ghost_agent import FiscalGhostAgent
+from agents.nexus_agent import NexusAgent
+from agents.orchestrator import AgentOrchestrator, SimulationContext
+from shared import fx, montecarlo
+from shared.projection import project_wealth
+
+LOOKUP_DELAY = 0.05
+
+def make_context(cities):
+    return SimulationContext(
+        current_location="San Francisco",
+        target_locations=[f"City {i}" for i in range(cities)],
+        salary=120000,
+        currency="USD",
+        preferences={}
+    )
+
+def timed_run(orchestrator, cities):
+    context = make_context(cities)
+    start = time.perf_counter()
+    result = asyncio.run(orchestrator.run_simulation(**vars(context)))
+    return time.perf_counter() - start, result
+
+def test_wall_time_tracks_slowest_lookup_not_city_count():
+    # Limits high enough that no data source queues
+    orchestrator = AgentOrchestrator(source_limits={source: 100 for source in SourceLimiter().limits})
+    
+    one_city_time, _ = timed_run(orchestrator, 1)
+    many_cities_time, result = timed_run(orchestrator, 25)
+    
+    assert len(result["risk_analysis"]) == 25
+    assert len(result["compliance_summary"]) == 25
+    # Serial lookups would take 25x longer; concurrent ones stay near one city
+    assert many_cities_time < one_city_time * 2
+
+def test_source_limit_caps_in_flight_lookups():
+    limiter = SourceLimiter({"air_quality": 2})
+    agent = ActuaryAgent(limiter)
+    in_flight = 0
+    peak = 0
+    
+    original = inspect.unwrap(ActuaryAgent._get_air_quality)
+    
+    async def tracked(self, location):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(LOOKUP_DELAY)
+        in_flight -= 1
+        return await original(self, location)
+    
+    # Re-apply the limiter around the instrumented lookup
+    agent._get_air_quality = limited("air_quality")(tracked).__get__(agent)
+    
+    start = time.perf_counter()
+    result = asyncio.run(agent.analyze_life_quality(make_context(6)))
+    elapsed = time.perf_counter() - start
+    
+    assert len(result) == 6
+    assert peak == 2
+    # 6 lookups through 2 slots take at least 3 rounds
+    assert elapsed >= 3 * LOOKUP_DELAY
+
+def test_transaction_history_replays_like_a_category_summary():
+    transactions = [
+        {"date": f"2024-{month:02d}-03", "amount": amount, "personal_finance_category": {"primary": primary, "detailed": detailed}}
+        for month in (1, 2)
+        for amount, primary, detailed in [
+            (1200.0, "RENT_AND_UTILITIES", "RENT_AND_UTILITIES_RENT"),
+            (70.0, "FOOD_AND_DRINK", "FOOD_AND_DRINK_COFFEE"),
+            (300.0, "FOOD_AND_DRINK", "FOOD_AND_DRINK_RESTAURANT"),
+            (-5000.0, "INCOME", "INCOME_WAGES")
+        ]
+    ]
+    history = spending.SpendingHistory().ingest(iter(transactions), chunk_size=3)
+    profile = history.monthly()
+    assert history.months == 2
+    assert profile == {"housing": 1200.0, "food_dining": 300.0, "coffee": 70.0}
+    
+    agent = FiscalGhostAgent()
+    prices = [{"housing_index": 1.5, "coffee_price": 7.0}, {"food_index": 0.5, "gym_membership": 20}]
+    projected = spending.replayed_dicts(spending.replay(profile, prices, [1.0, 2.0]))
+    for city_prices, rate, expenses in zip(prices, [1.0, 2.0], projected):
+        assert expenses == agent._replay_expenses(profile, city_prices, rate)
+    assert projected[0]["housing"] == 1800.0
+    assert projected[0]["coffee"] == 140.0
+    assert projected[1]["food_dining"] == 300.0
+    assert projected[1]["gym"] == 40.0
+
+def test_rate_snapshot_triangulates_and_swaps_versions(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text('{"base": "USD", "rates": {"USD": 1.0, "EUR": 0.5, "JPY": 128.0}}')
+    service = fx.FxService(path, check_interval=float("inf"))
+    old = service.current()
+    assert old.rate("EUR", "JPY") == 256.0
+    assert old.convert([10, 256], ["usd", "JPY"], "EUR").tolist() == [5.0, 1.0]
+    
+    path.write_text('{"base": "USD", "rates": {"USD": 1.0, "EUR": 0.25, "JPY": 128.0}}')
+    new = service.refresh()
+    assert new.version != old.version
+    assert service.current() is new
+    # Readers still holding the old snapshot keep its rates
+    assert old.rate("USD", "EUR") == 0.5
+    assert new.rate("EUR", "JPY") == 512.0
+
+def test_tax_obligations_use_bracket_schedules_and_treaty_relief():
+    nexus = NexusAgent()
+    engine = tax_engine.get_tax_engine()
+    
+    async def taxes(origin, target):
+        treaty = nexus.treaty_store.lookup(origin, target)
+        return await nexus._calculate_tax_obligations(120000, origin, target, treaty)
+    
+    # A US citizen in Lisbon still owes US income tax, 15% of the overlap relieved by the treaty
+    lisbon = asyncio.run(taxes("San Francisco", "Lisbon"))
+    portugal = engine.compute("PT", 120000)
+    us_tax = float(engine.compute("US", 120000)["income_tax"])
+    assert lisbon["target_country_tax"] == portugal["income_tax"]
+    assert lisbon["social_security_target"] == portugal["social_security"]
+    assert lisbon["origin_country_tax"] == us_tax
+    assert np.isclose(lisbon["treaty_relief"], 0.15 * min(us_tax, float(portugal["income_tax"])))
+    assert np.isclose(lisbon["net_after_all_taxes"],
+                      120000 - portugal["total_tax"] - us_tax + lisbon["treaty_relief"])
+    
+    # Leaving the UK leaves its tax behind; unscheduled targets pay the flat fallback
+    london = asyncio.run(taxes("London", "Lisbon"))
+    assert london["origin_country_tax"] == london["treaty_relief"] == 0
+    nowhere = asyncio.run(taxes("London", "Atlantis"))
+    assert nowhere["target_country_tax"] == 120000 * 0.30
+    assert nowhere["net_after_all_taxes"] == 120000 * 0.70
+    
+    # Net wealth is the expected projection of the after-tax income, with Monte Carlo bands around it
+    wealth = nexus._calculate_net_wealth(lisbon, 120000)
+    expected = project_wealth(0.0, lisbon["net_after_all_taxes"])
+    assert [wealth["year_1"], wealth["year_3"], wealth["year_5"]] == [expected[0], expected[2], expected[4]]
+    bands = wealth["percentiles"]
+    assert all(low <= high for low, high in zip(bands["p5"], bands["p95"]))
+    assert bands["p5"][-1] < expected[-1] < bands["p95"][-1]
+    # Bands scaled from one unit-income run match a full simulation, losses included
+    for income in (lisbon["net_after_all_taxes"], -20000.0):
+        scaled, full = montecarlo.simulate_income(income), montecarlo.simulate_wealth(0.0, income, 0.0)
+        for name, band in full["percentiles"].items():
+            assert np.allclose(scaled["percentiles"][name], band)
+        assert np.allclose(scaled["mean"], full["mean"])
+        assert scaled["probability_of_loss"] == full["probability_of_loss"]
+
+def test_treaty_store_reingests_when_source_data_changes(tmp_path, monkeypatch):
+    source, compiled = tmp_path / "source", tmp_path / "compiled"
+    source.mkdir()
+    for name in ("countries.csv", "treaties.jsonl"):
+        (source / name).write_bytes((treaties.SOURCE_DIR / name).read_bytes())
+    monkeypatch.setattr(treaties, "SOURCE_DIR", source)
+    monkeypatch.setattr(treaties, "COMPILED_DIR", compiled)
+    monkeypatch.setattr(treaties, "_store", None)
+    assert treaties.get_treaty_store().lookup("US", "PT")["relief_percentage"] == 0.15
+    assert treaties.is_current(source, compiled)
+    
+    path = source / "treaties.jsonl"
+    path.write_text(path.read_text().replace('"relief_percentage": 0.15', '"relief_percentage": 0.25', 1))
+    assert not treaties.is_current(source, compiled)
+    monkeypatch.setattr(treaties, "_store", None)
+    assert treaties.get_treaty_store().lookup("US", "PT")["relief_percentage"] == 0.25
+    assert treaties.is_current(source, compiled)
+
+def test_plan_computes_shared_facts_once_per_request():
+    orchestrator = AgentOrchestrator(source_limits={source: 100 for source in SourceLimiter().limits})
+    context = make_context(5)
+    plan = orchestrator.plan(context)
+    
+    async def run():
+        return await asyncio.gather(
+            orchestrator.fiscal_ghost.analyze_expenses(context, plan),
+            orchestrator.nexus.analyze_compliance(context, plan)
+        )
+    
+    expenses, compliance = asyncio.run(run())
+    summary = plan.summary()
+    assert summary["trust_score"] == {"requested": 5, "computed": 1, "saved": 4}
+    assert summary["regulatory"]["computed"] == 5
+    assert summary["setup_costs"] == {"requested": 10, "computed": 5, "saved": 5}
+    # Both agents report the same visa cost
+    for location in context.target_locations:
+        breakdown = compliance[location]["compliance_costs"]["breakdown"]
+        assert expenses[location]["hidden_costs"]["visa_fees"] == breakdown["visa_and_permits"]
+
+def test_exposure_history_updates_incrementally_and_feeds_the_actuary(tmp_path):
+    rng = np.random.default_rng(7)
+    start = exposure.to_hour("2022-11-20T13")
+    hours = 24 * 500
+    pm25 = rng.gamma(2.0, 10.0, hours).astype(np.float32)
+    pm25[rng.random(hours) < 0.05] = np.nan
+    aqi = pm25 * 4
+    
+    bulk = exposure.ExposureStore(tmp_path / "bulk")
+    bulk.append("Delhi", start, {"pm25": pm25, "aqi": aqi})
+    streamed = exposure.ExposureStore(tmp_path / "streamed")
+    # Appends split mid-month and mid-day, one leaving a gap to be filled
+    cuts = [0, 5, 24 * 40 + 7, 24 * 300, hours]
+    for begin, end in zip(cuts, cuts[1:]):
+        streamed.append("Delhi, India", start + begin, {"pm25": pm25[begin:end], "aqi": aqi[begin:end]})
+    history = streamed.history("delhi")
+    assert history.hours == hours
+    for metric in exposure.METRICS:
+        assert bulk.history("Delhi").months(metric).tobytes() == history.months(metric).tobytes()
+    
+    # Aggregates agree with a full pass over the hours
+    years = (start + np.arange(hours)).astype("datetime64[h]").astype("datetime64[Y]").astype(int) + 1970
+    for row in history.annual("pm25"):
+        values = pm25[(years == row["year"]) & ~np.isnan(pm25)].astype(np.float64)
+        assert row["hours"] == len(values)
+        assert row["exceedance_hours"] == int((values > 35).sum())
+        assert abs(row["mean"] - values.mean()) < 1e-9
+        assert abs(row["p95"] - np.percentile(values, 95)) <= 1.0
+    rolling = history.rolling("pm25", months=12)
+    assert rolling["exceedance_hours"][-1] == history.window("pm25", 12)["exceedance_hours"]
+    
+    agent = ActuaryAgent(exposure_store=streamed)
+    summary = streamed.summary("Delhi")
+    trailing = summary["metrics"]["aqi"]["trailing"]
+    score = agent._calculate_risk_score({"aqi": 10}, {"wait_time_days": 0}, {"safety_score": 1.0}, summary)
+    assert score == min(trailing["mean"] / 100 + trailing["exceedance_share"], 1.0) * 0.3
+    assert streamed.summary("Lisbon") is None
+    
+    # Summaries are served from memory until the next append replaces VERSION
+    assert streamed.is_cached("Delhi") and streamed.summary("Delhi") is summary
+    streamed.append("Delhi", start + hours, {"pm25": [50.0] * 24})
+    assert not streamed.is_cached("Delhi")
+    assert streamed.summary("Delhi")["hours"] == hours + 24
+    assert exposure.ExposureStore(tmp_path / "empty").is_cached("Delhi")
@@ -0,0 +1,123 @@
+import asyncio
+
+from agents.cache import InMemoryBackend, RedisBackend, SourceCache
+from agents.orchestrator import AgentOrchestrator
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class FakeRedis:
+    """Minimal stand-in for redis.asyncio.Redis get/set with expiry"""
+    
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+    
+    async def get(self, key):
+        entry = self.data.get(key)
+        if entry is None or entry[0] <= self.clock():
+            return None
+        return entry[1]
+    
+    async def set(self, key, value, ex=None):
+        self.data[key] = (self.clock() + ex, value)
+
+def counting_fetch(calls, value, delay=0.0):
+    async def fetch():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return fetch
+
+def test_ttl_expiry_per_source():
+    clock = FakeClock()
+    cache = SourceCache(InMemoryBackend(clock=clock), ttls={"air_quality": 60})
+    calls = []
+    
+    async def scenario():
+        await cache.get_or_fetch("air_quality", "Lisbon", counting_fetch(calls, {"aqi": 40}))
+        clock.now = 59
+        await cache.get_or_fetch("air_quality", "Lisbon", counting_fetch(calls, {"aqi": 40}))
+        clock.now = 61
+        await cache.get_or_fetch("air_quality", "Lisbon", counting_fetch(calls, {"aqi": 41}))
+    
+    asyncio.run(scenario())
+    
+    assert len(calls) == 2
+    assert cache.stats()["sources"]["air_quality"] == {"hits": 1, "misses": 2, "coalesced": 0}
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+    assert cache.stats()["expirations"] == 1
+
+def test_lru_eviction():
+    cache = SourceCache(InMemoryBackend(max_entries=2))
+    calls = []
+    
+    async def scenario():
+        for city in ["Lisbon", "Porto", "Lisbon", "Madrid", "Porto"]:
+            await cache.get_or_fetch("safety", city, counting_fetch(calls, city))
+    
+    asyncio.run(scenario())
+    
+    # Madrid evicts Porto (least recently used), so Porto is fetched again
+    assert calls == ["Lisbon", "Porto", "Madrid", "Porto"]
+    assert cache.stats()["evictions"] == 2
+
+def test_concurrent_identical_lookups_single_flight():
+    cache = SourceCache()
+    calls = []
+    
+    async def scenario():
+        return await asyncio.gather(*(
+            cache.get_or_fetch("exchange_rates", "USD:EUR", counting_fetch(calls, 0.92, delay=0.05))
+            for _ in range(10)
+        ))
+    
+    results = asyncio.run(scenario())
+    
+    assert results == [0.92] * 10
+    assert len(calls) == 1
+    assert cache.stats()["sources"]["exchange_rates"]["coalesced"] == 9
+
+def test_redis_backend_with_fake_client():
+    clock = FakeClock()
+    redis = FakeRedis(clock)
+    cache = SourceCache(RedisBackend(redis), ttls={"tax_treaties": 100})
+    calls = []
+    treaty = {"relief_percentage": 0.15}
+    
+    async def scenario():
+        first = await cache.get_or_fetch("tax_treaties", "US:PT", counting_fetch(calls, treaty))
+        second = await cache.get_or_fetch("tax_treaties", "US:PT", counting_fetch(calls, treaty))
+        clock.now = 101
+        await cache.get_or_fetch("tax_treaties", "US:PT", counting_fetch(calls, treaty))
+        return first, second
+    
+    first, second = asyncio.run(scenario())
+    
+    assert first == second == treaty
+    assert len(calls) == 2
+    assert "equinox:source:tax_treaties:US:PT" in redis.data
+    stats = cache.stats()
+    assert stats["sources"]["tax_treaties"] == {"hits": 1, "misses": 2, "coalesced": 0}
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+def test_orchestrator_reuses_cached_lookups():
+    orchestrator = AgentOrchestrator()
+    kwargs = dict(
+        current_location="San Francisco",
+        target_locations=["Lisbon", "Porto"],
+        salary=120000,
+        currency="USD",
+        preferences={}
+    )
+    
+    asyncio.run(orchestrator.run_simulation(**kwargs))
+    asyncio.run(orchestrator.run_simulation(**kwargs))
+    
+    sources = orchestrator.source_cache.stats()["sources"]
+    assert sources["air_quality"] == {"hits": 2, "misses": 2, "coalesced": 0}
+    assert sources["regulatory"] == {"hits": 2, "misses": 2, "coalesced": 0}
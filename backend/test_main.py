@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+PAYLOAD = {
+    "current_location": "San Francisco",
+    "target_locations": ["Lisbon", "Berlin"],
+    "current_salary": 120000,
+    "currency": "USD",
+    "lifestyle_preferences": {}
+}
+
+def test_simulate_uses_one_orchestrator_for_the_app():
+    with TestClient(app) as client:
+        orchestrator = app.state.orchestrator
+        first = client.post("/simulate", json=PAYLOAD)
+        second = client.post("/simulate", json=PAYLOAD)
+    
+        assert first.status_code == second.status_code == 200
+        assert set(first.json()["risk_analysis"]) == {"Lisbon", "Berlin"}
+        assert app.state.orchestrator is orchestrator
+        # The second run is served from the shared cache
+        assert orchestrator.source_cache.stats()["sources"]["air_quality"]["hits"] == 2
+
+def test_stream_sends_each_section_then_done():
+    with TestClient(app) as client:
+        response = client.post("/simulate/stream", json=PAYLOAD)
+    
+    events = [line[len("event: "):] for line in response.text.splitlines() if line.startswith("event: ")]
+    assert set(events[:3]) == {"risk_analysis", "expense_analysis", "compliance_summary"}
+    assert events[3:] == ["scenarios", "recommendations", "done"]
+
+def test_metrics_expose_agent_timings_and_trace_id():
+    with TestClient(app) as client:
+        response = client.post("/simulate", json=PAYLOAD)
+        metrics = client.get("/metrics")
+    
+    assert len(response.headers["x-trace-id"]) == 32
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'equinox_agent_call_seconds_count{component="actuary",method="analyze_life_quality"}' in metrics.text
+    assert 'equinox_http_request_seconds_count{method="POST",route="/simulate",status="200"}' in metrics.text
+    assert "# TYPE equinox_source_cache_lookups_total counter" in metrics.text
+    assert 'equinox_source_cache_backend_lookups_total{result="hit"}' in metrics.text
+
+def test_unknown_currency_is_422_on_every_simulation_endpoint():
+    with TestClient(app) as client:
+        for path in ("/simulate", "/simulate/stream"):
+            response = client.post(path, json={**PAYLOAD, "currency": "XXX"})
+            assert response.status_code == 422
+            assert "XXX" in response.json()["detail"]
@@ -0,0 +1,50 @@
+"""
+core/ and backend/ are separate apps whose top-level modules share names
+(agents, benchmarks, main). Each app's tests are collected and run with
+that app's modules in sys.modules and its directory first on sys.path, so
+one pytest run from the repository root covers both. The top-level
+`shared` package is common to both apps and stays loaded throughout.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent
+APPS = ("backend", "core")
+APP_MODULES = ("agents", "benchmarks", "main")
+
+_modules = {app: {} for app in APPS}
+_active = None
+
+def app_of(path) -> str:
+    parts = Path(path).resolve().relative_to(ROOT).parts
+    return parts[0] if parts and parts[0] in APPS else None
+
+def _app_module(name: str) -> bool:
+    return name.split(".", 1)[0] in APP_MODULES
+
+def activate(app: str):
+    """Swaps the other app's modules out of sys.modules and this app's in"""
+    global _active
+    if app is None or app == _active:
+        return
+    if _active is not None:
+        _modules[_active] = {name: module for name, module in sys.modules.items() if _app_module(name)}
+    for name in [name for name in sys.modules if _app_module(name)]:
+        del sys.modules[name]
+    sys.modules.update(_modules[app])
+    directory = str(ROOT / app)
+    if directory in sys.path:
+        sys.path.remove(directory)
+    sys.path.insert(0, directory)
+    _active = app
+
+def pytest_collectstart(collector):
+    if isinstance(collector, pytest.Module):
+        activate(app_of(collector.path))
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    activate(app_of(item.path))
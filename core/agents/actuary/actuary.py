@@ -1,24 +1,67 @@
-from typing import Dict, Any
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..exposure import ExposureStore, get_exposure_store
+from ..reference import get_city_index
+from ..state import HIGH_RISK_AQI, HIGH_RISK_SAFETY, RiskAnalysis, trailing_mean
+
+logger = logging.getLogger(__name__)
 
 class ActuaryAgent:
-    def __init__(self):
-        pass
+    def __init__(self, exposure_store: Optional[ExposureStore] = None):
+        self._exposure_store = exposure_store
 
-    def analyze_risk(self, target_city: str) -> Dict[str, Any]:
+    @property
+    def exposure_store(self) -> ExposureStore:
+        return self._exposure_store or get_exposure_store()
+
+    async def analyze_risk(self, target_city: str) -> RiskAnalysis:
         """
         Analyzes Life Quality risks for a given city.
         In a real scenario, this would call AQI APIs, Numbeo safety data, etc.
+        Cities with an hourly history are rated on its trailing year.
         """
-        # Mock Data for demo purposes
-        print(f"Actuary: Analyzing risks for {target_city}")
+        logger.debug("Actuary: analyzing risks", extra={"city": target_city})
         
-        # Mock logic based on city name hash or something simple
-        is_risky = len(target_city) % 2 == 0
+        city = get_city_index().lookup(target_city)
         
+        return RiskAnalysis(
+            air_quality_index=city["air_quality_index"],
+            safety_score=city["safety_score"],
+            healthcare_wait_time_hours=city["healthcare_wait_time_hours"],
+            exposure=self.exposure_store.trailing(target_city)
+        )
+
+    def analyze_risk_batch(self, target_cities: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Vectorized analyze_risk: one array per metric, aligned with target_cities.
+        """
+        logger.debug("Actuary: analyzing risks", extra={"cities": len(target_cities)})
+
+        index = get_city_index()
+        rows = index.resolve_many(target_cities)
+        cities = index.records[rows]
+        aqi, safety = cities["air_quality_index"], cities["safety_score"]
+
+        # Cities with an hourly history are rated on its trailing-year means, looked up once per distinct city
+        store = self.exposure_store
+        if store.version != "none":
+            aqi, safety = aqi.copy(), safety.copy()
+            distinct, positions = np.unique(rows, return_inverse=True)
+            for i, row in enumerate(distinct.tolist()):
+                exposure = store.trailing(str(index.city_ids[row]))
+                if exposure is None:
+                    continue
+                selected = positions == i
+                aqi[selected] = trailing_mean(exposure, "aqi", aqi[selected])
+                safety[selected] = trailing_mean(exposure, "safety", safety[selected])
+        is_risky = (aqi > HIGH_RISK_AQI) | (safety < HIGH_RISK_SAFETY)
+
         return {
-            "air_quality_index": 45 if not is_risky else 120,
-            "safety_score": 85 if not is_risky else 60,
-            "healthcare_wait_time_hours": 2 if not is_risky else 14,
-            "overall_risk_rating": "Low" if not is_risky else "High",
-            "notes": "Excellent air quality." if not is_risky else "Pollution warning active."
+            "air_quality_index": cities["air_quality_index"],
+            "safety_score": cities["safety_score"],
+            "healthcare_wait_time_hours": cities["healthcare_wait_time_hours"],
+            "overall_risk_rating": np.where(is_risky, "High", "Low")
         }
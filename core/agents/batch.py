@@ -0,0 +1,72 @@
+"""
+Vectorized batch simulation across many target cities.
+
+Runs the same expense, tax, risk and savings maths as the graph, but as
+NumPy array operations over every city at once, and returns the result as
+a columnar table (one list per column, rows aligned with `cities`).
+
+Wealth is the deterministic expected projection (shared.projection), not
+the Monte Carlo median /simulate reports: with the same draws the median
+still needs a percentile pass over every path for every city and year. The
+two differ by the volatility drag, inflation, FX and expense shocks the
+Monte Carlo model adds, so wealth_year_N here is not /simulate's wealth.
+"""
+
+from typing import Dict, Any, List
+
+import numpy as np
+
+from shared import fx
+from shared.projection import PROJECTION_YEARS, project_wealth_batch
+
+from .actuary.actuary import ActuaryAgent
+from .fiscal_ghost.ghost import FiscalGhostAgent
+from .nexus.nexus import NexusAgent
+from .state import profile_value
+
+actuary = ActuaryAgent()
+ghost = FiscalGhostAgent()
+nexus = NexusAgent()
+
+
+def simulate_batch(current_city: str, target_cities: List[str], user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Simulate relocation from current_city to every city in target_cities.
+    """
+    rates = fx.current()
+    risk = actuary.analyze_risk_batch(target_cities)
+    expenses = ghost.calculate_expenses_batch(user_profile, target_cities, rates)
+    compliance = nexus.analyze_compliance_batch(user_profile, target_cities, current_city)
+
+    # Same savings maths as the graph aggregator, one element per city
+    income = profile_value(user_profile, "annual_income")
+    net_income = income - compliance["estimated_tax"]
+    annual_expenses = expenses["projected_expenses"] * 12
+    savings = net_income - annual_expenses
+
+    current_wealth = profile_value(user_profile, "current_wealth")
+    wealth = project_wealth_batch(current_wealth, savings)
+
+    columns: Dict[str, np.ndarray] = {
+        "col_multiplier": expenses["col_multiplier"],
+        "projected_expenses": expenses["projected_expenses"],
+        "fx_rate": expenses["fx_rate"],
+        "projected_expenses_local": expenses["projected_expenses_local"],
+        "tax_rate": compliance["tax_rate"],
+        "estimated_tax": compliance["estimated_tax"],
+        "treaty_status": compliance["treaty_status"],
+        "air_quality_index": risk["air_quality_index"],
+        "safety_score": risk["safety_score"],
+        "healthcare_wait_time_hours": risk["healthcare_wait_time_hours"],
+        "quality_of_life_score": risk["overall_risk_rating"],
+        "net_annual_savings": savings,
+    }
+    for year in range(PROJECTION_YEARS):
+        columns[f"wealth_year_{year + 1}"] = wealth[:, year]
+
+    return {
+        "current_city": current_city,
+        "cities": list(target_cities),
+        "fx_version": rates.version,
+        "columns": {name: values.tolist() for name, values in columns.items()}
+    }
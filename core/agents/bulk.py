@@ -0,0 +1,223 @@
+"""
+Bulk evaluation of many user profiles against a few target cities.
+
+Profiles arrive as NDJSON (one JSON object per line) and are parsed
+incrementally from the request body, a chunk of bytes at a time. Every
+CHUNK_SIZE profiles are evaluated together: the aggregator's savings
+maths as (profiles, cities) array operations, with tax from the tax
+engine vectorized over the chunk's incomes. Everything that depends only
+on the cities (reference records, the Actuary's risk analysis, exchange
+rates) is computed once per request and sent once, in the header line.
+
+Results stream back as NDJSON too: the header, then one line per profile
+with its figures as lists aligned with the header's cities, then a
+summary. Only one chunk is held at a time, so memory does not grow with
+the number of profiles.
+
+final_wealth is the expected projection, as in the batch endpoint, not
+the Monte Carlo median /simulate reports.
+"""
+
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from fastapi.responses import StreamingResponse
+
+from shared import fx
+from shared.encoding import dumps_json, orjson
+from shared.projection import INVESTMENT_RETURN, PROJECTION_YEARS
+
+from .actuary.actuary import ActuaryAgent
+from .grid import total_tax
+from .reference import get_city_index
+from .state import DEFAULT_PROFILE
+
+# Target cities one bulk request may evaluate against
+MAX_CITIES = int(os.getenv("BULK_MAX_CITIES", "100"))
+# Profiles evaluated per vectorized pass
+CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "2048"))
+# Longest accepted NDJSON line, so one unterminated record cannot grow the buffer forever
+MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", str(1 << 20)))
+
+NDJSON = "application/x-ndjson"
+
+actuary = ActuaryAgent()
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+def _loads(line: bytes) -> Any:
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Complete lines from a stream of byte chunks split anywhere."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        if b"\n" in chunk:
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line
+        if len(buffer) > MAX_LINE_BYTES:
+            raise LineTooLong(f"NDJSON line longer than {MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield buffer
+
+
+class ChunkBuilder:
+    """
+    Collects parsed profiles into columns for one vectorized pass; lines
+    that are not a usable profile become error results instead.
+    """
+
+    def __init__(self, currency_rows: Dict[str, int]):
+        self.currency_rows = currency_rows
+        self.ids: List[Any] = []
+        self.incomes: List[float] = []
+        self.expenses: List[float] = []
+        self.wealth: List[float] = []
+        self.currencies: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, line_number: int, line: bytes) -> Optional[Dict[str, Any]]:
+        """Adds one NDJSON line; returns an error record if it is not a profile."""
+        try:
+            record = _loads(line)
+            # {"id": ..., "user_profile": {...}} or the profile itself
+            profile = record.get("user_profile", record) if isinstance(record, dict) else None
+            if not isinstance(profile, dict):
+                raise ValueError("expected a JSON object")
+            values = {**DEFAULT_PROFILE, **{key: profile[key] for key in DEFAULT_PROFILE if profile.get(key) is not None}}
+            income, expenses, wealth = (float(values[key]) for key in ("annual_income", "monthly_expenses", "current_wealth"))
+            currency = self.currency_rows.get(str(values["currency"]).upper())
+            if currency is None:
+                raise ValueError(f"Unknown currency: {values['currency']}")
+        except (ValueError, TypeError) as e:
+            return {"line": line_number, "error": str(e)}
+        self.ids.append(record.get("id", line_number))
+        self.incomes.append(income)
+        self.expenses.append(expenses)
+        self.wealth.append(wealth)
+        self.currencies.append(currency)
+        return None
+
+
+class BulkEvaluation:
+    """City-level facts for one bulk request, computed once and reused for every chunk."""
+
+    def __init__(self, current_city: str, cities: List[str]):
+        self.current_city = current_city
+        self.cities = list(cities)
+        index = get_city_index()
+        self.records = index.columns(self.cities)
+        self.origin = index.lookup(current_city)["country"]
+        self.risk = actuary.analyze_risk_batch(self.cities)
+        self.rates = fx.current()
+        self.city_currencies = self.rates.indices(self.records["currency"])
+
+    def new_chunk(self) -> ChunkBuilder:
+        return ChunkBuilder(self.rates.index)
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            "type": "header",
+            "current_city": self.current_city,
+            "cities": self.cities,
+            "risk_analysis": {name: values.tolist() for name, values in self.risk.items()},
+            "local_currency": self.records["currency"].tolist(),
+            "projection_years": PROJECTION_YEARS,
+            "fx_version": self.rates.version
+        }
+
+    def evaluate(self, chunk: ChunkBuilder) -> Dict[str, np.ndarray]:
+        """(profiles, cities) arrays for one chunk; the aggregator's savings maths, vectorized."""
+        incomes = np.asarray(chunk.incomes)
+        tax = total_tax(self.records["country"], self.records["tax_rate"], incomes, self.origin).T
+        projected_expenses = np.outer(chunk.expenses, self.records["col_multiplier"])
+        savings = incomes[:, None] - tax - projected_expenses * 12
+
+        # Closed form of the yearly recursion, as in projection.project_wealth_batch
+        growth = (1 + INVESTMENT_RETURN) ** PROJECTION_YEARS
+        final_wealth = np.asarray(chunk.wealth)[:, None] * growth + savings * ((growth - 1) / INVESTMENT_RETURN)
+
+        # Every (profile currency, city currency) rate in one gather
+        fx_rate = self.rates.matrix[np.asarray(chunk.currencies)[:, None], self.city_currencies[None, :]]
+
+        return {
+            "projected_expenses": projected_expenses,
+            "projected_expenses_local": projected_expenses * fx_rate,
+            "estimated_tax": tax,
+            "net_annual_savings": savings,
+            "final_wealth": final_wealth
+        }
+
+    def result_lines(self, chunk: ChunkBuilder) -> bytes:
+        """The chunk's NDJSON result lines, one per profile."""
+        figures = {name: values.tolist() for name, values in self.evaluate(chunk).items()}
+        return b"".join(
+            dumps_json({"id": profile_id, **{name: values[row] for name, values in figures.items()}}) + b"\n"
+            for row, profile_id in enumerate(chunk.ids)
+        )
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator consumes the request body as it
+    goes. Starlette's (before ASGI 2.4) also reads `receive` to watch for
+    disconnects, which would swallow request body messages; here a client
+    disconnect surfaces through the request stream instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+async def evaluate_stream(current_city: str, cities: List[str], body: AsyncIterator[bytes],
+                          chunk_size: int = CHUNK_SIZE,
+                          run: Optional[Callable[..., Awaitable[bytes]]] = None) -> AsyncIterator[bytes]:
+    """
+    NDJSON results for an NDJSON body of profiles. `run(func, *args)` runs
+    each chunk's evaluation (e.g. workers.run_cpu_bound); inline by default.
+    """
+    evaluation = BulkEvaluation(current_city, cities)
+    yield dumps_json(evaluation.header()) + b"\n"
+
+    async def flush(chunk: ChunkBuilder) -> bytes:
+        if run is None:
+            return evaluation.result_lines(chunk)
+        return await run(evaluation.result_lines, chunk)
+
+    profiles = errors = 0
+    line_number = 0
+    too_long = None
+    chunk = evaluation.new_chunk()
+    try:
+        async for line in iter_lines(body):
+            line_number += 1
+            if not line.strip():
+                continue
+            error = chunk.add(line_number, line)
+            if error is not None:
+                errors += 1
+                yield dumps_json(error) + b"\n"
+            elif len(chunk) >= chunk_size:
+                profiles += len(chunk)
+                yield await flush(chunk)
+                chunk = evaluation.new_chunk()
+    except LineTooLong as e:
+        too_long = {"line": line_number + 1, "error": str(e)}
+    # Profiles read before an overlong line are still evaluated
+    if len(chunk):
+        profiles += len(chunk)
+        yield await flush(chunk)
+    if too_long is not None:
+        errors += 1
+        yield dumps_json(too_long) + b"\n"
+    yield dumps_json({"type": "summary", "profiles": profiles, "errors": errors}) + b"\n"
@@ -0,0 +1,57 @@
+"""
+Hourly air quality and safety history per city, for the Actuary.
+
+The store itself (memory-mapped hourly series and their monthly
+aggregates) is shared.exposure. Here histories are keyed by the reference
+city id, so every spelling the city index resolves shares one, and only
+reference cities can have one. The store's version is part of
+memo.data_version(), so cached results computed from an older history are
+not reused.
+
+Append hourly rows from a CSV with an hour column (ISO timestamps, UTC)
+and any of the metric columns:
+    python -m agents.exposure append "Lisbon" lisbon_hourly.csv
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from shared import exposure
+from shared.exposure import METRICS, TRAILING_MONTHS, CityHistory, hour_label, to_hour  # noqa: F401  used through this module
+
+from .reference import UNKNOWN_CITY_ID, get_city_index
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+EXPOSURE_DIR = Path(os.getenv("EXPOSURE_DB_DIR", DATA_DIR / "exposure"))
+
+
+class ExposureStore(exposure.ExposureStore):
+    def city_key(self, city: str) -> str:
+        index = get_city_index()
+        return str(index.city_ids[index.resolve(city)])
+
+    def city_name(self, city: str) -> str:
+        if self.city_key(city) == UNKNOWN_CITY_ID:
+            raise ValueError(f"{city} is not in the city reference data")
+        return get_city_index().lookup(city)["name"]
+
+
+_store: Optional[ExposureStore] = None
+
+
+def get_exposure_store() -> ExposureStore:
+    """Shared store; cities without a history are rated on the reference data alone."""
+    global _store
+    if _store is None:
+        _store = ExposureStore(EXPOSURE_DIR)
+    return _store
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "append":
+        print("usage: python -m agents.exposure append CITY CSV")
+        sys.exit(1)
+    history = get_exposure_store().append_csv(sys.argv[2], Path(sys.argv[3]))
+    print(f"{history.name}: {history.hours} hours from {hour_label(history.start_hour)} to {hour_label(history.end_hour)}")
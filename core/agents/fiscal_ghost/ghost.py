@@ -1,33 +1,67 @@
-from typing import Dict, Any
+import logging
+import sys
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from shared import fx
+
+from ..reference import get_city_index
+from ..state import ExpenseAnalysis, profile_value
+
+logger = logging.getLogger(__name__)
 
 class FiscalGhostAgent:
     def __init__(self):
-        # Could initialize exchange rate APIs here
         pass
 
-    def calculate_expenses(self, user_profile: Dict[str, Any], target_city: str) -> Dict[str, Any]:
+    async def calculate_expenses(self, user_profile: Dict[str, Any], target_city: str) -> ExpenseAnalysis:
         """
         Replays user spending habits in the target city.
         """
-        print(f"Fiscal Ghost: Calculating expenses for {target_city}")
+        logger.debug("Fiscal Ghost: calculating expenses", extra={"city": target_city})
         
-        current_expenses = user_profile.get("monthly_expenses", 3000)
+        current_expenses = profile_value(user_profile, "monthly_expenses")
         
-        # Mock Cost of Living Multiplier
-        # Real impl would fetch Zyla/Numbeo data
-        col_multiplier = 1.2 if target_city.lower() in ["london", "new york", "singapore"] else 0.7
+        # Cost of Living Multiplier from the reference data
+        # Real impl would refresh it from Zyla/Numbeo
+        city = get_city_index().lookup(target_city)
         
-        projected_expenses = current_expenses * col_multiplier
+        # Expenses stay in the user's currency; the local figure is converted
+        # at the rates snapshot this result is tagged with
+        currency = profile_value(user_profile, "currency")
+        rates = fx.current()
+        fx_rate = rates.rate(currency, city["currency"])
         
+        # Projected and local expenses and their details are derived on the result
+        return ExpenseAnalysis(
+            original_expenses=current_expenses,
+            col_multiplier=city["col_multiplier"],
+            currency=currency,
+            local_currency=sys.intern(city["currency"]),
+            fx_rate=fx_rate,
+            fx_version=rates.version
+        )
+
+    def calculate_expenses_batch(self, user_profile: Dict[str, Any], target_cities: List[str],
+                                 rates: Optional[fx.RateSnapshot] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_expenses: one array per figure, aligned with target_cities.
+        """
+        logger.debug("Fiscal Ghost: calculating expenses", extra={"cities": len(target_cities)})
+
+        current_expenses = profile_value(user_profile, "monthly_expenses")
+
+        records = get_city_index().columns(target_cities)
+        col_multiplier = records["col_multiplier"]
+        projected_expenses = current_expenses * col_multiplier
+        # Every city's rate from the user's currency in one gather
+        rates = rates or fx.current()
+        fx_rate = rates.rates(profile_value(user_profile, "currency"), records["currency"])
+
         return {
-            "original_expenses": current_expenses,
-            "projected_expenses": projected_expenses,
             "col_multiplier": col_multiplier,
-            "currency": "USD", # Normalized for now
-            "details": {
-                "rent": projected_expenses * 0.4,
-                "food": projected_expenses * 0.2,
-                "transport": projected_expenses * 0.1,
-                "misc": projected_expenses * 0.3
-            }
+            "projected_expenses": projected_expenses,
+            "fx_rate": fx_rate,
+            "projected_expenses_local": projected_expenses * fx_rate
         }
@@ -1,84 +1,160 @@
+import asyncio
+import logging
+import threading
 from typing import Dict, Any
-from langgraph.graph import StateGraph, END
-from .state import AgentState
+from shared import fx
+from shared.montecarlo import simulate_wealth
+from .state import AgentState, FinalReport, WealthProjection, profile_value
 from .actuary.actuary import ActuaryAgent
 from .fiscal_ghost.ghost import FiscalGhostAgent
 from .nexus.nexus import NexusAgent
+from .memo import NodeMemo, canonical, city_key, node_cache
+from .workers import run_cpu_bound
+from .reference import get_city_index
+from .nexus.tax_engine import get_tax_engine
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
 
 # Initialize Agents
 actuary = ActuaryAgent()
 ghost = FiscalGhostAgent()
 nexus = NexusAgent()
 
-def run_actuary(state: AgentState):
+async def run_actuary(state: AgentState):
     target = state["target_city"]
-    result = actuary.analyze_risk(target)
+    result = await actuary.analyze_risk(target)
     return {"risk_analysis": result}
 
-def run_ghost(state: AgentState):
+async def run_ghost(state: AgentState):
     target = state["target_city"]
     user = state["user_profile"]
-    result = ghost.calculate_expenses(user, target)
+    result = await ghost.calculate_expenses(user, target)
     return {"expense_analysis": result}
 
-def run_nexus(state: AgentState):
+async def run_nexus(state: AgentState):
     target = state["target_city"]
     user = state["user_profile"]
-    result = nexus.analyze_compliance(user, target)
+    result = await nexus.analyze_compliance(user, target, state["current_city"])
     return {"compliance_analysis": result}
 
 def aggregator(state: AgentState):
     """
     Combines all insights into value projections.
     """
-    print("Aggregating results...")
+    logger.debug("Aggregating results", extra={"city": state["target_city"]})
     
     # Calculate Savings/Wealth logic
-    income = state["user_profile"].get("annual_income", 0)
+    income = profile_value(state["user_profile"], "annual_income")
     tax_info = state["compliance_analysis"]
     expense_info = state["expense_analysis"]
     
-    net_income = income - tax_info["estimated_tax"]
-    annual_expenses = expense_info["projected_expenses"] * 12
+    net_income = income - tax_info.estimated_tax
+    annual_expenses = expense_info.projected_expenses * 12
     
     savings = net_income - annual_expenses
     
-    # 5-Year Projection (Simple Linear)
-    projection = []
-    current_wealth = state["user_profile"].get("current_wealth", 0)
+    # 5-Year Projection (Monte Carlo percentile bands, median as headline)
+    current_wealth = profile_value(state["user_profile"], "current_wealth")
+    simulation = simulate_wealth(current_wealth, net_income, annual_expenses)
     
-    for year in range(1, 6):
-        current_wealth += savings * 1.05 # 5% investment return assumption
-        projection.append({
-            "year": year,
-            "wealth": current_wealth,
-            "city": state["target_city"]
-        })
-        
     return {
-        "final_report": {
-            "net_annual_savings": savings,
-            "quality_of_life_score": state["risk_analysis"]["overall_risk_rating"]
-        },
-        "wealth_projection": projection
+        "final_report": FinalReport(
+            net_annual_savings=savings,
+            quality_of_life_score=state["risk_analysis"].overall_risk_rating,
+            probability_of_loss=simulation["probability_of_loss"]
+        ),
+        "wealth_projection": WealthProjection.from_bands(state["target_city"], simulation["percentiles"])
     }
 
-# Define Graph
-workflow = StateGraph(AgentState)
-
-# Add Nodes
-workflow.add_node("actuary", run_actuary)
-workflow.add_node("fiscal_ghost", run_ghost)
-workflow.add_node("nexus", run_nexus)
-workflow.add_node("aggregator", aggregator)
-
-# Define Edges
-# Parallel execution of agents
-workflow.set_entry_point("actuary")
-workflow.add_edge("actuary", "fiscal_ghost")
-workflow.add_edge("fiscal_ghost", "nexus")
-workflow.add_edge("nexus", "aggregator")
-workflow.add_edge("aggregator", END)
-
-# Compile
-app = workflow.compile()
+async def run_aggregator(state: AgentState):
+    # Projection maths is CPU-bound, keep it off the event loop
+    return await run_cpu_bound(aggregator, state)
+
+# Parallel execution of agents: the three agents only read the user input,
+# so they fan out from START and fan back in at the aggregator, which runs
+# once all of them have written their analysis.
+AGENT_NODES = ["actuary", "fiscal_ghost", "nexus"]
+
+# State fields each node reads, with the normalization used for its memo
+# key. The agents only see the resolved city; the aggregator echoes the
+# city name as given, so it keys on the raw string.
+NODE_INPUTS = {
+    "actuary": {"target_city": city_key},
+    "fiscal_ghost": {
+        "target_city": city_key,
+        "user_profile.monthly_expenses": canonical,
+        "user_profile.currency": canonical
+    },
+    "nexus": {
+        "current_city": city_key,
+        "target_city": city_key,
+        "user_profile.annual_income": canonical
+    },
+    "aggregator": {
+        "target_city": canonical,
+        "user_profile.annual_income": canonical,
+        "user_profile.current_wealth": canonical
+    },
+}
+# Nodes whose output another node consumes
+NODE_UPSTREAM = {"aggregator": AGENT_NODES}
+
+memo = NodeMemo(NODE_INPUTS, NODE_UPSTREAM, node_cache)
+
+# Nodes, compiled into the graph by build_graph
+# Timed outside the memo, so cache hits show up as fast runs
+NODES = {
+    name: instrumentation.node(name, memo.wrap(name, func))
+    for name, func in [
+        ("actuary", run_actuary),
+        ("fiscal_ghost", run_ghost),
+        ("nexus", run_nexus),
+        ("aggregator", run_aggregator),
+    ]
+}
+
+def build_graph():
+    """Define and compile the graph. Imports LangGraph, which dominates startup time."""
+    from langgraph.graph import StateGraph, START, END
+
+    workflow = StateGraph(AgentState)
+    for name, node in NODES.items():
+        workflow.add_node(name, node)
+
+    # Define Edges
+    for node in AGENT_NODES:
+        workflow.add_edge(START, node)
+    workflow.add_edge(AGENT_NODES, "aggregator")
+    workflow.add_edge("aggregator", END)
+
+    return workflow.compile()
+
+_app = None
+_app_lock = threading.Lock()
+
+def get_app():
+    """
+    The compiled graph, built once on first use rather than at import, so
+    importing this module (and main) stays cheap. Callers racing the first
+    build wait for it instead of compiling again.
+    """
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_graph()
+    return _app
+
+async def get_app_async():
+    """get_app() for request handlers: a first build runs off the event loop."""
+    if _app is None:
+        return await asyncio.to_thread(get_app)
+    return _app
+
+def warm_up():
+    """Load the reference data and compile the graph ahead of the first request."""
+    get_city_index()
+    get_tax_engine()
+    fx.current()
+    get_app()
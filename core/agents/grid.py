@@ -0,0 +1,117 @@
+"""
+Sensitivity grid: net annual savings and projected wealth over salary x
+expenses x current wealth ranges for a list of cities.
+
+The aggregator's savings maths is evaluated once as a broadcast over the
+whole grid: tax is computed per (city, income), expenses per (city,
+expense level), and their difference broadcasts to (city, income,
+expenses). Wealth uses the closed-form expected projection (as the batch
+and bulk endpoints do); the Monte Carlo median /simulate reports is per
+request, not per grid cell, so final_wealth differs from /simulate's
+wealth for the same inputs.
+
+Results are returned as arrays and encoded as an uncompressed NumPy .npz,
+so a million cells travel as 8 MB of float64 instead of nested JSON.
+"""
+
+import io
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from shared.projection import INVESTMENT_RETURN
+
+from .nexus.tax_engine import get_tax_engine
+from .reference import get_city_index
+
+# Largest grid (cities x incomes x expenses x wealth levels) one request may ask for
+MAX_GRID_CELLS = int(os.getenv("MAX_GRID_CELLS", "4000000"))
+# Largest total size of a grid's output arrays; the broadcast and the .npz
+# encoding each need about as much again while the request runs
+MAX_GRID_BYTES = int(os.getenv("MAX_GRID_BYTES", str(64 << 20)))
+
+NPZ = "application/x-npz"
+
+
+def axis(start: float, stop: float, steps: int) -> np.ndarray:
+    """Evenly spaced values from start to stop inclusive."""
+    return np.linspace(start, stop, steps)
+
+
+def output_bytes(cities: int, incomes: int, expenses: int, wealth_levels: int) -> int:
+    """Size of simulate_grid's float64 output arrays: the axes, net_annual_savings and final_wealth."""
+    savings = cities * incomes * expenses
+    return 8 * (incomes + expenses + wealth_levels + savings + savings * wealth_levels)
+
+
+def check_size(cities: int, incomes: int, expenses: int, wealth_levels: int):
+    """Raises ValueError for grids over MAX_GRID_CELLS cells or MAX_GRID_BYTES of output."""
+    cells = cities * incomes * expenses * wealth_levels
+    if cells > MAX_GRID_CELLS:
+        raise ValueError(f"Grid has {cells} cells, the limit is {MAX_GRID_CELLS}")
+    size = output_bytes(cities, incomes, expenses, wealth_levels)
+    if size > MAX_GRID_BYTES:
+        raise ValueError(f"Grid output is {size} bytes, the limit is {MAX_GRID_BYTES}")
+
+
+def total_tax(countries: np.ndarray, fallback_rates: np.ndarray, incomes: np.ndarray,
+              origin: Optional[str] = None) -> np.ndarray:
+    """
+    (cities, incomes) tax for someone moving from origin; one schedule
+    evaluation per distinct country.
+    """
+    engine = get_tax_engine()
+    tax = np.empty((len(countries), len(incomes)))
+    for code in np.unique(countries):
+        rows = countries == code
+        if engine.has(code):
+            tax[rows] = engine.compute(code, incomes, origin)["total_tax"]
+        else:
+            # Flat income tax, plus whatever the origin still levies net of treaty relief
+            income_tax = np.outer(fallback_rates[rows], incomes)
+            origin_tax = engine.origin_tax(origin, code, incomes)
+            relief = np.minimum(origin_tax, income_tax) * engine.relief_percentage(origin, code)
+            tax[rows] = income_tax + origin_tax - relief
+    return tax
+
+
+def simulate_grid(current_city: str, cities: List[str], annual_income: np.ndarray, monthly_expenses: np.ndarray,
+                  current_wealth: np.ndarray, years: int) -> Dict[str, np.ndarray]:
+    """
+    Every combination of the given axes for someone moving from
+    current_city. Returns the axes plus
+    net_annual_savings (cities, incomes, expenses) and
+    final_wealth (cities, incomes, expenses, wealth levels) after `years`.
+    """
+    annual_income = np.asarray(annual_income, dtype=np.float64)
+    monthly_expenses = np.asarray(monthly_expenses, dtype=np.float64)
+    current_wealth = np.asarray(current_wealth, dtype=np.float64)
+    check_size(len(cities), annual_income.size, monthly_expenses.size, current_wealth.size)
+    index = get_city_index()
+    records = index.columns(cities)
+    origin = index.lookup(current_city)["country"]
+
+    net_income = annual_income - total_tax(records["country"], records["tax_rate"], annual_income, origin)
+    annual_expenses = np.outer(records["col_multiplier"], monthly_expenses * 12)
+    savings = net_income[:, :, None] - annual_expenses[:, None, :]
+
+    # Closed form of the yearly recursion, as in projection.project_wealth_batch
+    growth = (1 + INVESTMENT_RETURN) ** years
+    annuity = (growth - 1) / INVESTMENT_RETURN
+    final_wealth = current_wealth * growth + savings[..., None] * annuity
+
+    return {
+        "cities": np.array(cities, dtype=str),
+        "annual_income": annual_income,
+        "monthly_expenses": monthly_expenses,
+        "current_wealth": current_wealth,
+        "net_annual_savings": savings,
+        "final_wealth": final_wealth,
+    }
+
+
+def to_npz(arrays: Dict[str, np.ndarray]) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
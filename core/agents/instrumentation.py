@@ -0,0 +1,18 @@
+"""
+Graph node metrics, on top of shared.instrumentation.
+
+Every LangGraph node is timed through `node`, each run a span of the
+request's trace.
+"""
+
+from typing import Callable
+
+from shared.instrumentation import Counter, Histogram, timed
+
+NODE_SECONDS = Histogram("node_seconds", "Duration of graph nodes, cache hits included", ("node",))
+NODE_ERRORS = Counter("node_errors", "Graph nodes that raised", ("node",))
+
+
+def node(name: str, func: Callable) -> Callable:
+    """Graph node timed into NODE_SECONDS / NODE_ERRORS, with a span per run."""
+    return timed(f"node.{name}", func, NODE_SECONDS.labels(name), NODE_ERRORS.labels(name))
@@ -0,0 +1,389 @@
+"""
+Background jobs for heavy simulations.
+
+A submitted job gets an id straight away and runs later in a bounded
+process pool, so multi-city batches, long Monte Carlo projections and
+sensitivity grids neither hold an HTTP worker nor compete with the event
+loop for the GIL. Clients poll the job's status and fetch its encoded
+result once it has succeeded.
+
+- The queue is bounded (JOB_QUEUE_SIZE). A submit beyond it raises
+  QueueFull with a Retry-After estimate instead of queueing without limit.
+- Job records and results live in a store: MemoryJobStore by default,
+  RedisJobStore when JOB_STORE_URL is set (any server speaking the Redis
+  protocol), so status can be read from any web process.
+- Cancelling sets a cancel flag in the store next to the job record, so
+  any web process can cancel a job whichever process queued it. The
+  owning process checks the flag before starting the job and again when
+  the worker returns, and then discards the result; the worker process
+  itself is not interrupted. A job queued in the cancelling process is
+  also removed from its queue straight away.
+- stats() reports queue depth, running jobs, counters and wait/run time
+  percentiles over the most recent jobs.
+"""
+
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import secrets
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from shared import encoding
+
+from . import batch, grid
+from .reference import get_city_index
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(os.cpu_count() or 1)))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+JOB_START_METHOD = os.getenv("JOB_START_METHOD", "spawn")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Wait and run times kept for the percentiles in stats()
+TIMING_WINDOW = 1024
+
+
+# --- Worker side (runs in the pool processes) ---
+
+def _init_worker():
+    get_city_index()
+
+
+def _simulate(media_type: str, state: Dict[str, Any]) -> Tuple[bytes, str]:
+    from .graph import get_app
+    from .state import as_data
+    from .whatif import OUTPUT_KEYS
+
+    result = asyncio.run(get_app().ainvoke(state))
+    data = {key: as_data(result.get(key)) for key in OUTPUT_KEYS}
+    return encoding.encode_body({"status": "success", "data": data}, media_type), media_type
+
+
+def _batch(media_type: str, current_city: str, target_cities, user_profile) -> Tuple[bytes, str]:
+    data = batch.simulate_batch(current_city, target_cities, user_profile)
+    return encoding.encode_body({"status": "success", "data": data}, media_type), media_type
+
+
+def _grid(media_type: str, *args) -> Tuple[bytes, str]:
+    # Grids are always .npz, whatever was negotiated
+    return grid.to_npz(grid.simulate_grid(*args)), grid.NPZ
+
+
+KINDS = {"simulate": _simulate, "batch": _batch, "grid": _grid}
+
+
+def run_job(kind: str, args: Tuple, media_type: str) -> Tuple[float, bytes, str]:
+    """Runs in a pool process: (start time, encoded body, media type)."""
+    started = time.time()
+    body, media_type = KINDS[kind](media_type, *args)
+    return started, body, media_type
+
+
+# --- Stores ---
+
+class MemoryJobStore:
+    """Job records and results in this process, dropped `ttl` seconds after their last write."""
+
+    def __init__(self, ttl: float = JOB_RESULT_TTL, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _put(self, key: str, value: Any):
+        now = self.clock()
+        self._entries[key] = (now + self.ttl, value)
+        self._entries.move_to_end(key)
+        # Oldest writes first, so expired entries are always at the front
+        while self._entries:
+            expires, _ = next(iter(self._entries.values()))
+            if expires > now:
+                break
+            self._entries.popitem(last=False)
+
+    def _get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            return None
+        return entry[1]
+
+    async def save(self, job: Dict[str, Any]):
+        self._put(job["id"], dict(job))
+
+    async def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._get(job_id)
+        return dict(job) if job is not None else None
+
+    async def save_result(self, job_id: str, body: bytes):
+        self._put(f"{job_id}:result", body)
+
+    async def load_result(self, job_id: str) -> Optional[bytes]:
+        return self._get(f"{job_id}:result")
+
+    async def request_cancel(self, job_id: str):
+        self._put(f"{job_id}:cancel", True)
+
+    async def cancel_requested(self, job_id: str) -> bool:
+        return self._get(f"{job_id}:cancel") is not None
+
+    async def aclose(self):
+        pass
+
+
+class RedisJobStore:
+    """
+    Job records (JSON) and results (raw bytes) as expiring keys on a Redis
+    protocol server. Takes any asyncio client with get/set(ex=), e.g.
+    redis.asyncio.Redis.
+    """
+
+    def __init__(self, client, ttl: float = JOB_RESULT_TTL, prefix: str = "sovereignsim:job:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisJobStore":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url), **kwargs)
+
+    async def save(self, job: Dict[str, Any]):
+        await self.client.set(self.prefix + job["id"], encoding.dumps_json(job), ex=math.ceil(self.ttl))
+
+    async def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self.prefix + job_id)
+        return json.loads(raw) if raw is not None else None
+
+    async def save_result(self, job_id: str, body: bytes):
+        await self.client.set(f"{self.prefix}{job_id}:result", body, ex=math.ceil(self.ttl))
+
+    async def load_result(self, job_id: str) -> Optional[bytes]:
+        return await self.client.get(f"{self.prefix}{job_id}:result")
+
+    async def request_cancel(self, job_id: str):
+        await self.client.set(f"{self.prefix}{job_id}:cancel", b"1", ex=math.ceil(self.ttl))
+
+    async def cancel_requested(self, job_id: str) -> bool:
+        return await self.client.get(f"{self.prefix}{job_id}:cancel") is not None
+
+    async def aclose(self):
+        close = getattr(self.client, "aclose", None) or self.client.close
+        await close()
+
+
+def store_from_env():
+    url = os.getenv("JOB_STORE_URL")
+    return RedisJobStore.from_url(url) if url else MemoryJobStore()
+
+
+# --- Queue ---
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _summary(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": round(ordered[len(ordered) // 2], 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class JobQueue:
+    """
+    Bounded FIFO of jobs in front of a process pool. One dispatcher task
+    per pool worker takes the next queued job and awaits its result, so
+    at most `workers` jobs run at a time and the rest wait here.
+    """
+
+    def __init__(self, store=None, workers: int = JOB_WORKERS, max_queued: int = JOB_QUEUE_SIZE,
+                 start_method: str = JOB_START_METHOD):
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatchers = []
+        self._pending: "OrderedDict[str, Tuple[Dict[str, Any], Tuple, str]]" = OrderedDict()
+        self.running = 0
+        self.counts = {"submitted": 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0, "rejected": 0}
+        self.wait_times: Deque[float] = deque(maxlen=TIMING_WINDOW)
+        self.run_times: Deque[float] = deque(maxlen=TIMING_WINDOW)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker
+        )
+
+    async def start(self):
+        if self.store is None:
+            self.store = store_from_env()
+        self._pool = self._new_pool()
+        self._queue = asyncio.Queue()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        # Jobs that never started will not run; say so instead of leaving them queued
+        for job_id in list(self._pending):
+            await self._finish(job_id, CANCELLED, error="Server shut down before the job started")
+        self._pending.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._queue = None
+        await self.store.aclose()
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has room, from recent run times."""
+        mean_run = sum(self.run_times) / len(self.run_times) if self.run_times else 1.0
+        return max(1, math.ceil(mean_run * self.depth / self.workers))
+
+    async def submit(self, kind: str, args: Tuple, media_type: str = encoding.JSON) -> Dict[str, Any]:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self.depth >= self.max_queued:
+            self.counts["rejected"] += 1
+            raise QueueFull(self.retry_after())
+
+        job = {
+            "id": secrets.token_urlsafe(16),
+            "kind": kind,
+            "status": QUEUED,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "media_type": None,
+            "size": None,
+            "error": None
+        }
+        await self.store.save(job)
+        self._pending[job["id"]] = (job, args, media_type)
+        self._queue.put_nowait(job["id"])
+        self.counts["submitted"] += 1
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.load(job_id)
+
+    async def result(self, job_id: str) -> Optional[bytes]:
+        return await self.store.load_result(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        The job after cancelling; finished jobs are returned unchanged,
+        unknown ones as None. Works from any process sharing the store.
+        """
+        job = await self.store.load(job_id)
+        if job is None or job["status"] in FINISHED:
+            return job
+        if self._pending.pop(job_id, None) is None:
+            # Running, or queued by another process: its owner drops it on seeing the flag
+            await self.store.request_cancel(job_id)
+        return await self._finish(job_id, CANCELLED)
+
+    async def _finish(self, job_id: str, status: str, **fields) -> Optional[Dict[str, Any]]:
+        job = await self.store.load(job_id)
+        if job is None:
+            return None
+        job.update(fields, status=status, finished_at=time.time())
+        await self.store.save(job)
+        self.counts[status] += 1
+        return job
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self._queue.get()
+            entry = self._pending.pop(job_id, None)
+            if entry is None:
+                continue  # cancelled while queued
+            job, args, media_type = entry
+            if await self._cancel_requested(job_id):
+                continue  # cancelled by another process while queued
+            job = {**job, "status": RUNNING, "started_at": time.time()}
+            await self.store.save(job)
+            if await self._cancel_requested(job_id):
+                # Cancelled while the record was being written: don't start it
+                continue
+
+            self.running += 1
+            try:
+                started, body, media_type = await loop.run_in_executor(self._pool, run_job, job["kind"], args, media_type)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); later jobs get a fresh pool
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+                await self._finish_unless_cancelled(job_id, FAILED, error=f"Worker process died: {e}")
+                continue
+            except Exception as e:
+                await self._finish_unless_cancelled(job_id, FAILED, error=str(e))
+                continue
+            finally:
+                self.running -= 1
+
+            finished = time.time()
+            self.wait_times.append(max(0.0, started - job["submitted_at"]))
+            self.run_times.append(finished - started)
+            if await self._cancel_requested(job_id):
+                continue
+            await self.store.save_result(job_id, body)
+            await self._finish(job_id, SUCCEEDED, started_at=started, media_type=media_type, size=len(body))
+
+    async def _finish_unless_cancelled(self, job_id: str, status: str, **fields):
+        if not await self._cancel_requested(job_id):
+            await self._finish(job_id, status, **fields)
+
+    async def _cancel_requested(self, job_id: str) -> bool:
+        """Whether any process cancelled the job; if so its record is left CANCELLED."""
+        if not await self.store.cancel_requested(job_id):
+            return False
+        job = await self.store.load(job_id)
+        if job is not None and job["status"] != CANCELLED:
+            # Our RUNNING write landed after the canceller's
+            await self.store.save({**job, "status": CANCELLED, "finished_at": time.time()})
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = next(iter(self._pending.values()), None)
+        return {
+            "workers": self.workers,
+            "queue_depth": self.depth,
+            "max_queued": self.max_queued,
+            "running": self.running,
+            "oldest_queued_seconds": round(time.time() - oldest[0]["submitted_at"], 4) if oldest else None,
+            **self.counts,
+            "wait_seconds": _summary(self.wait_times),
+            "run_seconds": _summary(self.run_times),
+        }
+
+
+queue = JobQueue()
@@ -0,0 +1,166 @@
+"""
+Content-addressed memoization of simulation results.
+
+Keys are hashes of canonicalized inputs plus the version of the reference
+data they were computed from (city index, tax brackets and exchange-rate
+snapshot), so a cached result is reused for any request with the same
+inputs and never matched again once the data changes; stale entries then
+age out of the LRU.
+
+Two levels, each in its own bounded LRU store:
+- whole simulations, keyed by every AgentState input;
+- single graph nodes, keyed only by the state fields the node reads (and
+  the keys of the nodes it depends on), so changing one profile field only
+  reruns the nodes that read it.
+
+Cached values are shared between requests and must be treated as read-only.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+from shared import fx
+
+from .exposure import get_exposure_store
+from .reference import get_city_index
+from .nexus.tax_engine import get_tax_engine
+
+# Entries kept per cache before the least recently used is evicted (0 disables)
+SIMULATION_CACHE_SIZE = int(os.getenv("SIMULATION_CACHE_SIZE", "4096"))
+NODE_CACHE_SIZE = int(os.getenv("NODE_CACHE_SIZE", "16384"))
+
+
+def canonical(value: Any) -> Any:
+    """Numbers as floats (so 120000 and 120000.0 match), containers recursively."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, Mapping):
+        return {str(key): canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    return str(value)
+
+
+def content_hash(*parts: Any) -> str:
+    encoded = json.dumps(canonical(parts), sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+def data_version() -> str:
+    """Version of the reference data every result is derived from."""
+    return f"{get_city_index().version}:{get_tax_engine().version}:{fx.current().version}:{get_exposure_store().version}"
+
+
+def city_key(city: str) -> str:
+    """Spellings of the same city share one key."""
+    index = get_city_index()
+    return str(index.city_ids[index.resolve(city)])
+
+
+def state_value(state: Mapping[str, Any], path: str) -> Any:
+    """Value at a dotted path such as "user_profile.monthly_expenses"."""
+    value: Any = state
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, Mapping) else None
+    return value
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class ResultCache:
+    """Size-bounded LRU store with hit/miss counts per namespace."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self.namespaces: Dict[str, CacheStats] = {}
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, namespace: str = "default") -> Optional[Any]:
+        stats = self.namespaces.setdefault(namespace, CacheStats())
+        value = self._entries.get(key)
+        if value is None:
+            stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        stats.hits += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "namespaces": {name: asdict(stats) for name, stats in self.namespaces.items()}
+        }
+
+
+class NodeMemo:
+    """
+    Memoizes graph nodes. inputs maps each node to the state fields it
+    reads and how to normalize them; upstream lists the nodes whose output
+    it consumes, whose keys become part of its own.
+    """
+
+    def __init__(self, inputs: Mapping[str, Mapping[str, Callable[[Any], Any]]],
+                 upstream: Mapping[str, Sequence[str]], cache: ResultCache):
+        self.inputs = inputs
+        self.upstream = upstream
+        self.cache = cache
+
+    def key(self, node: str, state: Mapping[str, Any], version: Optional[str] = None) -> str:
+        version = version or data_version()
+        values = {path: normalize(state_value(state, path)) for path, normalize in self.inputs[node].items()}
+        parents = [self.key(parent, state, version) for parent in self.upstream.get(node, ())]
+        return content_hash(node, version, values, parents)
+
+    def wrap(self, node: str, func: Callable):
+        async def memoized(state):
+            key = self.key(node, state)
+            result = self.cache.get(key, node)
+            if result is None:
+                result = await func(state)
+                self.cache.put(key, result)
+            return result
+        memoized.__name__ = getattr(func, "__name__", node)
+        return memoized
+
+
+def simulation_key(state: Mapping[str, Any]) -> str:
+    """Key for a whole simulation: every input field of the state."""
+    return content_hash(
+        "simulation",
+        data_version(),
+        city_key(state["current_city"]),
+        state["target_city"],
+        state["user_profile"]
+    )
+
+
+simulation_cache = ResultCache(SIMULATION_CACHE_SIZE)
+node_cache = ResultCache(NODE_CACHE_SIZE)
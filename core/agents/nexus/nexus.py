@@ -1,31 +1,67 @@
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from ..reference import get_city_index
+from ..state import FAVORABLE_TREATY_THRESHOLD, ComplianceAnalysis, profile_value
+from .tax_engine import get_tax_engine
+
+logger = logging.getLogger(__name__)
 
 class NexusAgent:
     def __init__(self):
         # RAG initialization would happen here
         pass
 
-    def analyze_compliance(self, user_profile: Dict[str, Any], target_city: str) -> Dict[str, Any]:
+    async def analyze_compliance(self, user_profile: Dict[str, Any], target_city: str,
+                                 current_city: Optional[str] = None) -> ComplianceAnalysis:
         """
         Analyzes tax treaties and compliance requirements.
         """
-        print(f"Nexus: Analyzing compliance for {target_city}")
+        logger.debug("Nexus: analyzing compliance", extra={"city": target_city})
         
-        income = user_profile.get("annual_income", 100000)
+        income = profile_value(user_profile, "annual_income")
         
-        # Mock Tax Logic
-        tax_rate = 0.30 # Default global avg mock
-        if target_city.lower() in ["dubai", "monaco"]:
-            tax_rate = 0.0
-        elif target_city.lower() in ["lisbon"]:
-            tax_rate = 0.20 # NHR regime mock
-            
-        net_wealth = income * (1 - tax_rate)
+        # Progressive brackets and social security for the city's country;
+        # the reference data's flat rate covers countries without a schedule.
+        # The origin's tax and treaty relief apply when moving from current_city
+        index = get_city_index()
+        city = index.lookup(target_city)
+        origin = index.lookup(current_city)["country"] if current_city else None
+        tax = get_tax_engine().compute_aligned([city["country"]], income, [city["tax_rate"]], origin)
         
+        # Total, effective rate and treaty status are derived on the result
+        return ComplianceAnalysis(
+            income=income,
+            income_tax=float(tax["income_tax"][0]),
+            social_security=float(tax["social_security"][0]),
+            origin_tax=float(tax["origin_tax"][0]),
+            treaty_relief=float(tax["treaty_relief"][0])
+        )
+
+    def analyze_compliance_batch(self, user_profile: Dict[str, Any], target_cities: List[str],
+                                 current_city: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized analyze_compliance: one array per figure, aligned with target_cities.
+        """
+        logger.debug("Nexus: analyzing compliance", extra={"cities": len(target_cities)})
+
+        income = profile_value(user_profile, "annual_income")
+
+        index = get_city_index()
+        cities = index.columns(target_cities)
+        origin = index.lookup(current_city)["country"] if current_city else None
+        tax = get_tax_engine().compute_aligned(cities["country"], income, fallback_rates=cities["tax_rate"], origin=origin)
+        tax_rate = tax["effective_rate"]
+
         return {
             "tax_rate": tax_rate,
-            "estimated_tax": income * tax_rate,
-            "net_wealth_projection": net_wealth,
-            "visa_requirements": "Standard Tourist/Digital Nomad",
-            "treaty_status": "favorable_treaty_found" if tax_rate < 0.25 else "standard_dta"
+            "estimated_tax": tax["total_tax"],
+            "income_tax": tax["income_tax"],
+            "social_security": tax["social_security"],
+            "origin_tax": tax["origin_tax"],
+            "treaty_relief": tax["treaty_relief"],
+            "net_wealth_projection": income - tax["total_tax"],
+            "treaty_status": np.where(tax_rate < FAVORABLE_TREATY_THRESHOLD, "favorable_treaty_found", "standard_dta")
         }
@@ -0,0 +1,260 @@
+"""
+City/country reference index shared by all agents.
+
+The source data is data/cities.csv. It is packed once into a NumPy
+structured array (one row per city) plus a dict from every normalized
+city id, name and alias to its row, so a lookup is one dict probe and
+batch lookups are one fancy-indexing pass over the array.
+
+The packed arrays can be written to disk (`python -m agents.reference
+build`) and are then memory-mapped on startup instead of re-parsed, as
+long as they were built from the current CSV.
+
+Unknown cities resolve to a trailing default row, so callers always get
+a record back.
+"""
+
+import csv
+import difflib
+import hashlib
+import os
+import re
+import sys
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+SOURCE_PATH = Path(os.getenv("CITY_REFERENCE_CSV", DATA_DIR / "cities.csv"))
+COMPILED_DIR = Path(os.getenv("CITY_REFERENCE_DIR", DATA_DIR / "compiled"))
+
+CITY_DTYPE = np.dtype([
+    ("country", "U2"),
+    ("currency", "U3"),
+    ("col_multiplier", "f8"),
+    ("tax_rate", "f8"),
+    ("air_quality_index", "f8"),
+    ("safety_score", "f8"),
+    ("healthcare_wait_time_hours", "f8"),
+])
+
+# Used for any city that is not in the reference data
+DEFAULT_CITY = ("", "USD", 0.7, 0.30, 60.0, 75.0, 6.0)
+UNKNOWN_CITY_ID = "unknown"
+
+# Minimum similarity for fuzzy matching of misspelled city names
+FUZZY_CUTOFF = 0.85
+# Keys sharing the most trigrams with a misspelling that get scored
+FUZZY_CANDIDATES = 20
+
+# Raw spellings remembered per index, so repeat lookups skip normalization
+RESOLVED_CACHE_SIZE = 65536
+
+
+def normalize_city(name: str) -> str:
+    """
+    Canonical form used for every key: accents stripped, lower case,
+    punctuation folded to single spaces.
+    """
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CityIndex:
+    def __init__(self, records: np.ndarray, city_ids: np.ndarray, names: np.ndarray,
+                 keys: Dict[str, int], version: str):
+        # records/city_ids/names have one extra trailing row for unknown cities
+        self.records = records
+        self.city_ids = city_ids
+        self.names = names
+        self.keys = keys
+        self.version = version
+        self.unknown_row = len(records) - 1
+        self._resolved: Dict[str, int] = {}
+        self._trigrams: Optional[Dict[str, List[str]]] = None
+        self._trigrams_lock = threading.Lock()
+        self._fuzzy = lru_cache(maxsize=4096)(self._resolve_fuzzy)
+
+    def __len__(self) -> int:
+        return self.unknown_row
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, str]], version: str) -> "CityIndex":
+        rows = list(rows)
+        records = np.empty(len(rows) + 1, dtype=CITY_DTYPE)
+        city_ids = np.empty(len(rows) + 1, dtype=object)
+        names = np.empty(len(rows) + 1, dtype=object)
+        aliases = []
+
+        for i, row in enumerate(rows):
+            records[i] = (
+                row["country"],
+                row["currency"],
+                float(row["col_multiplier"]),
+                float(row["tax_rate"]),
+                float(row["air_quality_index"]),
+                float(row["safety_score"]),
+                float(row["healthcare_wait_time_hours"]),
+            )
+            city_ids[i] = row["city_id"]
+            names[i] = row["name"]
+            aliases.append([alias for alias in (row.get("aliases") or "").split("|") if alias])
+
+        records[-1] = DEFAULT_CITY
+        city_ids[-1] = UNKNOWN_CITY_ID
+        names[-1] = ""
+
+        return cls(records, city_ids.astype(str), names.astype(str), cls._build_keys(city_ids[:-1], names[:-1], aliases), version)
+
+    @staticmethod
+    def _build_keys(city_ids, names, aliases) -> Dict[str, int]:
+        keys: Dict[str, int] = {}
+        # Aliases first so a real city name always wins over an alias
+        for row, city_aliases in enumerate(aliases):
+            for alias in city_aliases:
+                keys[normalize_city(alias)] = row
+        for row, (city_id, name) in enumerate(zip(city_ids, names)):
+            keys[normalize_city(name)] = row
+            keys[normalize_city(city_id)] = row
+        return keys
+
+    @classmethod
+    def from_csv(cls, path: Path = SOURCE_PATH) -> "CityIndex":
+        version = hashlib.sha256(Path(path).read_bytes()).hexdigest()[:12]
+        with open(path, newline="", encoding="utf-8") as handle:
+            return cls.from_rows(csv.DictReader(handle), version)
+
+    def save(self, directory: Path = COMPILED_DIR):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "records.npy", self.records)
+        np.save(directory / "city_ids.npy", self.city_ids)
+        np.save(directory / "names.npy", self.names)
+        key_names = np.array(list(self.keys), dtype=str)
+        key_rows = np.fromiter(self.keys.values(), dtype=np.int32, count=len(self.keys))
+        np.save(directory / "key_names.npy", key_names)
+        np.save(directory / "key_rows.npy", key_rows)
+        (directory / "VERSION").write_text(self.version)
+
+    @classmethod
+    def load(cls, directory: Path = COMPILED_DIR) -> "CityIndex":
+        """Open a compiled index; the record array is memory-mapped."""
+        directory = Path(directory)
+        records = np.load(directory / "records.npy", mmap_mode="r")
+        city_ids = np.load(directory / "city_ids.npy")
+        names = np.load(directory / "names.npy")
+        key_names = np.load(directory / "key_names.npy")
+        key_rows = np.load(directory / "key_rows.npy")
+        keys = dict(zip(key_names.tolist(), key_rows.tolist()))
+        return cls(records, city_ids, names, keys, (directory / "VERSION").read_text().strip())
+
+    def resolve(self, city: str) -> int:
+        """
+        Row for a city name, id or alias. Tries an exact normalized match,
+        then the part before a comma ("Lisbon, Portugal"), then a fuzzy
+        match; returns the unknown row if nothing is close enough.
+        """
+        row = self._resolved.get(city)
+        if row is None:
+            row = self._resolve_uncached(city)
+            if len(self._resolved) < RESOLVED_CACHE_SIZE:
+                self._resolved[city] = row
+        return row
+
+    def _resolve_uncached(self, city: str) -> int:
+        key = normalize_city(city)
+        row = self.keys.get(key)
+        if row is not None:
+            return row
+        if "," in city:
+            row = self.keys.get(normalize_city(city.split(",", 1)[0]))
+            if row is not None:
+                return row
+        return self._fuzzy(key)
+
+    def _resolve_fuzzy(self, key: str) -> int:
+        if not key:
+            return self.unknown_row
+        trigrams = self._trigram_index()
+        shared = Counter()
+        for gram in _trigrams(key):
+            shared.update(trigrams.get(gram, ()))
+        candidates = [name for name, _ in shared.most_common(FUZZY_CANDIDATES)]
+        match = difflib.get_close_matches(key, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        return self.keys[match[0]] if match else self.unknown_row
+
+    def _trigram_index(self) -> Dict[str, List[str]]:
+        """
+        Names by trigram, built on the first misspelling only. Published once
+        complete, so a thread racing the build never scores against part of it.
+        """
+        if self._trigrams is None:
+            with self._trigrams_lock:
+                if self._trigrams is None:
+                    trigrams = defaultdict(list)
+                    for name in self.keys:
+                        for gram in _trigrams(name):
+                            trigrams[gram].append(name)
+                    self._trigrams = trigrams
+        return self._trigrams
+
+    def resolve_many(self, cities: List[str]) -> np.ndarray:
+        return np.fromiter((self.resolve(city) for city in cities), dtype=np.intp, count=len(cities))
+
+    def lookup(self, city: str) -> Dict[str, object]:
+        """Reference record for one city as plain Python values."""
+        row = self.resolve(city)
+        result = dict(zip(CITY_DTYPE.names, self.records[row].item()))
+        result["city_id"] = str(self.city_ids[row])
+        result["name"] = str(self.names[row]) or city
+        return result
+
+    def columns(self, cities: List[str]) -> np.ndarray:
+        """Structured array of records aligned with cities."""
+        return self.records[self.resolve_many(cities)]
+
+
+_index: Optional[CityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_city_index() -> CityIndex:
+    """
+    Shared index, built on first use: the compiled copy is memory-mapped
+    if it is present and up to date, otherwise the CSV is parsed.
+    """
+    global _index
+    if _index is None:
+        # The startup warm-up and worker threads may race the first load
+        with _index_lock:
+            if _index is None:
+                _index = _load_index()
+    return _index
+
+
+def _load_index() -> CityIndex:
+    compiled_version = COMPILED_DIR / "VERSION"
+    source_version = hashlib.sha256(SOURCE_PATH.read_bytes()).hexdigest()[:12]
+    if compiled_version.exists() and compiled_version.read_text().strip() == source_version:
+        return CityIndex.load(COMPILED_DIR)
+    return CityIndex.from_csv(SOURCE_PATH)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        print("usage: python -m agents.reference build")
+        sys.exit(1)
+    index = CityIndex.from_csv(SOURCE_PATH)
+    index.save(COMPILED_DIR)
+    print(f"Compiled {len(index)} cities ({len(index.keys)} keys) to {COMPILED_DIR}, version {index.version}")
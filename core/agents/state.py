@@ -1,18 +1,242 @@
-from typing import TypedDict, Annotated, List, Dict, Any, Optional
-import operator
+"""
+Graph state and the typed results the nodes write into it.
+
+Results are slotted, frozen dataclasses that hold only the figures a node
+computes; labels and shares derived from them (risk rating, expense
+details, tax rate) are properties. A wealth projection keeps its
+percentile bands as one (bands, years) float64 array instead of a list of
+per-year dicts. Results stay in this form through the graph, the memo
+caches and what-if sessions, and become the nested dicts clients see only
+at the API edge, through as_data().
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import TypedDict, List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+# A city is flagged high risk past either threshold
+HIGH_RISK_AQI = 100
+HIGH_RISK_SAFETY = 65
+
+FAVORABLE_TREATY_THRESHOLD = 0.25
+VISA_REQUIREMENTS = "Standard Tourist/Digital Nomad"
+
+# Split of projected monthly expenses shown as details
+EXPENSE_SHARES = (("rent", 0.4), ("food", 0.2), ("transport", 0.1), ("misc", 0.3))
+
+# What every agent, the aggregator and the vectorized endpoints assume for
+# a user_profile field the request leaves out
+DEFAULT_PROFILE = {"annual_income": 100000.0, "monthly_expenses": 3000.0, "current_wealth": 0.0, "currency": "USD"}
+
+
+def profile_value(user_profile: Dict[str, Any], field: str) -> Any:
+    """A user_profile field, or its DEFAULT_PROFILE value when it is missing."""
+    return user_profile.get(field, DEFAULT_PROFILE[field])
+
+
+@dataclass(frozen=True, slots=True)
+class RiskAnalysis:
+    air_quality_index: float
+    safety_score: float
+    healthcare_wait_time_hours: float
+    # Trailing-year statistics from the city's hourly history (exposure.CityHistory.trailing), if it has one;
+    # shared by every result computed from the same history
+    exposure: Optional[Dict[str, Any]] = None
+
+    @property
+    def rated_aqi(self) -> float:
+        """AQI the rating uses: the trailing-year mean when there is a history, else the reference value."""
+        return trailing_mean(self.exposure, "aqi", self.air_quality_index)
+
+    @property
+    def rated_safety(self) -> float:
+        return trailing_mean(self.exposure, "safety", self.safety_score)
+
+    @property
+    def high_risk(self) -> bool:
+        return self.rated_aqi > HIGH_RISK_AQI or self.rated_safety < HIGH_RISK_SAFETY
+
+    @property
+    def overall_risk_rating(self) -> str:
+        return "High" if self.high_risk else "Low"
+
+    def to_data(self) -> Dict[str, Any]:
+        return {
+            "air_quality_index": self.air_quality_index,
+            "safety_score": self.safety_score,
+            "healthcare_wait_time_hours": self.healthcare_wait_time_hours,
+            "overall_risk_rating": self.overall_risk_rating,
+            "notes": "Pollution warning active." if self.high_risk else "Excellent air quality.",
+            **({"exposure_history": self.exposure} if self.exposure is not None else {})
+        }
+
+
+def trailing_mean(exposure: Optional[Dict[str, Any]], metric: str, default: Any) -> Any:
+    """A metric's trailing-year mean from exposure statistics, or `default` without one."""
+    mean = exposure[metric]["mean"] if exposure is not None else None
+    return default if mean is None else mean
+
+
+@dataclass(frozen=True, slots=True)
+class ExpenseAnalysis:
+    original_expenses: float
+    col_multiplier: float
+    currency: str
+    local_currency: str
+    fx_rate: float
+    fx_version: str
+
+    @property
+    def projected_expenses(self) -> float:
+        return self.original_expenses * self.col_multiplier
+
+    @property
+    def projected_expenses_local(self) -> float:
+        return self.projected_expenses * self.fx_rate
+
+    def to_data(self) -> Dict[str, Any]:
+        projected_expenses = self.projected_expenses
+        return {
+            "original_expenses": self.original_expenses,
+            "projected_expenses": projected_expenses,
+            "col_multiplier": self.col_multiplier,
+            "currency": self.currency,
+            "local_currency": self.local_currency,
+            "fx_rate": self.fx_rate,
+            "projected_expenses_local": projected_expenses * self.fx_rate,
+            "fx_version": self.fx_version,
+            "details": {name: projected_expenses * share for name, share in EXPENSE_SHARES}
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ComplianceAnalysis:
+    income: float
+    income_tax: float
+    social_security: float
+    origin_tax: float = 0.0  # levied by an origin that taxes citizens abroad
+    treaty_relief: float = 0.0
+
+    @property
+    def estimated_tax(self) -> float:
+        return self.income_tax + self.social_security + self.origin_tax - self.treaty_relief
+
+    @property
+    def tax_rate(self) -> float:
+        return self.estimated_tax / self.income if self.income else 0.0
+
+    @property
+    def treaty_status(self) -> str:
+        return "favorable_treaty_found" if self.tax_rate < FAVORABLE_TREATY_THRESHOLD else "standard_dta"
+
+    def to_data(self) -> Dict[str, Any]:
+        estimated_tax = self.estimated_tax
+        return {
+            "tax_rate": self.tax_rate,
+            "estimated_tax": estimated_tax,
+            "income_tax": self.income_tax,
+            "social_security": self.social_security,
+            "origin_tax": self.origin_tax,
+            "treaty_relief": self.treaty_relief,
+            "net_wealth_projection": self.income - estimated_tax,
+            "visa_requirements": VISA_REQUIREMENTS,
+            "treaty_status": self.treaty_status
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class FinalReport:
+    net_annual_savings: float
+    quality_of_life_score: str
+    probability_of_loss: float
+
+    def to_data(self) -> Dict[str, Any]:
+        return {
+            "net_annual_savings": self.net_annual_savings,
+            "quality_of_life_score": self.quality_of_life_score,
+            "probability_of_loss": self.probability_of_loss
+        }
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class WealthProjection:
+    """Percentile bands per year as one array; the headline wealth is the median band."""
+    city: str
+    bands: Tuple[str, ...]
+    values: np.ndarray  # (bands, years), float64, read-only
+
+    @classmethod
+    def from_bands(cls, city: str, bands: Dict[str, Sequence[float]]) -> "WealthProjection":
+        values = np.array(list(bands.values()), dtype=np.float64)
+        values.flags.writeable = False
+        return cls(city, tuple(sys.intern(band) for band in bands), values)
+
+    @property
+    def years(self) -> int:
+        return self.values.shape[1]
+
+    def band(self, name: str) -> np.ndarray:
+        return self.values[self.bands.index(name)]
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, WealthProjection):
+            return NotImplemented
+        return self.city == other.city and self.bands == other.bands and np.array_equal(self.values, other.values)
+
+    def to_data(self) -> List[Dict[str, Any]]:
+        columns = self.values.T.tolist()
+        median = self.bands.index("p50")
+        return [
+            {"year": year + 1, "wealth": row[median], **dict(zip(self.bands, row)), "city": self.city}
+            for year, row in enumerate(columns)
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationResult:
+    """Everything /simulate returns for one request, as cached."""
+    final_report: Optional[FinalReport]
+    wealth_projection: Optional[WealthProjection]
+    risk_analysis: Optional[RiskAnalysis]
+    expense_analysis: Optional[ExpenseAnalysis]
+    compliance_analysis: Optional[ComplianceAnalysis]
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SimulationResult":
+        return cls(**{key: state.get(key) for key in cls.__slots__})
+
+    def to_data(self) -> Dict[str, Any]:
+        return {key: as_data(getattr(self, key)) for key in self.__slots__}
+
+
+RESULT_TYPES = (RiskAnalysis, ExpenseAnalysis, ComplianceAnalysis, FinalReport, WealthProjection, SimulationResult)
+
+
+def as_data(value: Any) -> Any:
+    """JSON-ready form of a result (and of the results in a dict or list); anything else as is."""
+    if isinstance(value, RESULT_TYPES):
+        return value.to_data()
+    if isinstance(value, dict):
+        return {key: as_data(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [as_data(item) for item in value]
+    return value
+
 
 class AgentState(TypedDict):
     # User Input
     current_city: str
     target_city: str
     user_profile: Dict[str, Any]  # income, expenses, lifestyle
-    
+
     # Agent Outputs
-    risk_analysis: Optional[Dict[str, Any]] # Actuary
-    expense_analysis: Optional[Dict[str, Any]] # Fiscal Ghost
-    compliance_analysis: Optional[Dict[str, Any]] # Nexus
-    
+    risk_analysis: Optional[RiskAnalysis] # Actuary
+    expense_analysis: Optional[ExpenseAnalysis] # Fiscal Ghost
+    compliance_analysis: Optional[ComplianceAnalysis] # Nexus
+
     # Final Output
-    final_report: Optional[Dict[str, Any]]
-    wealth_projection: Optional[List[Dict[str, Any]]] # 5-year projection
+    final_report: Optional[FinalReport]
+    wealth_projection: Optional[WealthProjection] # 5-year projection
     errors: List[str]
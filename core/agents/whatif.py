@@ -0,0 +1,120 @@
+"""
+Incremental what-if recomputation for dashboard sliders.
+
+A session keeps the last full graph state server-side. Each tick applies a
+delta to user_profile, reruns only the nodes that read a changed field
+(graph.NODE_INPUTS) plus everything downstream of them (graph.NODE_UPSTREAM),
+and returns what changed in the outputs. Nodes go through the same memo as
+the graph, so dragging a slider back to an earlier value is a cache hit.
+"""
+
+import asyncio
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from .graph import NODES, NODE_INPUTS, NODE_UPSTREAM
+from .state import AgentState, as_data
+
+MAX_SESSIONS = int(os.getenv("WHATIF_MAX_SESSIONS", "10000"))
+SESSION_TTL = float(os.getenv("WHATIF_SESSION_TTL", "1800"))
+
+# State keys written by the nodes, i.e. what a diff can contain
+OUTPUT_KEYS = ("risk_analysis", "expense_analysis", "compliance_analysis", "final_report", "wealth_projection")
+
+
+def affected_nodes(changed_paths: Set[str]) -> Set[str]:
+    """Nodes reading any of the changed paths, and every node downstream of them."""
+    dirty = {node for node, inputs in NODE_INPUTS.items() if changed_paths & set(inputs)}
+    grew = True
+    while grew:
+        downstream = {node for node, parents in NODE_UPSTREAM.items() if dirty & set(parents)}
+        grew = not downstream <= dirty
+        dirty |= downstream
+    return dirty
+
+
+def diff(old: Any, new: Any) -> Any:
+    """Changed leaves of new vs old; dicts are compared key by key, anything else as a whole."""
+    if not (isinstance(old, Mapping) and isinstance(new, Mapping)):
+        return new
+    changes = {}
+    for key, value in new.items():
+        if key not in old:
+            changes[key] = value
+        elif old[key] != value:
+            changes[key] = diff(old[key], value)
+    return changes
+
+
+async def recompute(state: AgentState, profile_delta: Mapping[str, Any]) -> Tuple[AgentState, List[str], Dict[str, Any]]:
+    """
+    Apply profile_delta to a finished state. Returns the new state, the
+    nodes that were rerun (in order) and the diff of their outputs.
+    """
+    profile = {**state["user_profile"], **profile_delta}
+    new_state: AgentState = {**state, "user_profile": profile}
+    changed = {
+        f"user_profile.{field}" for field, value in profile_delta.items()
+        if state["user_profile"].get(field) != value
+    }
+
+    pending = affected_nodes(changed)
+    rerun: List[str] = []
+    while pending:
+        # Every node whose inputs are final runs now, concurrently
+        ready = [node for node in NODES if node in pending and not pending & set(NODE_UPSTREAM.get(node, ()))]
+        updates = await asyncio.gather(*(NODES[node](new_state) for node in ready))
+        for update in updates:
+            new_state.update(update)
+        pending -= set(ready)
+        rerun.extend(ready)
+
+    changes = {}
+    for key in OUTPUT_KEYS:
+        if new_state.get(key) != state.get(key):
+            # Diffed in the JSON form the client holds
+            changes[key] = diff(as_data(state.get(key)), as_data(new_state.get(key)))
+    return new_state, rerun, changes
+
+
+class SessionStore:
+    """Last state per session, bounded by count (LRU) and idle time."""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self._sessions: "OrderedDict[str, Tuple[float, AgentState]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, state: AgentState) -> str:
+        session_id = secrets.token_urlsafe(16)
+        self.put(session_id, state)
+        return session_id
+
+    def get(self, session_id: str) -> Optional[AgentState]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        last_used, state = entry
+        if self.clock() - last_used > self.ttl:
+            del self._sessions[session_id]
+            return None
+        return state
+
+    def put(self, session_id: str, state: AgentState):
+        self._sessions[session_id] = (self.clock(), state)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+
+sessions = SessionStore()
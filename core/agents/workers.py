@@ -0,0 +1,40 @@
+"""
+Bounded worker pool for CPU-bound simulation work.
+
+Graph nodes that crunch numbers hand their work to this pool so the
+FastAPI event loop stays free to serve other requests. The pool size is
+bounded so a burst of simulations queues here instead of spawning an
+unbounded number of threads.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+MAX_WORKERS = int(os.getenv("SIMULATION_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="simulation")
+    return _executor
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on the worker pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+def shutdown(wait: bool = True):
+    """Stop the worker pool; a new one is created on the next call."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
@@ -0,0 +1,105 @@
+"""
+Batch simulation benchmark: vectorized engine vs the per-city loop.
+
+For 50, 200 and 1000 target cities, compares agents.batch.simulate_batch
+with running the agents and the same savings/projection maths city by city
+(without LangGraph overhead) and with one graph invocation per city, which
+also runs the Monte Carlo projection. Also checks that the batch and loop
+paths agree on the numbers.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_batch
+"""
+
+import asyncio
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from agents import batch, graph
+from shared.projection import project_wealth
+
+CITY_COUNTS = [50, 200, 1000]
+CITY_POOL = ["London", "Lisbon", "Dubai", "Singapore", "Berlin", "Monaco", "Austin", "Tokyo", "New York", "Porto"]
+
+USER_PROFILE = {
+    "annual_income": 120000,
+    "monthly_expenses": 4000,
+    "current_wealth": 50000
+}
+
+
+def make_cities(count):
+    return [CITY_POOL[i % len(CITY_POOL)] for i in range(count)]
+
+
+def initial_state(target_city):
+    return {
+        "current_city": "San Francisco",
+        "target_city": target_city,
+        "user_profile": USER_PROFILE,
+        "risk_analysis": None,
+        "expense_analysis": None,
+        "compliance_analysis": None,
+        "final_report": None,
+        "wealth_projection": None,
+        "errors": []
+    }
+
+
+async def per_city_loop(cities):
+    """Agents called directly plus the savings/expected-path maths, one city at a time."""
+    results = []
+    current_wealth = USER_PROFILE["current_wealth"]
+    for city in cities:
+        state = initial_state(city)
+        state.update(await graph.run_actuary(state))
+        state.update(await graph.run_ghost(state))
+        state.update(await graph.run_nexus(state))
+        savings = (
+            USER_PROFILE["annual_income"]
+            - state["compliance_analysis"].estimated_tax
+            - state["expense_analysis"].projected_expenses * 12
+        )
+        results.append({"savings": savings, "wealth": project_wealth(current_wealth, savings)})
+    return results
+
+
+async def per_city_graph(cities):
+    return [await graph.get_app().ainvoke(initial_state(city)) for city in cities]
+
+
+def timed(func, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    print("cities | batch (ms) | loop (ms) | graph (ms) | loop speedup | graph speedup")
+    for count in CITY_COUNTS:
+        cities = make_cities(count)
+        with contextlib.redirect_stdout(io.StringIO()):
+            batch_time, table = timed(lambda: batch.simulate_batch("San Francisco", cities, USER_PROFILE))
+            loop_time, states = timed(lambda: asyncio.run(per_city_loop(cities)))
+            graph_time, _ = timed(lambda: asyncio.run(per_city_graph(cities)), repeat=1)
+
+        loop_savings = np.array([result["savings"] for result in states])
+        assert np.allclose(loop_savings, table["columns"]["net_annual_savings"])
+        loop_wealth = np.array([result["wealth"][-1] for result in states])
+        assert np.allclose(loop_wealth, table["columns"]["wealth_year_5"])
+
+        print(
+            f"{count:>6} | {batch_time * 1000:10.3f} | {loop_time * 1000:9.3f} | {graph_time * 1000:10.1f} | "
+            f"{loop_time / batch_time:11.1f}x | {graph_time / batch_time:12.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Bulk NDJSON evaluation throughput.
+
+Streams synthetic employee profiles through bulk.evaluate_stream against
+5 target cities, generated and consumed lazily so nothing holds the whole
+upload, and reports profiles/sec and the peak memory Python allocated
+(tracemalloc) for growing uploads; flat memory means it does not depend
+on the number of profiles. Then sends 100k profiles through POST
+/simulate/bulk (in-process ASGI, chunked request body) and compares with
+one /simulate call per profile.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_bulk [--profiles 1000000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+
+import httpx
+
+from agents import bulk, memo
+from main import app
+
+CITIES = ["Lisbon", "Berlin", "Dubai", "Singapore", "Austin"]
+CURRENCIES = ["USD", "EUR", "GBP", "CAD", "INR"]
+BODY_CHUNK = 64 * 1024
+
+
+async def profile_body(count: int, seed: int = 7):
+    """NDJSON profiles in ~64 KB chunks, split mid-line like a network stream."""
+    rng = random.Random(seed)
+    buffer = bytearray()
+    for i in range(count):
+        buffer += json.dumps({"id": f"emp-{i}", "user_profile": {
+            "annual_income": rng.randint(40000, 400000),
+            "monthly_expenses": rng.randint(1500, 12000),
+            "current_wealth": rng.randint(0, 500000),
+            "currency": rng.choice(CURRENCIES)
+        }}).encode() + b"\n"
+        while len(buffer) >= BODY_CHUNK:
+            yield bytes(buffer[:BODY_CHUNK - 17])
+            del buffer[:BODY_CHUNK - 17]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def evaluate(count: int):
+    lines = 0
+    async for chunk in bulk.evaluate_stream("San Francisco", CITIES, profile_body(count)):
+        lines += chunk.count(b"\n")
+    return lines
+
+
+async def over_http(count: int):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        response = await client.post(
+            "/simulate/bulk",
+            params={"current_city": "San Francisco", "cities": CITIES},
+            content=profile_body(count)
+        )
+        bulk_time = time.perf_counter() - start
+        summary = json.loads(response.content.rstrip(b"\n").rsplit(b"\n", 1)[-1])
+        assert summary["profiles"] == count, summary
+
+        # Per-profile baseline: one /simulate per (profile, city), caches off
+        sample = 20
+        start = time.perf_counter()
+        for i in range(sample):
+            for city in CITIES:
+                response = await client.post("/simulate", json={
+                    "current_city": "San Francisco", "target_city": city,
+                    "user_profile": {"annual_income": 100000 + i, "monthly_expenses": 3000, "current_wealth": 50000}
+                })
+                response.raise_for_status()
+        single_time = (time.perf_counter() - start) / sample
+    return bulk_time, single_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    args = parser.parse_args()
+    memo.simulation_cache.max_entries = 0
+    memo.node_cache.max_entries = 0
+
+    print(f"{'profiles':>10} | {'seconds':>8} | {'profiles/s':>11} | {'peak KB':>8}")
+    for count in sorted({10_000, 100_000, args.profiles}):
+        tracemalloc.start()
+        start = time.perf_counter()
+        lines = asyncio.run(evaluate(count))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert lines == count + 2
+        print(f"{count:>10,} | {elapsed:>8.2f} | {count / elapsed:>11,.0f} | {peak / 1024:>8,.1f}")
+    print("(includes generating and encoding the synthetic upload; tracemalloc slows both)")
+
+    count = 100_000
+    bulk_time, single_time = asyncio.run(over_http(count))
+    print(f"POST /simulate/bulk, {count:,} profiles x {len(CITIES)} cities: {bulk_time:.2f} s ({count / bulk_time:,.0f} profiles/s)")
+    print(f"POST /simulate per profile x city: {single_time * 1000:.1f} ms per profile ({1 / single_time:,.0f} profiles/s)")
+
+
+if __name__ == "__main__":
+    main()
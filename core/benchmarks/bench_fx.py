@@ -0,0 +1,111 @@
+"""
+Exchange-rate matrix benchmark.
+
+Converts 1M amounts between random currency pairs of the snapshot with
+one matrix gather (RateSnapshot.convert, from currency codes and from
+pre-resolved matrix rows) and with a per-amount loop over base-currency
+quotes, triangulating each pair as it goes. Then keeps
+reader threads converting while the main thread swaps snapshot versions
+as fast as it can, and checks that every reader's result is consistent
+with exactly one version and that no reader ever waited on a lock.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_fx
+"""
+
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+import agents  # noqa: F401  puts the repository root, home of shared/, on sys.path
+from shared import fx
+
+AMOUNTS = 1_000_000
+READERS = 4
+SWAPS = 200
+
+
+def convert_loop(amounts, from_codes, to_codes, base_rates):
+    return [amount / base_rates[source] * base_rates[target]
+            for amount, source, target in zip(amounts, from_codes, to_codes)]
+
+
+def main():
+    snapshot = fx.RateSnapshot.from_file(fx.SNAPSHOT_PATH)
+    base_rates = json.loads(fx.SNAPSHOT_PATH.read_text())["rates"]
+    rng = np.random.default_rng(7)
+    amounts = rng.uniform(1, 10000, AMOUNTS)
+    from_codes = rng.choice(snapshot.codes, AMOUNTS)
+    to_codes = rng.choice(snapshot.codes, AMOUNTS)
+
+    start = time.perf_counter()
+    converted = snapshot.convert(amounts, from_codes, to_codes)
+    matrix_time = time.perf_counter() - start
+
+    # Rows resolved once up front, as for a fixed set of cities
+    from_rows, to_rows = snapshot.indices(from_codes), snapshot.indices(to_codes)
+    start = time.perf_counter()
+    amounts * snapshot.matrix[from_rows, to_rows]
+    gather_time = time.perf_counter() - start
+
+    sample = slice(0, 100_000)
+    start = time.perf_counter()
+    looped = convert_loop(amounts[sample].tolist(), from_codes[sample].tolist(), to_codes[sample].tolist(), base_rates)
+    loop_time = (time.perf_counter() - start) * AMOUNTS / 100_000
+    assert np.allclose(converted[sample], looped)
+
+    print(f"Currencies: {len(snapshot)}  matrix: {snapshot.matrix.nbytes / 1024:.1f} KB")
+    print(f"Convert {AMOUNTS:,} amounts (codes, matrix gather): {matrix_time * 1000:9.1f} ms")
+    print(f"Convert {AMOUNTS:,} amounts (rows, matrix gather):  {gather_time * 1000:9.1f} ms")
+    print(f"Convert {AMOUNTS:,} amounts (per amount loop):      {loop_time * 1000:9.1f} ms (extrapolated from 100k)")
+
+    # Two snapshot files with different EUR rates, swapped back and forth
+    with tempfile.TemporaryDirectory() as tmp:
+        source = json.loads(fx.SNAPSHOT_PATH.read_text())
+        paths = []
+        for i, eur in enumerate((0.90, 0.95)):
+            path = Path(tmp) / f"rates_{i}.json"
+            path.write_text(json.dumps({**source, "rates": {**source["rates"], "EUR": eur}}))
+            paths.append(path)
+        service = fx.FxService(paths[0], check_interval=float("inf"))
+        eur_by_version = {}
+        for path in paths:
+            service.path = path
+            snapshot = service.refresh()
+            eur_by_version[snapshot.version] = snapshot.rate("USD", "EUR")
+
+        stop = threading.Event()
+        reads, inconsistent = [0] * READERS, [0] * READERS
+        usd = np.full(1000, "USD")
+        eur = np.full(1000, "EUR")
+
+        def reader(slot):
+            while not stop.is_set():
+                current = service.current()
+                result = current.convert(np.ones(1000), usd, eur)
+                if not np.all(result == eur_by_version[current.version]):
+                    inconsistent[slot] += 1
+                reads[slot] += 1
+
+        threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(READERS)]
+        for thread in threads:
+            thread.start()
+        start = time.perf_counter()
+        for i in range(SWAPS):
+            service.path = paths[i % 2]
+            service.refresh()
+        swap_time = (time.perf_counter() - start) / SWAPS
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    print(f"Snapshot swap (load + triangulate + publish): {swap_time * 1000:.2f} ms")
+    print(f"Reads during {SWAPS} swaps: {sum(reads):,} across {READERS} threads, inconsistent: {sum(inconsistent)}")
+
+
+if __name__ == "__main__":
+    main()
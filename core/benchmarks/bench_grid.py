@@ -0,0 +1,92 @@
+"""
+Sensitivity grid benchmark at 1M cells.
+
+10 cities x 100 incomes x 100 expense levels x 10 wealth levels through
+POST /simulate/grid (in-process ASGI). Reports the broadcast computation,
+.npz encoding and end-to-end time, the payload size against the same
+values as nested JSON lists, and what the same grid would cost as
+individual /simulate calls (extrapolated from a sample, caches off).
+
+Run from the core/ directory:
+    python -m benchmarks.bench_grid
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import time
+
+import httpx
+import numpy as np
+
+from agents import grid, memo
+from main import app
+
+CITIES = ["Lisbon", "Berlin", "Dubai", "Singapore", "Austin", "Mexico City", "Bangkok", "London", "Tokyo", "Toronto"]
+INCOME = {"start": 40000, "stop": 400000, "steps": 100}
+EXPENSES = {"start": 1500, "stop": 15000, "steps": 100}
+WEALTH = {"start": 0, "stop": 500000, "steps": 10}
+SAMPLE_CALLS = 50
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "cities": CITIES,
+    "annual_income": INCOME,
+    "monthly_expenses": EXPENSES,
+    "current_wealth": WEALTH
+}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+async def run_benchmark():
+    axes = [grid.axis(**spec) for spec in (INCOME, EXPENSES, WEALTH)]
+    cells = len(CITIES) * INCOME["steps"] * EXPENSES["steps"] * WEALTH["steps"]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        grid.simulate_grid("San Francisco", CITIES, *axes, 5)
+        result, compute = timed(grid.simulate_grid, "San Francisco", CITIES, *axes, 5)
+    body, encode = timed(grid.to_npz, result)
+    as_json, json_encode = timed(lambda: json.dumps({key: value.tolist() for key, value in result.items()}))
+    json_size = len(as_json)
+
+    # Keep the result caches out of the per-call estimate
+    memo.simulation_cache.max_entries = 0
+    memo.node_cache.max_entries = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await client.post("/simulate/grid", json=PAYLOAD)
+            start = time.perf_counter()
+            response = await client.post("/simulate/grid", json=PAYLOAD)
+            end_to_end = time.perf_counter() - start
+            response.raise_for_status()
+
+            start = time.perf_counter()
+            for i in range(SAMPLE_CALLS):
+                await client.post("/simulate", json={
+                    "current_city": "San Francisco",
+                    "target_city": CITIES[i % len(CITIES)],
+                    "user_profile": {"annual_income": 100000 + i, "monthly_expenses": 4000, "current_wealth": 50000}
+                })
+            per_call = (time.perf_counter() - start) / SAMPLE_CALLS
+
+    decoded = np.load(io.BytesIO(response.content))
+    assert decoded["final_wealth"].shape == (len(CITIES), INCOME["steps"], EXPENSES["steps"], WEALTH["steps"])
+
+    print(f"Grid: {' x '.join(str(size) for size in decoded['final_wealth'].shape)} = {cells:,} cells")
+    print(f"Broadcast computation:  {compute * 1000:9.1f} ms")
+    print(f".npz encoding:          {encode * 1000:9.1f} ms   ({len(body) / 1e6:.1f} MB)")
+    print(f"Nested JSON encoding:   {json_encode * 1000:9.1f} ms   ({json_size / 1e6:.1f} MB)")
+    print(f"/simulate/grid end to end: {end_to_end * 1000:6.1f} ms")
+    print(f"Same cells as /simulate calls: ~{per_call * cells / 3600:,.1f} h ({per_call * 1000:.1f} ms per call)")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
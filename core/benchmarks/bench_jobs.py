@@ -0,0 +1,131 @@
+"""
+Background job queue benchmark.
+
+Sends a burst of 1M-cell sensitivity grids two ways while a client keeps
+polling /health (in-process ASGI):
+- inline: POST /simulate/grid, held open until each grid is done;
+- jobs: POST /jobs/grid, then polling /jobs/{id} and fetching the result.
+
+Reports how long each submit held its request, /health latency during
+the burst, total time, and the queue's depth and wait-time metrics. Then
+fills a small queue to show submits beyond it get 503 + Retry-After.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_jobs [--grids 8] [--workers 1]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+import httpx
+
+from agents import jobs, memo
+from main import app
+
+GRID = {
+    "current_city": "San Francisco",
+    "cities": ["Lisbon", "Berlin", "Dubai", "Singapore", "Austin", "Mexico City", "Bangkok", "London", "Tokyo", "Toronto"],
+    "annual_income": {"start": 40000, "stop": 400000, "steps": 100},
+    "monthly_expenses": {"start": 1500, "stop": 15000, "steps": 100},
+    "current_wealth": {"start": 0, "stop": 500000, "steps": 10}
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def poll_health(client, stop: asyncio.Event, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+
+
+async def inline_grid(client, held):
+    start = time.perf_counter()
+    response = await client.post("/simulate/grid", json=GRID)
+    response.raise_for_status()
+    held.append(time.perf_counter() - start)
+
+
+async def job_grid(client, held):
+    start = time.perf_counter()
+    response = await client.post("/jobs/grid", json=GRID)
+    response.raise_for_status()
+    held.append(time.perf_counter() - start)
+    job_id = response.json()["job_id"]
+    while (await client.get(f"/jobs/{job_id}")).json()["job"]["status"] not in jobs.FINISHED:
+        await asyncio.sleep(0.02)
+    result = await client.get(f"/jobs/{job_id}/result")
+    result.raise_for_status()
+
+
+async def burst(client, submit, grids):
+    held, latencies = [], []
+    stop = asyncio.Event()
+    poller = asyncio.create_task(poll_health(client, stop, latencies))
+    start = time.perf_counter()
+    await asyncio.gather(*(submit(client, held) for _ in range(grids)))
+    total = time.perf_counter() - start
+    stop.set()
+    await poller
+    return held, latencies, total
+
+
+async def run_benchmark(grids: int, workers: int):
+    memo.simulation_cache.max_entries = 0
+    memo.node_cache.max_entries = 0
+    jobs.queue = jobs.JobQueue(store=jobs.MemoryJobStore(), workers=workers)
+    await jobs.queue.start()
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            with contextlib.redirect_stdout(io.StringIO()):
+                # Start the worker processes before timing
+                await job_grid(client, [])
+                await inline_grid(client, [])
+
+                rows = [
+                    ("inline /simulate/grid", await burst(client, inline_grid, grids)),
+                    ("/jobs/grid + polling", await burst(client, job_grid, grids)),
+                ]
+            stats = jobs.queue.stats()
+    finally:
+        await jobs.queue.stop()
+
+    print(f"{grids} grids of 1M cells, {workers} job worker(s)")
+    print("mode                  | submit held p50 | /health p50 | /health p99 | total (s)")
+    for name, (held, latencies, total) in rows:
+        print(f"{name:<21} | {percentile(held, 0.5) * 1000:12.1f} ms | {percentile(latencies, 0.5) * 1000:8.1f} ms"
+              f" | {percentile(latencies, 0.99) * 1000:8.1f} ms | {total:9.2f}")
+    wait = stats["wait_seconds"]
+    print(f"Queue wait: p50 {wait['p50']:.2f}s, p95 {wait['p95']:.2f}s over {wait['count']} jobs; "
+          f"run p50 {stats['run_seconds']['p50'] * 1000:.0f} ms")
+
+    # Backpressure: a queue of 2 with a single worker
+    jobs.queue = jobs.JobQueue(store=jobs.MemoryJobStore(), workers=1, max_queued=2)
+    await jobs.queue.start()
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            responses = [await client.post("/jobs/grid", json=GRID) for _ in range(6)]
+            depth = (await client.get("/jobs/stats")).json()["queue_depth"]
+    finally:
+        await jobs.queue.stop()
+    codes = [response.status_code for response in responses]
+    retry = next((response.headers["retry-after"] for response in responses if response.status_code == 503), None)
+    print(f"Backpressure (max_queued=2): submit statuses {codes}, Retry-After {retry}s, depth {depth}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grids", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.grids, args.workers))
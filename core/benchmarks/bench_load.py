@@ -0,0 +1,156 @@
+"""
+Load-test harness for the core API.
+
+Drives /simulate with 1, 10 and 100 concurrent clients and reports p50/p99
+latency and requests/sec. While each load level runs, /health is probed on
+the side: if simulations block the event loop, its latency climbs with
+the simulation latency instead of staying flat.
+
+By default a uvicorn server is started in a subprocess, so the load
+generator does not compete with it for the GIL; pass --url to load an
+already running server instead.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_load
+    python -m benchmarks.bench_load --url http://localhost:8000 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import httpx
+
+CONCURRENCY_LEVELS = [1, 10, 100]
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {
+        "annual_income": 120000,
+        "monthly_expenses": 4000,
+        "current_wealth": 50000
+    }
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_server(cache: bool) -> Tuple[str, subprocess.Popen]:
+    """Start the core app on a free local port and return its base URL."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        # Every request repeats PAYLOAD, so by default keep the result
+        # caches out of the way and load the full graph
+        env=os.environ if cache else {**os.environ, "SIMULATION_CACHE_SIZE": "0", "NODE_CACHE_SIZE": "0"},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"{base_url}/health")
+            return base_url, process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Server did not start within 30s")
+
+
+async def client_worker(client: httpx.AsyncClient, queue: asyncio.Queue, latencies: List[float], errors: List[int]):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.post("/simulate", json=PAYLOAD)
+        except httpx.TransportError:
+            errors.append(0)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, latencies: List[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def run_level(base_url: str, concurrency: int, total_requests: int):
+    # One single-connection client per simulated user, plus a separate one
+    # for the health probe, so client-side pooling never queues requests.
+    limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+    clients = [httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) for _ in range(concurrency + 1)]
+    health_client, sim_clients = clients[0], clients[1:]
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total_requests):
+        queue.put_nowait(None)
+
+    latencies: List[float] = []
+    health_latencies: List[float] = []
+    errors: List[int] = []
+    stop = asyncio.Event()
+
+    try:
+        probe = asyncio.create_task(probe_health(health_client, stop, health_latencies))
+        start = time.perf_counter()
+        await asyncio.gather(*(client_worker(client, queue, latencies, errors) for client in sim_clients))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe
+    finally:
+        for client in clients:
+            await client.aclose()
+
+    print(
+        f"{concurrency:>11} | {len(latencies) / elapsed:9.1f} | "
+        f"{statistics.median(latencies) * 1000:8.2f} | {percentile(latencies, 99) * 1000:8.2f} | "
+        f"{percentile(health_latencies, 99) * 1000:15.2f} | {len(errors)}"
+    )
+
+
+async def main(base_url: str, requests_per_client: int):
+    print(f"Target: {base_url}")
+    print("concurrency |   req/s   | p50 (ms) | p99 (ms) | health p99 (ms) | errors")
+    for concurrency in CONCURRENCY_LEVELS:
+        await run_level(base_url, concurrency, concurrency * requests_per_client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test /simulate")
+    parser.add_argument("--url", help="Base URL of a running server (default: start one in-process)")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per concurrent client")
+    parser.add_argument("--cache", action="store_true", help="Leave the result caches on (measures the hit path)")
+    args = parser.parse_args()
+
+    server: Optional[subprocess.Popen] = None
+    url = args.url
+    if url is None:
+        url, server = start_server(args.cache)
+    try:
+        asyncio.run(main(url, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,107 @@
+"""
+Result memoization benchmark.
+
+Measures /simulate (in-process ASGI) on three paths:
+- miss: caches cleared before every request, the whole graph runs;
+- node hits: only monthly_expenses changes, so fiscal_ghost and the
+  aggregator rerun and the other agents come from the node cache (the
+  local agents are cheap, so this stays close to the miss path: the
+  aggregator's Monte Carlo dominates);
+- hit: an identical payload, served from the simulation cache.
+
+Also times the key computation on its own, and fills a small cache past
+its bound to show the eviction counters.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_memo
+"""
+
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+import httpx
+
+from agents import memo
+from main import app
+
+RUNS = 200
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {
+        "annual_income": 120000,
+        "monthly_expenses": 4000,
+        "current_wealth": 50000
+    }
+}
+
+
+def with_expenses(monthly_expenses: float):
+    return {**PAYLOAD, "user_profile": {**PAYLOAD["user_profile"], "monthly_expenses": monthly_expenses}}
+
+
+async def time_requests(client: httpx.AsyncClient, payloads, before=None):
+    timings = []
+    for payload in payloads:
+        if before:
+            before()
+        start = time.perf_counter()
+        response = await client.post("/simulate", json=payload)
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return timings
+
+
+def clear_caches():
+    memo.simulation_cache.clear()
+    memo.node_cache.clear()
+
+
+def report(name: str, timings):
+    ordered = sorted(timings)
+    print(
+        f"{name:<11} | {statistics.median(ordered) * 1000:8.3f} | "
+        f"{ordered[int(0.99 * (len(ordered) - 1))] * 1000:8.3f} | {len(ordered) / sum(ordered):8.0f}"
+    )
+
+
+async def run_benchmark():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Agents print progress; keep it out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            await client.post("/simulate", json=PAYLOAD)
+            miss = await time_requests(client, [PAYLOAD] * RUNS, before=clear_caches)
+            # Each request has a new expense figure: simulation cache misses,
+            # actuary and nexus hit the node cache
+            node_hits = await time_requests(client, [with_expenses(3000 + i) for i in range(RUNS)])
+            hit = await time_requests(client, [PAYLOAD] * RUNS)
+
+    print(f"Runs: {RUNS} per path")
+    print("path        | p50 (ms) | p99 (ms) |  req/s")
+    report("miss", miss)
+    report("node hits", node_hits)
+    report("hit", hit)
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        memo.simulation_key(PAYLOAD)
+    print(f"\nsimulation_key: {(time.perf_counter() - start) / 10_000 * 1e6:.1f} us")
+
+    print("\nNode cache after the runs:")
+    for node, stats in memo.node_cache.stats()["namespaces"].items():
+        print(f"  {node:<12} hits {stats['hits']:>5}  misses {stats['misses']:>5}")
+
+    small = memo.ResultCache(max_entries=100)
+    for i in range(1000):
+        small.put(memo.content_hash("bench", i), i)
+    stats = small.stats()
+    print(f"\n1000 puts into a 100-entry cache: {stats['entries']} entries, {stats['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,63 @@
+"""
+Monte Carlo projection benchmark at 10k, 100k and 1M paths.
+
+Reports wall time, paths/s and peak traced memory for a 5-year and a
+30-year horizon, and checks that a fixed seed gives the same bands
+whatever the chunk size. "cold" is the first projection for a config
+(random draws included); "warm" is a later projection with other inputs,
+which reuses the cached factors when the config is small enough.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_montecarlo
+"""
+
+import time
+import tracemalloc
+from dataclasses import replace
+
+import numpy as np
+
+import agents  # noqa: F401  puts the repository root, home of shared/, on sys.path
+from shared.montecarlo import DEFAULT_CONFIG, simulate_wealth
+
+PATH_COUNTS = [10_000, 100_000, 1_000_000]
+HORIZONS = [5, 30]
+
+# San Francisco -> Lisbon style profile: net income and annual expenses in USD
+INITIAL_WEALTH = 50_000
+NET_INCOME = 84_000
+ANNUAL_EXPENSES = 33_600
+
+
+def run(config, net_income=NET_INCOME):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = simulate_wealth(INITIAL_WEALTH, net_income, ANNUAL_EXPENSES, config)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    small = replace(DEFAULT_CONFIG, paths=20_000)
+    bands_one_chunk = simulate_wealth(INITIAL_WEALTH, NET_INCOME, ANNUAL_EXPENSES, replace(small, chunk_size=20_000))
+    bands_many_chunks = simulate_wealth(INITIAL_WEALTH, NET_INCOME, ANNUAL_EXPENSES, replace(small, chunk_size=3_000))
+    assert np.allclose(bands_one_chunk["percentiles"]["p50"], bands_many_chunks["percentiles"]["p50"])
+
+    print("years |     paths | cold (ms) | warm (ms) | warm paths/s | peak mem (MB) | p5 / p50 / p95 final wealth")
+    for years in HORIZONS:
+        for paths in PATH_COUNTS:
+            config = replace(DEFAULT_CONFIG, paths=paths, years=years)
+            result, cold, peak = run(config)
+            _, warm, _ = run(config, NET_INCOME + 1_000)
+            bands = result["percentiles"]
+            print(
+                f"{years:>5} | {paths:>9,} | {cold * 1000:9.1f} | {warm * 1000:9.1f} | {paths / warm:12,.0f} | "
+                f"{peak / 1024 / 1024:13.1f} | "
+                f"{bands['p5'][-1]:,.0f} / {bands['p50'][-1]:,.0f} / {bands['p95'][-1]:,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Latency benchmark for the fan-out agent graph.
+
+Each agent is given a simulated data-source latency, then end-to-end
+/simulate time is compared with the slowest single agent. With the agents
+running in parallel the two should be close; a sequential chain would cost
+the sum of all three.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_parallel_graph
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from agents import graph, memo
+from main import app
+
+# Simulated per-agent data-source latency in seconds
+AGENT_LATENCY = {
+    "actuary": ("analyze_risk", 0.12),
+    "ghost": ("calculate_expenses", 0.08),
+    "nexus": ("analyze_compliance", 0.05),
+}
+RUNS = 20
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {
+        "annual_income": 120000,
+        "monthly_expenses": 4000,
+        "current_wealth": 50000
+    }
+}
+
+
+def add_latency():
+    """Wrap each agent entry point with an awaitable delay."""
+    # Repeated payloads would otherwise be served from the result caches
+    memo.simulation_cache.max_entries = 0
+    memo.node_cache.max_entries = 0
+    for agent_name, (method_name, delay) in AGENT_LATENCY.items():
+        agent = getattr(graph, agent_name)
+        original = getattr(agent, method_name)
+
+        async def slow(*args, _original=original, _delay=delay, **kwargs):
+            await asyncio.sleep(_delay)
+            return await _original(*args, **kwargs)
+
+        setattr(agent, method_name, slow)
+
+
+async def run_benchmark():
+    add_latency()
+    transport = httpx.ASGITransport(app=app)
+    timings = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up
+        await client.post("/simulate", json=PAYLOAD)
+
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            response = await client.post("/simulate", json=PAYLOAD)
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    slowest = max(delay for _, delay in AGENT_LATENCY.values())
+    sequential = sum(delay for _, delay in AGENT_LATENCY.values())
+    median = statistics.median(timings)
+
+    print(f"Runs: {RUNS}")
+    print(f"Slowest single agent:   {slowest * 1000:8.1f} ms")
+    print(f"Sequential chain cost:  {sequential * 1000:8.1f} ms")
+    print(f"/simulate median:       {median * 1000:8.1f} ms")
+    print(f"/simulate max:          {max(timings) * 1000:8.1f} ms")
+    print(f"Overhead vs slowest:    {(median - slowest) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
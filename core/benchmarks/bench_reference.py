@@ -0,0 +1,132 @@
+"""
+Reference index benchmark at 50k cities.
+
+Generates a synthetic 50,000-city CSV, then measures: building the packed
+index from CSV, compiling it to disk, opening the compiled copy (memory-
+mapped), single and batch lookups per second, alias and fuzzy lookups,
+and the resident memory the loaded index adds to the process.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_reference
+"""
+
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from agents.reference import CityIndex
+
+CITY_COUNT = 50_000
+LOOKUPS = 200_000
+FUZZY_LOOKUPS = 200
+CURRENCIES = ["USD", "EUR", "GBP", "JPY", "INR", "BRL", "AED", "SGD"]
+COLUMNS = ["city_id", "name", "country", "currency", "col_multiplier", "tax_rate",
+           "air_quality_index", "safety_score", "healthcare_wait_time_hours", "aliases"]
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (Linux)."""
+    with open("/proc/self/statm") as handle:
+        pages = int(handle.read().split()[1])
+    return pages * 4096 / 1024 / 1024
+
+
+def write_dataset(path: Path, rng: random.Random):
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(COLUMNS)
+        for i in range(CITY_COUNT):
+            name = f"City {i:05d}"
+            writer.writerow([
+                f"city-{i:05d}", name, "XX", rng.choice(CURRENCIES),
+                round(rng.uniform(0.3, 1.6), 2), round(rng.uniform(0, 0.45), 3),
+                rng.randint(10, 180), rng.randint(30, 95), rng.randint(1, 20),
+                f"alias {i:05d}"
+            ])
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>12,.0f} /s"
+
+
+def main():
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "cities.csv"
+        compiled = Path(tmp) / "compiled"
+        write_dataset(csv_path, rng)
+
+        start = time.perf_counter()
+        built = CityIndex.from_csv(csv_path)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        built.save(compiled)
+        save_time = time.perf_counter() - start
+        del built
+
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        index = CityIndex.load(compiled)
+        load_time = time.perf_counter() - start
+        rss_after = rss_mb()
+
+        names = [f"City {rng.randrange(CITY_COUNT):05d}" for _ in range(LOOKUPS)]
+        aliases = [f"alias {rng.randrange(CITY_COUNT):05d}" for _ in range(LOOKUPS)]
+        typos = [f"Cty {rng.randrange(CITY_COUNT):05d}" for _ in range(FUZZY_LOOKUPS)]
+
+        # First pass normalizes every spelling, later passes hit the memo
+        start = time.perf_counter()
+        for name in names:
+            index.resolve(name)
+        cold_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in names:
+            index.resolve(name)
+        warm_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for alias in aliases:
+            index.resolve(alias)
+        alias_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in names[:50_000]:
+            index.lookup(name)
+        lookup_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        columns = index.columns(names)
+        batch_time = time.perf_counter() - start
+        assert len(columns) == LOOKUPS
+
+        # The first misspelling also builds the trigram index
+        start = time.perf_counter()
+        index.resolve("Cty warmup")
+        trigram_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for typo in typos:
+            index.resolve(typo)
+        fuzzy_time = time.perf_counter() - start
+
+    print(f"Cities:                 {CITY_COUNT:,} ({len(index.keys):,} keys)")
+    print(f"Build from CSV:         {build_time * 1000:10.1f} ms")
+    print(f"Compile to disk:        {save_time * 1000:10.1f} ms")
+    print(f"Open compiled (mmap):   {load_time * 1000:10.1f} ms")
+    print(f"Resident memory added:  {rss_after - rss_before:10.1f} MB")
+    print(f"Records array:          {index.records.nbytes / 1024 / 1024:10.1f} MB on disk")
+    print(f"resolve, first seen:    {rate(LOOKUPS, cold_time)}")
+    print(f"resolve, repeated:      {rate(LOOKUPS, warm_time)}")
+    print(f"resolve, alias:         {rate(LOOKUPS, alias_time)}")
+    print(f"lookup (dict record):   {rate(50_000, lookup_time)}")
+    print(f"columns (batch):        {rate(LOOKUPS, batch_time)}")
+    print(f"Trigram index build:    {trigram_time * 1000:10.1f} ms")
+    print(f"resolve, fuzzy typo:    {rate(FUZZY_LOOKUPS, fuzzy_time)}")
+
+
+if __name__ == "__main__":
+    main()
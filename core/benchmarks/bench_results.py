@@ -0,0 +1,94 @@
+"""
+Memory held by cached simulation results.
+
+Runs the agents and the aggregator for 100k distinct profiles and keeps
+every result in a memo.ResultCache, the way /simulate caches them, once
+as the typed results from agents/state.py and once as the nested dicts
+clients receive (the form results were kept in before). Reports the
+memory each cache holds (tracemalloc) and per-result size, and the cost
+of expanding one result to JSON at the edge, which a cache hit now pays.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_results [--results 100000]
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from agents import memo
+from agents.graph import actuary, aggregator, ghost, nexus
+from agents.state import SimulationResult, as_data
+from shared.encoding import dumps_json
+
+CITIES = ["Lisbon", "Berlin", "Dubai", "Singapore", "Austin", "Delhi", "Tokyo", "Mexico City"]
+
+
+async def simulate(i: int):
+    """The graph's nodes run directly, without the per-node memo."""
+    profile = {"annual_income": 60000 + 7 * i, "monthly_expenses": 2000 + i % 3000, "current_wealth": 1000 + i}
+    target = CITIES[i % len(CITIES)]
+    state = {"current_city": "San Francisco", "target_city": target, "user_profile": profile}
+    state["risk_analysis"] = await actuary.analyze_risk(target)
+    state["expense_analysis"] = await ghost.calculate_expenses(profile, target)
+    state["compliance_analysis"] = await nexus.analyze_compliance(profile, target, state["current_city"])
+    state.update(aggregator(state))
+    return SimulationResult.from_state(state)
+
+
+async def fill(cache: memo.ResultCache, keys):
+    for i, key in enumerate(keys):
+        cache.put(key, await simulate(i))
+
+
+def held(baseline: int) -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=100_000)
+    args = parser.parse_args()
+    keys = [f"{i:032x}" for i in range(args.results)]
+    cache = memo.ResultCache(args.results)
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    asyncio.run(fill(cache, keys))
+    fill_time = time.perf_counter() - start
+    typed = held(baseline)
+
+    # Same results as nested dicts; the typed ones are released as they are replaced
+    for key in keys:
+        cache.put(key, as_data(cache.get(key)))
+    nested = held(baseline)
+    tracemalloc.stop()
+
+    print(f"{args.results:,} cached results (computed in {fill_time:.1f} s)")
+    print(f"{'form':>12} | {'held MB':>8} | {'bytes/result':>12}")
+    for name, size in (("nested dicts", nested), ("typed", typed)):
+        print(f"{name:>12} | {size / 2**20:>8.1f} | {size / args.results:>12,.0f}")
+    print(f"Reduction: {1 - typed / nested:.0%}")
+
+    # Edge cost on a cache hit: expand and encode, vs encoding stored dicts
+    result = asyncio.run(simulate(0))
+    data = as_data(result)
+    runs = 20_000
+    start = time.perf_counter()
+    for _ in range(runs):
+        dumps_json({"status": "success", "data": as_data(result)})
+    typed_time = (time.perf_counter() - start) / runs
+    start = time.perf_counter()
+    for _ in range(runs):
+        dumps_json({"status": "success", "data": data})
+    nested_time = (time.perf_counter() - start) / runs
+    print(f"Encode one cached result: typed {typed_time * 1e6:.1f} us, nested dicts {nested_time * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
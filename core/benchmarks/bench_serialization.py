@@ -0,0 +1,116 @@
+"""
+Response serialization benchmark.
+
+Encodes three result shapes with each response format and reports payload
+size and encode time:
+- one /simulate result (5-year projection with percentile bands);
+- a /simulate/batch table for 1,000 cities;
+- 200 cities x 30-year projections with percentile bands and means,
+  the shape that grows with years, paths and cities.
+
+"FastAPI default" is jsonable_encoder + json.dumps, the path responses
+took before; the other rows are shared/encoding.py.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import time
+from dataclasses import replace
+
+from fastapi.encoders import jsonable_encoder
+
+from agents import batch
+from agents.graph import get_app
+from agents.state import as_data
+from shared import encoding
+from shared.montecarlo import DEFAULT_CONFIG, simulate_wealth
+
+REPEATS = 20
+
+PROFILE = {
+    "annual_income": 120000,
+    "monthly_expenses": 4000,
+    "current_wealth": 50000
+}
+
+
+def single_result():
+    state = {
+        "current_city": "San Francisco",
+        "target_city": "Lisbon",
+        "user_profile": PROFILE,
+        "risk_analysis": None,
+        "expense_analysis": None,
+        "compliance_analysis": None,
+        "final_report": None,
+        "wealth_projection": None,
+        "errors": []
+    }
+    result = asyncio.run(get_app().ainvoke(state))
+    keys = ("final_report", "wealth_projection", "risk_analysis", "expense_analysis", "compliance_analysis")
+    return {"status": "success", "data": {key: as_data(result[key]) for key in keys}}
+
+
+def batch_result():
+    cities = [f"City {i}" for i in range(1000)]
+    return {"status": "success", "data": batch.simulate_batch("San Francisco", cities, PROFILE)}
+
+
+def long_projections():
+    config = replace(DEFAULT_CONFIG, years=30)
+    projections = {}
+    for i in range(200):
+        simulation = simulate_wealth(50000, 80000 + 100 * i, 40000, config)
+        projections[f"City {i}"] = [
+            {"year": year + 1, "mean": simulation["mean"][year],
+             **{band: values[year] for band, values in simulation["percentiles"].items()}}
+            for year in range(config.years)
+        ]
+    return {"status": "success", "data": {"projections": projections}}
+
+
+def fastapi_default(data):
+    return json.dumps(jsonable_encoder(data)).encode()
+
+
+def float64_body(data):
+    return b"".join(encoding.encode_float64(data))
+
+
+FORMATS = [
+    ("FastAPI default", fastapi_default),
+    ("orjson", encoding.dumps_json),
+    ("float64 buffers", float64_body),
+]
+
+
+def measure(encode, data):
+    body = encode(data)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        encode(data)
+    return len(body), (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        payloads = [
+            ("single /simulate", single_result()),
+            ("batch, 1k cities", batch_result()),
+            ("200 x 30y bands", long_projections()),
+        ]
+
+    print("payload          | format          |  size (KB) | encode (ms)")
+    for name, data in payloads:
+        for format_name, encode in FORMATS:
+            size, elapsed = measure(encode, data)
+            print(f"{name:<16} | {format_name:<15} | {size / 1024:10.1f} | {elapsed * 1000:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Cold start benchmark.
+
+Each run is a fresh interpreter (python -m benchmarks.bench_startup --once)
+that imports main, starts the app's lifespan and sends GET /health, then
+POST /simulate, through an in-process ASGI client. Every step is timed
+from the start of the import. Runs with the startup warm-up on (the
+default) and off (WARM_UP=0: reference data and graph load on the first
+request), and reports the medians against BUDGETS. With STARTUP_BUDGETS=1,
+test_startup.py runs the same measurement and fails when a budget is
+exceeded; otherwise it only checks that importing main leaves LangGraph
+unloaded.
+
+STARTUP_BUDGET_SCALE multiplies every budget, for slower machines.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+CORE_DIR = Path(__file__).resolve().parent.parent
+
+# Seconds from the start of `import main`
+BUDGETS = {
+    "import": 0.7,
+    "first_health": 0.8,
+    "first_simulate": 2.5,
+}
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {
+        "annual_income": 120000,
+        "monthly_expenses": 4000,
+        "current_wealth": 50000
+    }
+}
+
+
+def budgets() -> Dict[str, float]:
+    scale = float(os.getenv("STARTUP_BUDGET_SCALE", "1"))
+    return {step: budget * scale for step, budget in BUDGETS.items()}
+
+
+async def cold_start() -> Dict[str, float]:
+    """Timings of one cold start; only meaningful in a fresh interpreter."""
+    start = time.perf_counter()
+    import main
+    timings = {"import": time.perf_counter() - start, "langgraph_at_import": "langgraph" in sys.modules}
+
+    import httpx
+
+    async with main.app.router.lifespan_context(main.app):
+        timings["lifespan"] = time.perf_counter() - start
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            (await client.get("/health")).raise_for_status()
+            timings["first_health"] = time.perf_counter() - start
+            (await client.post("/simulate", json=PAYLOAD)).raise_for_status()
+            timings["first_simulate"] = time.perf_counter() - start
+    return timings
+
+
+def measure(runs: int = 3, warm_up: bool = True) -> Dict[str, float]:
+    """Median timings over `runs` fresh interpreters."""
+    env = {**os.environ, "WARM_UP": "1" if warm_up else "0"}
+    samples: List[Dict[str, float]] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--once"],
+            cwd=CORE_DIR, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+    result = {step: statistics.median(sample[step] for sample in samples) for step in ("import", "lifespan", "first_health", "first_simulate")}
+    result["langgraph_at_import"] = any(sample["langgraph_at_import"] for sample in samples)
+    return result
+
+
+def over_budget(result: Dict[str, float]) -> Dict[str, float]:
+    return {step: result[step] for step, budget in budgets().items() if result[step] > budget}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--once", action="store_true", help="one cold start in this process, as JSON")
+    args = parser.parse_args()
+
+    if args.once:
+        print(json.dumps(asyncio.run(cold_start())))
+        return
+
+    limits = budgets()
+    print(f"Median of {args.runs} fresh interpreters, seconds from the start of `import main`")
+    print(f"{'warm-up':>8} | {'import':>7} | {'lifespan':>8} | {'first /health':>13} | {'first /simulate':>15} | LangGraph at import")
+    failed = False
+    for warm_up in (True, False):
+        result = measure(args.runs, warm_up)
+        failed |= bool(over_budget(result))
+        print(f"{'on' if warm_up else 'off':>8} | {result['import']:>7.3f} | {result['lifespan']:>8.3f} | "
+              f"{result['first_health']:>13.3f} | {result['first_simulate']:>15.3f} | "
+              f"{'yes' if result['langgraph_at_import'] else 'no'}")
+    print(f"{'budget':>8} | {limits['import']:>7.3f} | {'':>8} | {limits['first_health']:>13.3f} | {limits['first_simulate']:>15.3f} |")
+    if failed:
+        print("Over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
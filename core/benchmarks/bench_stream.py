@@ -0,0 +1,104 @@
+"""
+Time-to-first-result benchmark for /simulate/stream.
+
+The agents get the same simulated data-source latencies as in
+bench_parallel_graph. For the buffered /simulate endpoint the first byte
+only arrives once the slowest agent and the aggregator are done; the SSE
+endpoint should deliver its first byte immediately and the first agent
+result after roughly the fastest agent's latency.
+
+The app is served by uvicorn on a local port in a background thread, so
+the timings include real HTTP chunked transfer (the in-process ASGI
+transport buffers whole responses).
+
+Run from the core/ directory:
+    python -m benchmarks.bench_stream
+"""
+
+import asyncio
+import socket
+import statistics
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+import uvicorn
+
+from benchmarks.bench_parallel_graph import AGENT_LATENCY, PAYLOAD, add_latency
+from main import app
+
+RUNS = 20
+AGENT_EVENTS = {"risk_analysis", "expense_analysis", "compliance_analysis"}
+
+
+def start_server() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+async def time_buffered(client: httpx.AsyncClient) -> Dict[str, float]:
+    start = time.perf_counter()
+    async with client.stream("POST", "/simulate", json=PAYLOAD) as response:
+        first_byte = None
+        async for _ in response.aiter_raw():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return {"first_byte": first_byte, "first_agent": total, "final_report": total, "total": total}
+
+
+async def time_stream(client: httpx.AsyncClient) -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    async with client.stream("POST", "/simulate/stream", json=PAYLOAD) as response:
+        async for line in response.aiter_lines():
+            elapsed = time.perf_counter() - start
+            timings.setdefault("first_byte", elapsed)
+            if not line.startswith("event: "):
+                continue
+            event = line[len("event: "):]
+            if event in AGENT_EVENTS:
+                timings.setdefault("first_agent", elapsed)
+            elif event == "final_report":
+                timings["final_report"] = elapsed
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+def report(name: str, runs: List[Dict[str, float]]):
+    medians = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+    print(
+        f"{name:<17} | {medians['first_byte']:9.1f} | {medians['first_agent']:15.1f} | "
+        f"{medians['final_report']:16.1f} | {medians['total']:9.1f}"
+    )
+
+
+async def run_benchmark():
+    add_latency()
+    base_url = start_server()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        # Warm up both paths
+        await time_buffered(client)
+        await time_stream(client)
+
+        buffered = [await time_buffered(client) for _ in range(RUNS)]
+        streamed = [await time_stream(client) for _ in range(RUNS)]
+
+    fastest = min(delay for _, delay in AGENT_LATENCY.values())
+    slowest = max(delay for _, delay in AGENT_LATENCY.values())
+    print(f"Runs: {RUNS}, agent latencies {fastest * 1000:.0f}-{slowest * 1000:.0f} ms (medians below, ms)")
+    print("endpoint          | TTFB (ms) | 1st agent (ms) | final report (ms) | total (ms)")
+    report("/simulate", buffered)
+    report("/simulate/stream", streamed)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,70 @@
+"""
+Tax engine benchmark: incomes x jurisdictions per second.
+
+Sweeps 1k, 10k and 100k salary points across every jurisdiction with the
+compiled bracket tables (compute_grid) and compares the throughput with a
+plain Python bracket walk over the same schedules, checking that both
+agree.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_tax_engine
+"""
+
+import json
+import time
+
+import numpy as np
+
+from agents.nexus.tax_engine import BRACKETS_PATH, get_tax_engine
+
+INCOME_POINTS = [1_000, 10_000, 100_000]
+PYTHON_SAMPLE = 2_000
+
+
+def python_tax(schedule, income):
+    """Reference implementation: walk the brackets one by one."""
+    taxable = max(income - schedule.get("allowance", 0), 0)
+    brackets = sorted(schedule["brackets"])
+    tax = 0.0
+    for i, (lower, rate) in enumerate(brackets):
+        upper = brackets[i + 1][0] if i + 1 < len(brackets) else float("inf")
+        if taxable <= lower:
+            break
+        tax += (min(taxable, upper) - lower) * rate
+    for part in schedule.get("social_security", []):
+        floor, cap = part.get("floor", 0), part.get("cap", float("inf"))
+        tax += max(min(income, cap) - floor, 0) * part["rate"]
+    return tax
+
+
+def main():
+    with open(BRACKETS_PATH) as handle:
+        schedules = json.load(handle)["jurisdictions"]
+    codes = list(schedules)
+
+    start = time.perf_counter()
+    engine = get_tax_engine()
+    compile_time = time.perf_counter() - start
+
+    print(f"Jurisdictions: {len(codes)}, compile: {compile_time * 1000:.2f} ms")
+    print("  incomes | cells       | engine (ms) | cells/s (engine) | cells/s (python)")
+
+    sample = np.linspace(0, 500_000, PYTHON_SAMPLE)
+    start = time.perf_counter()
+    expected = np.array([[python_tax(schedules[code], income) for income in sample] for code in codes])
+    python_rate = expected.size / (time.perf_counter() - start)
+    assert np.allclose(engine.compute_grid(codes, sample)["total_tax"], expected)
+
+    for points in INCOME_POINTS:
+        incomes = np.linspace(0, 500_000, points)
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            engine.compute_grid(codes, incomes)
+            best = min(best, time.perf_counter() - start)
+        cells = points * len(codes)
+        print(f"{points:>9,} | {cells:>11,} | {best * 1000:11.2f} | {cells / best:16,.0f} | {python_rate:16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
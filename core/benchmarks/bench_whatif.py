@@ -0,0 +1,96 @@
+"""
+Slider-tick latency for the what-if endpoint.
+
+Opens a session, then drags the expense and salary sliders: every tick
+sends a new value (so nothing is served from the node memo) through
+POST /whatif/{session_id} over in-process ASGI. Reports p50/p99 per
+slider against the 5 ms target, and checks that the session ends in the
+same state as a full /simulate of the final profile.
+
+Run from the core/ directory:
+    python -m benchmarks.bench_whatif
+"""
+
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+import httpx
+
+from main import app
+
+TICKS = 300
+TARGET_MS = 5.0
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {
+        "annual_income": 120000,
+        "monthly_expenses": 4000,
+        "current_wealth": 50000
+    }
+}
+
+
+async def drag(client: httpx.AsyncClient, session_id: str, field: str, values):
+    timings = []
+    recomputed = None
+    for value in values:
+        start = time.perf_counter()
+        response = await client.post(f"/whatif/{session_id}", json={"user_profile": {field: value}})
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+        recomputed = response.json()["recomputed"]
+    return timings, recomputed
+
+
+def report(name: str, timings, recomputed):
+    ordered = sorted(timings)
+    p50 = statistics.median(ordered) * 1000
+    p99 = ordered[int(0.99 * (len(ordered) - 1))] * 1000
+    verdict = "ok" if p99 < TARGET_MS else "over target"
+    print(f"{name:<16} | {p50:8.2f} | {p99:8.2f} | {verdict:<11} | {', '.join(recomputed)}")
+
+
+async def run_benchmark():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Agents print progress; keep it out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            session = (await client.post("/whatif", json=PAYLOAD)).json()
+            session_id = session["session_id"]
+            # Warm up the worker pool and the projection factors
+            await drag(client, session_id, "monthly_expenses", [3999, 4001])
+
+            expenses, expense_nodes = await drag(
+                client, session_id, "monthly_expenses", [2000 + 10 * i for i in range(TICKS)]
+            )
+            income, income_nodes = await drag(
+                client, session_id, "annual_income", [80000 + 250 * i for i in range(TICKS)]
+            )
+            wealth, wealth_nodes = await drag(
+                client, session_id, "current_wealth", [10000 + 500 * i for i in range(TICKS)]
+            )
+
+            final_profile = {
+                "annual_income": 80000 + 250 * (TICKS - 1),
+                "monthly_expenses": 2000 + 10 * (TICKS - 1),
+                "current_wealth": 10000 + 500 * (TICKS - 1)
+            }
+            full = (await client.post("/simulate", json={**PAYLOAD, "user_profile": final_profile})).json()["data"]
+            current = (await client.get(f"/whatif/{session_id}")).json()["data"]
+
+    assert current == full, "what-if session diverged from a full simulation"
+
+    print(f"Ticks: {TICKS} per slider, target p99 < {TARGET_MS:.0f} ms")
+    print("slider           | p50 (ms) | p99 (ms) | verdict     | nodes rerun")
+    report("monthly_expenses", expenses, expense_nodes)
+    report("annual_income", income, income_nodes)
+    report("current_wealth", wealth, wealth_nodes)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,133 @@
+"""
+Benchmark suite for the core simulation pipeline.
+
+Covers each agent on its own, the aggregator, the vectorized batch path,
+the Monte Carlo projection, the compiled graph (get_app().ainvoke; the
+agent nodes are async, so there is no sync invoke) and the HTTP layer
+through an in-process ASGI client. Result caches are switched off so
+every operation does the full work; inputs and the Monte Carlo seed are
+fixed, so runs differ only by the machine.
+
+Run from the core/ directory:
+    python -m benchmarks.suite --output benchmarks/results/core.json
+    python -m benchmarks.suite --baseline benchmarks/results/core.json --max-regression 10
+
+Exits with status 1 when any case's ops/sec falls more than
+--max-regression percent (default 15, or BENCH_MAX_REGRESSION) below the
+baseline.
+"""
+
+import itertools
+import sys
+
+import httpx
+
+from agents import batch, memo
+from agents.graph import actuary, aggregator, get_app, ghost, nexus
+from agents.reference import get_city_index
+from agents.state import ComplianceAnalysis, ExpenseAnalysis, RiskAnalysis
+from benchmarks.harness import Suite, main
+from main import app, initial_state_for, SimulationRequest
+from shared.montecarlo import simulate_wealth
+
+PROFILE = {
+    "annual_income": 120000,
+    "monthly_expenses": 4000,
+    "current_wealth": 50000
+}
+REQUEST = {"current_city": "San Francisco", "target_city": "Lisbon", "user_profile": PROFILE}
+# 1,000 targets cycling through every city in the reference data
+BATCH_CITIES = list(itertools.islice(itertools.cycle(sorted(get_city_index().keys)), 1000))
+
+suite = Suite("core")
+
+# Fixed agent outputs for the aggregator case
+AGGREGATOR_STATE = {
+    **initial_state_for(SimulationRequest(**REQUEST)),
+    "risk_analysis": RiskAnalysis(air_quality_index=30.0, safety_score=80.0, healthcare_wait_time_hours=2.0),
+    "expense_analysis": ExpenseAnalysis(
+        original_expenses=3200.0, col_multiplier=1.0, currency="USD", local_currency="USD", fx_rate=1.0, fx_version="fixed"
+    ),
+    "compliance_analysis": ComplianceAnalysis(income=PROFILE["annual_income"], income_tax=31000.0, social_security=0.0),
+}
+
+_client = None
+_session = None
+_incomes = itertools.cycle([100000, 110000, 120000, 130000])
+
+
+def client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    return _client
+
+
+async def post(path, payload):
+    response = await client().post(path, json=payload)
+    response.raise_for_status()
+    return response
+
+
+@suite.case("agents", "actuary.analyze_risk", iterations=2000)
+async def actuary_analyze_risk():
+    await actuary.analyze_risk("Lisbon")
+
+
+@suite.case("agents", "fiscal_ghost.calculate_expenses", iterations=2000)
+async def ghost_calculate_expenses():
+    await ghost.calculate_expenses(PROFILE, "Lisbon")
+
+
+@suite.case("agents", "nexus.analyze_compliance", iterations=2000)
+async def nexus_analyze_compliance():
+    await nexus.analyze_compliance(PROFILE, "Lisbon", "San Francisco")
+
+
+@suite.case("agents", "aggregator", iterations=500)
+def aggregate():
+    aggregator(AGGREGATOR_STATE)
+
+
+@suite.case("agents", "montecarlo.simulate_wealth", iterations=500)
+def montecarlo():
+    simulate_wealth(50000, 90000, 40000)
+
+
+@suite.case("agents", "batch.simulate_batch_1k", iterations=50, warmup=3)
+def batch_1k():
+    batch.simulate_batch("San Francisco", BATCH_CITIES, PROFILE)
+
+
+@suite.case("graph", "ainvoke", iterations=300)
+async def graph_ainvoke():
+    await get_app().ainvoke(initial_state_for(SimulationRequest(**REQUEST)))
+
+
+@suite.case("http", "simulate", iterations=300)
+async def http_simulate():
+    await post("/simulate", REQUEST)
+
+
+@suite.case("http", "simulate_batch_100", iterations=100)
+async def http_simulate_batch():
+    await post("/simulate/batch", {
+        "current_city": "San Francisco",
+        "target_cities": BATCH_CITIES[:100],
+        "user_profile": PROFILE
+    })
+
+
+@suite.case("http", "whatif_tick", iterations=300)
+async def http_whatif_tick():
+    global _session
+    if _session is None:
+        _session = (await post("/whatif", REQUEST)).json()["session_id"]
+    await post(f"/whatif/{_session}", {"user_profile": {"annual_income": next(_incomes)}})
+
+
+if __name__ == "__main__":
+    # Measure the work itself, not result-cache hits
+    memo.simulation_cache.max_entries = 0
+    memo.node_cache.max_entries = 0
+    sys.exit(main(suite))
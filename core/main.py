@@ -1,11 +1,41 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
-from agents.graph import app as graph_app
-from agents.state import AgentState
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, AsyncIterator, List, Optional
+from agents.graph import AGENT_NODES, get_app_async, warm_up
+from agents.state import AgentState, SimulationResult, as_data, profile_value
+from agents import batch, bulk, exposure, grid, jobs, memo, whatif, workers
+from shared import encoding, fx, instrumentation
+from shared.projection import PROJECTION_YEARS
 
-app = FastAPI(title="SovereignSim Core", version="0.1.0")
+# Load reference data and compile the graph in the background at startup;
+# with 0 they load on first use
+WARM_UP = os.getenv("WARM_UP", "1") != "0"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Not awaited: the app serves (e.g. /health) while this runs, and a
+    # request that needs the graph first waits for the same build
+    warm = asyncio.create_task(asyncio.to_thread(warm_up)) if WARM_UP else None
+    workers.get_executor()
+    await jobs.queue.start()
+    yield
+    if warm is not None:
+        await asyncio.gather(warm, return_exceptions=True)
+    await jobs.queue.stop()
+    workers.shutdown()
+
+instrumentation.configure_logging()
+
+app = FastAPI(title="SovereignSim Core", version="0.1.0", lifespan=lifespan)
+
+app.add_middleware(instrumentation.InstrumentationMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -25,12 +55,19 @@ class SimulationRequest(BaseModel):
     target_city: str
     user_profile: Dict[str, Any]
 
-@app.post("/simulate")
-async def simulate_relocation(request: SimulationRequest):
+def check_currency(user_profile: Dict[str, Any]):
     """
-    Triggers the Agentic Trio to simulate relocation.
+    422 for a profile currency the exchange-rate snapshot has no rate for,
+    for endpoints that would otherwise only fail after responding
+    (streams) or in a worker (jobs).
     """
-    initial_state: AgentState = {
+    try:
+        fx.current().indices(profile_value(user_profile, "currency"))
+    except fx.UnknownCurrency as e:
+        raise HTTPException(status_code=422, detail=e.args[0])
+
+def initial_state_for(request: SimulationRequest) -> AgentState:
+    return {
         "current_city": request.current_city,
         "target_city": request.target_city,
         "user_profile": request.user_profile,
@@ -41,24 +78,391 @@ async def simulate_relocation(request: SimulationRequest):
         "wealth_projection": None,
         "errors": []
     }
+
+def response_format(http_request: Request) -> str:
+    """Media type negotiated from Accept (see shared/encoding.py); 406 if none fits."""
+    media_type = encoding.negotiate(http_request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Supported formats: {', '.join(encoding.available_formats())}"
+        )
+    return media_type
+
+@app.post("/simulate")
+async def simulate_relocation(request: SimulationRequest, http_request: Request):
+    """
+    Triggers the Agentic Trio to simulate relocation. Wealth is the median
+    of the Monte Carlo projection, with its percentile bands.
+    """
+    media_type = response_format(http_request)
+    initial_state = initial_state_for(request)
     
     try:
-        # invoke the graph
-        result = graph_app.invoke(initial_state)
-        return {
+        # Identical inputs on the same reference data give the same result
+        key = memo.simulation_key(initial_state)
+        data = memo.simulation_cache.get(key, "simulate")
+        if data is None:
+            # invoke the graph (agent nodes are async)
+            graph_app = await get_app_async()
+            result = await graph_app.ainvoke(initial_state)
+            # Cached as the typed results; expanded to JSON per response
+            data = SimulationResult.from_state(result)
+            memo.simulation_cache.put(key, data)
+        return encoding.encoded_response({
+            "status": "success",
+            "data": data.to_data()
+        }, media_type)
+    except fx.UnknownCurrency as e:
+        raise HTTPException(status_code=422, detail=e.args[0])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+async def stream_simulation(initial_state: AgentState) -> AsyncIterator[str]:
+    yield sse_event("started", {"nodes": AGENT_NODES + ["aggregator"]})
+    try:
+        # One update per node as it finishes: the agents in completion
+        # order, then the aggregator's final_report and wealth_projection
+        graph_app = await get_app_async()
+        async for update in graph_app.astream(initial_state, stream_mode="updates"):
+            for node, output in update.items():
+                for key, value in (output or {}).items():
+                    yield sse_event(key, {"node": node, "data": as_data(value)})
+    except Exception as e:
+        yield sse_event("error", {"detail": str(e)})
+        return
+    yield sse_event("done", {"status": "success"})
+
+@app.post("/simulate/stream")
+async def simulate_relocation_stream(request: SimulationRequest):
+    """
+    Same simulation as /simulate, streamed as Server-Sent Events: each
+    agent's analysis is sent as soon as that agent finishes.
+    """
+    check_currency(request.user_profile)
+    return StreamingResponse(
+        stream_simulation(initial_state_for(request)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def response_data(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: as_data(state.get(key)) for key in whatif.OUTPUT_KEYS}
+
+@app.post("/whatif")
+async def start_whatif(request: SimulationRequest):
+    """
+    Runs a full simulation and keeps its state server-side for slider
+    ticks; returns the session id with the full result.
+    """
+    try:
+        graph_app = await get_app_async()
+        state = await graph_app.ainvoke(initial_state_for(request))
+    except fx.UnknownCurrency as e:
+        raise HTTPException(status_code=422, detail=e.args[0])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "status": "success",
+        "session_id": whatif.sessions.create(state),
+        "data": response_data(state)
+    }
+
+
+class WhatIfDelta(BaseModel):
+    user_profile: Dict[str, Any]
+
+@app.post("/whatif/{session_id}")
+async def whatif_tick(session_id: str, delta: WhatIfDelta):
+    """
+    Applies a user_profile delta to the session, reruns only the nodes
+    that depend on the changed fields and returns what changed.
+    """
+    state = whatif.sessions.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired what-if session")
+    try:
+        new_state, rerun, changes = await whatif.recompute(state, delta.user_profile)
+    except fx.UnknownCurrency as e:
+        # The session keeps its last valid state
+        raise HTTPException(status_code=422, detail=e.args[0])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    whatif.sessions.put(session_id, new_state)
+    return {
+        "status": "success",
+        "recomputed": rerun,
+        "changes": changes
+    }
+
+@app.get("/whatif/{session_id}")
+async def get_whatif(session_id: str):
+    """Current full result of the session."""
+    state = whatif.sessions.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired what-if session")
+    return {
+        "status": "success",
+        "user_profile": state["user_profile"],
+        "data": response_data(state)
+    }
+
+@app.delete("/whatif/{session_id}")
+async def end_whatif(session_id: str):
+    if not whatif.sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired what-if session")
+    return {"status": "success"}
+
+
+class BatchSimulationRequest(BaseModel):
+    current_city: str
+    target_cities: List[str] = Field(..., min_length=1, max_length=1000)
+    user_profile: Dict[str, Any]
+
+@app.post("/simulate/batch")
+async def simulate_batch(request: BatchSimulationRequest, http_request: Request):
+    """
+    Simulates relocation to many target cities in one vectorized pass.
+    Returns a columnar table with one row per target city. Wealth columns
+    are the expected projection, not /simulate's Monte Carlo median.
+    """
+    media_type = response_format(http_request)
+    try:
+        result = await workers.run_cpu_bound(
+            batch.simulate_batch,
+            request.current_city,
+            request.target_cities,
+            request.user_profile
+        )
+        return encoding.encoded_response({
             "status": "success",
-            "data": {
-                "final_report": result.get("final_report"),
-                "wealth_projection": result.get("wealth_projection"),
-                "risk_analysis": result.get("risk_analysis"),
-                "expense_analysis": result.get("expense_analysis"),
-                "compliance_analysis": result.get("compliance_analysis")
-            }
-        }
+            "data": result
+        }, media_type)
+    except fx.UnknownCurrency as e:
+        raise HTTPException(status_code=422, detail=e.args[0])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/simulate/bulk")
+async def simulate_bulk(
+    http_request: Request,
+    current_city: str,
+    cities: List[str] = Query(..., min_length=1, max_length=bulk.MAX_CITIES)
+):
+    """
+    Evaluates an NDJSON body of user profiles (one {"id", "user_profile"}
+    object per line) against the given cities. Streams NDJSON back: a
+    header with the cities and their risk analysis, one line per profile
+    (or error) as it is evaluated, then a summary. final_wealth is the
+    expected projection, not /simulate's Monte Carlo median.
+    """
+    return bulk.RequestStreamingResponse(
+        bulk.evaluate_stream(current_city, cities, http_request.stream(), run=workers.run_cpu_bound),
+        media_type=bulk.NDJSON,
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+
+class GridRange(BaseModel):
+    start: float
+    stop: float
+    steps: int = Field(..., ge=1, le=10000)
+
+    def values(self):
+        return grid.axis(self.start, self.stop, self.steps)
+
+class GridRequest(BaseModel):
+    current_city: str
+    cities: List[str] = Field(..., min_length=1, max_length=1000)
+    annual_income: GridRange
+    monthly_expenses: GridRange
+    current_wealth: GridRange
+    years: int = Field(PROJECTION_YEARS, ge=1, le=50)
+
+    def check_size(self):
+        try:
+            grid.check_size(len(self.cities), self.annual_income.steps, self.monthly_expenses.steps, self.current_wealth.steps)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def grid_args(self):
+        return (
+            self.current_city,
+            self.cities,
+            self.annual_income.values(),
+            self.monthly_expenses.values(),
+            self.current_wealth.values(),
+            self.years
+        )
+
+@app.post("/simulate/grid")
+async def simulate_grid(request: GridRequest):
+    """
+    Sensitivity grid over salary x expenses x current wealth for each city,
+    computed as one broadcast and returned as a NumPy .npz (axes,
+    net_annual_savings and final_wealth arrays). final_wealth is the
+    expected projection, not /simulate's Monte Carlo median.
+    """
+    request.check_size()
+    try:
+        result = await workers.run_cpu_bound(grid.simulate_grid, *request.grid_args())
+        body = await workers.run_cpu_bound(grid.to_npz, result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return Response(
+        content=body,
+        media_type=grid.NPZ,
+        headers={"X-Grid-Shape": ",".join(str(size) for size in result["final_wealth"].shape)}
+    )
+
+
+async def submit_job(kind: str, args: tuple, media_type: str = encoding.JSON) -> Dict[str, Any]:
+    try:
+        job = await jobs.queue.submit(kind, args, media_type)
+    except jobs.QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return {"status": "success", "job_id": job["id"], "job": job}
+
+@app.post("/jobs/simulate", status_code=202)
+async def submit_simulation_job(request: SimulationRequest, http_request: Request):
+    """
+    Queues a /simulate run for the background workers and returns its job
+    id; poll GET /jobs/{job_id} and fetch GET /jobs/{job_id}/result.
+    """
+    check_currency(request.user_profile)
+    return await submit_job("simulate", (initial_state_for(request),), response_format(http_request))
+
+@app.post("/jobs/batch", status_code=202)
+async def submit_batch_job(request: BatchSimulationRequest, http_request: Request):
+    """Queues a /simulate/batch run."""
+    check_currency(request.user_profile)
+    args = (request.current_city, request.target_cities, request.user_profile)
+    return await submit_job("batch", args, response_format(http_request))
+
+@app.post("/jobs/grid", status_code=202)
+async def submit_grid_job(request: GridRequest):
+    """Queues a /simulate/grid run; the result is the same .npz."""
+    request.check_size()
+    return await submit_job("grid", request.grid_args())
+
+@app.get("/jobs/stats")
+async def job_stats():
+    """Queue depth, running jobs, counters and wait/run time percentiles."""
+    return jobs.queue.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await jobs.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return {"status": "success", "job": job}
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """The job's encoded result, in the format negotiated when it was submitted."""
+    job = await jobs.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    if job["status"] != jobs.SUCCEEDED:
+        detail = f"Job is {job['status']}" + (f": {job['error']}" if job["error"] else "")
+        raise HTTPException(status_code=409, detail=detail)
+    body = await jobs.queue.result(job_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Job result has expired")
+    return Response(content=body, media_type=job["media_type"])
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = await jobs.queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    if job["status"] != jobs.CANCELLED:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return {"status": "success", "job": job}
+
+
+@app.get("/fx")
+async def fx_snapshot():
+    """Version, base and date of the exchange-rate snapshot results are computed with."""
+    return fx.current().info()
+
+
+@app.post("/fx/refresh")
+async def refresh_fx():
+    """
+    Reloads the exchange-rate snapshot file now instead of at the next
+    periodic check. Requests already running finish on the old snapshot.
+    """
+    try:
+        previous = fx.current().version
+        snapshot = fx.get_fx().refresh()
+    except (OSError, ValueError, KeyError) as e:
+        raise HTTPException(status_code=500, detail=f"Could not load the snapshot: {e}")
+    return {"status": "success", "previous_version": previous, **snapshot.info()}
+
+
+@app.get("/exposure/{city}")
+async def exposure_history(city: str, window_months: int = Query(exposure.TRAILING_MONTHS, ge=1)):
+    """
+    Trailing, long-term, per-year and seasonal air quality and safety
+    statistics from a city's hourly history.
+    """
+    history = exposure.get_exposure_store().history(city)
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"No hourly history for {city}")
+    return await asyncio.to_thread(history.summary, window_months)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss and eviction counts of the simulation and per-node result caches."""
+    return {
+        "data_version": memo.data_version(),
+        "simulations": memo.simulation_cache.stats(),
+        "nodes": memo.node_cache.stats()
+    }
+
+
+def cache_families() -> List[instrumentation.Family]:
+    lookups = instrumentation.Family(
+        "cache_lookups", "counter", "Result cache lookups by namespace and result", ("cache", "namespace", "result")
+    )
+    evictions = instrumentation.Family("cache_evictions", "counter", "Entries evicted from the result caches", ("cache",))
+    entries = instrumentation.Family("cache_entries", "gauge", "Entries held by the result caches", ("cache",))
+    for name, cache in (("simulations", memo.simulation_cache), ("nodes", memo.node_cache)):
+        for namespace, stats in cache.namespaces.items():
+            lookups.values[(name, namespace, "hit")] = stats.hits
+            lookups.values[(name, namespace, "miss")] = stats.misses
+        evictions.values[(name,)] = cache.evictions
+        entries.values[(name,)] = len(cache)
+    return [lookups, evictions, entries]
+
+def job_families() -> List[instrumentation.Family]:
+    stats = jobs.queue.stats()
+    gauges = [
+        instrumentation.Family("job_queue_depth", "gauge", "Jobs waiting for a worker", ()),
+        instrumentation.Family("jobs_running", "gauge", "Jobs running on the worker pool", ()),
+    ]
+    gauges[0].values[()] = stats["queue_depth"]
+    gauges[1].values[()] = stats["running"]
+    finished = instrumentation.Family("jobs", "counter", "Jobs by outcome", ("outcome",))
+    for outcome in ("submitted", jobs.SUCCEEDED, jobs.FAILED, jobs.CANCELLED, "rejected"):
+        finished.values[(outcome,)] = stats[outcome]
+    return gauges + [finished]
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: request and node timings, node errors, cache lookups and the job queue."""
+    body = instrumentation.REGISTRY.render(cache_families() + job_families())
+    return Response(body, media_type=instrumentation.CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
@@ -0,0 +1,38 @@
+import asyncio
+
+import numpy as np
+
+from agents import batch
+from agents.actuary.actuary import ActuaryAgent
+from agents.fiscal_ghost.ghost import FiscalGhostAgent
+from agents.nexus.nexus import NexusAgent
+from shared.projection import PROJECTION_YEARS, project_wealth
+
+PROFILE = {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+CITIES = ["Lisbon", "London", "Dubai", "Singapore", "Lisbon", "Atlantis"]
+
+def test_batch_rows_match_the_per_city_agents():
+    result = batch.simulate_batch("San Francisco", CITIES, PROFILE)
+    columns = result["columns"]
+    
+    assert result["cities"] == CITIES
+    assert all(len(values) == len(CITIES) for values in columns.values())
+    for row, city in enumerate(CITIES):
+        risk = asyncio.run(ActuaryAgent().analyze_risk(city))
+        expenses = asyncio.run(FiscalGhostAgent().calculate_expenses(PROFILE, city))
+        compliance = asyncio.run(NexusAgent().analyze_compliance(PROFILE, city, "San Francisco"))
+    
+        assert columns["projected_expenses"][row] == expenses.projected_expenses
+        assert columns["fx_rate"][row] == expenses.fx_rate
+        assert np.isclose(columns["estimated_tax"][row], compliance.estimated_tax)
+        assert columns["treaty_status"][row] == compliance.treaty_status
+        assert columns["quality_of_life_score"][row] == risk.overall_risk_rating
+    
+        savings = PROFILE["annual_income"] - compliance.estimated_tax - expenses.projected_expenses * 12
+        assert np.isclose(columns["net_annual_savings"][row], savings)
+        expected = project_wealth(PROFILE["current_wealth"], savings)
+        assert np.allclose([columns[f"wealth_year_{year + 1}"][row] for year in range(PROJECTION_YEARS)], expected)
+    
+    # Repeated cities get identical rows; unknown ones fall back to the default record
+    assert all(values[0] == values[4] for values in columns.values())
+    assert columns["projected_expenses"][5] == PROFILE["monthly_expenses"] * 0.7
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from agents import batch, bulk, graph
+from agents.state import DEFAULT_PROFILE
+
+CITIES = ["Lisbon", "Dubai"]
+
+async def stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+async def collect(lines):
+    return [line async for line in lines]
+
+def evaluate(chunks, chunk_size=2):
+    body = b"".join(asyncio.run(collect(bulk.evaluate_stream("San Francisco", CITIES, stream(chunks), chunk_size))))
+    return [json.loads(line) for line in body.splitlines()]
+
+def test_lines_are_reassembled_across_chunks():
+    chunks = [b'{"a"', b': 1}\n{"b": 2}\n{"c', b'": 3}\n', b"\n", b'{"d": 4}']
+    lines = asyncio.run(collect(bulk.iter_lines(stream(chunks))))
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}', b"", b'{"d": 4}']
+
+def test_overlong_line_ends_the_stream_with_an_error(monkeypatch):
+    monkeypatch.setattr(bulk, "MAX_LINE_BYTES", 16)
+    with pytest.raises(bulk.LineTooLong):
+        asyncio.run(collect(bulk.iter_lines(stream([b'{"id": 1}\n', b"x" * 10, b"x" * 10]))))
+    
+    lines = evaluate([b'{"annual_income": 90000}\n', b'{"annual_income": ' + b"9" * 20])
+    assert lines[1]["id"] == 1
+    assert lines[2] == {"line": 2, "error": "NDJSON line longer than 16 bytes"}
+    assert lines[-1] == {"type": "summary", "profiles": 1, "errors": 1}
+
+def test_bad_records_become_error_lines_and_good_ones_match_the_batch_engine():
+    profile = {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+    body = [
+        json.dumps({"id": "first", "user_profile": profile}).encode() + b"\n",
+        b"not json\n",
+        b"[1, 2]\n",
+        b"\n",
+        b'{"annual_income": "lots"}\n',
+        b'{"currency": "XXX"}\n',
+        json.dumps({**profile, "currency": "eur"}).encode() + b"\n",
+        json.dumps(profile).encode()
+    ]
+    header, *results, summary = evaluate(body)
+    
+    assert header["type"] == "header" and header["cities"] == CITIES
+    errors = [line for line in results if "error" in line]
+    assert [line["line"] for line in errors] == [2, 3, 5, 6]
+    assert "Unknown currency: XXX" in errors[-1]["error"]
+    # Rows without an id are numbered by their line
+    rows = {line["id"]: line for line in results if "error" not in line}
+    assert list(rows) == ["first", 7, 8]
+    assert summary == {"type": "summary", "profiles": 3, "errors": 4}
+    
+    expected = batch.simulate_batch("San Francisco", CITIES, profile)["columns"]
+    for name in ("estimated_tax", "net_annual_savings", "projected_expenses"):
+        assert np.allclose(rows["first"][name], expected[name])
+    assert np.allclose(rows["first"]["final_wealth"], expected[f"wealth_year_{batch.PROJECTION_YEARS}"])
+    assert rows[7]["net_annual_savings"] == rows["first"]["net_annual_savings"]
+    assert rows[7]["projected_expenses_local"] != rows[8]["projected_expenses_local"]
+
+def test_missing_fields_get_the_same_defaults_as_the_agents_and_batch():
+    header, row, summary = evaluate([b'{"id": "bare"}\n'])
+    expected = batch.simulate_batch("San Francisco", CITIES, {})["columns"]
+    for name in ("estimated_tax", "net_annual_savings", "projected_expenses"):
+        assert np.allclose(row[name], expected[name])
+    
+    # The graph's nodes assume the same profile
+    state = {"current_city": "San Francisco", "target_city": CITIES[0], "user_profile": {}}
+    state["risk_analysis"] = asyncio.run(graph.run_actuary(state))["risk_analysis"]
+    state["expense_analysis"] = asyncio.run(graph.run_ghost(state))["expense_analysis"]
+    state["compliance_analysis"] = asyncio.run(graph.run_nexus(state))["compliance_analysis"]
+    assert state["compliance_analysis"].income == DEFAULT_PROFILE["annual_income"]
+    assert np.isclose(state["compliance_analysis"].estimated_tax, row["estimated_tax"][0])
+    report = graph.aggregator(state)["final_report"]
+    assert np.isclose(report.net_annual_savings, row["net_annual_savings"][0])
@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+PROFILE = {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000, "currency": "XXX"}
+SIMULATION = {"current_city": "San Francisco", "target_city": "Lisbon", "user_profile": PROFILE}
+BATCH = {"current_city": "San Francisco", "target_cities": ["Lisbon", "Berlin"], "user_profile": PROFILE}
+
+ENDPOINTS = [
+    ("/simulate", SIMULATION),
+    ("/simulate/stream", SIMULATION),
+    ("/simulate/batch", BATCH),
+    ("/whatif", SIMULATION),
+    ("/jobs/simulate", SIMULATION),
+    ("/jobs/batch", BATCH),
+]
+
+def test_unknown_currency_is_422_on_every_endpoint():
+    with TestClient(app) as client:
+        for path, payload in ENDPOINTS:
+            response = client.post(path, json=payload)
+            assert response.status_code == 422, path
+            assert response.json()["detail"] == "Unknown currency: XXX"
+    
+        # What-if ticks too (the session itself is started with a known currency)
+        started = client.post("/whatif", json={**SIMULATION, "user_profile": {**PROFILE, "currency": "USD"}}).json()
+        tick = client.post(f"/whatif/{started['session_id']}", json={"user_profile": {"currency": "XXX"}})
+        assert tick.status_code == 422
@@ -0,0 +1,86 @@
+import json
+import struct
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from shared import encoding
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+}
+
+def decode_float64(body: bytes):
+    """Header and buffers of a FLOAT64 body, read the way a client would."""
+    assert body[:4] == encoding.FLOAT64_MAGIC
+    (header_length,) = struct.unpack("<I", body[4:8])
+    start = 8 + header_length
+    # Buffers start 8-byte aligned
+    assert start % 8 == 0
+    header = json.loads(body[8:start])
+    buffers = []
+    for entry in header["buffers"]:
+        offset = start + entry["offset"]
+        assert offset % 8 == 0
+        values = np.frombuffer(body, dtype="<f8", count=entry["length"], offset=offset)
+        buffers.append((entry["path"], values.reshape(entry["shape"])))
+    return header["metadata"], buffers
+
+def test_split_buffers_turns_records_into_columns():
+    metadata, buffers = encoding.split_buffers({
+        "projection": [{"year": 1, "wealth": 10.5}, {"year": 2, "wealth": 20.5}],
+        "locations": {"Lisbon": {"cost": 1.0}, "Berlin": {"cost": 2.0}},
+        "labels": ["a", "b"],
+        "mixed": [1, "two"],
+        "grid": np.arange(6).reshape(2, 3)
+    })
+    assert metadata == {
+        "projection": {"year": {"$buffer": 0}, "wealth": {"$buffer": 1}},
+        "locations": {"$index": ["Lisbon", "Berlin"], "cost": {"$buffer": 2}},
+        "labels": ["a", "b"],
+        "mixed": [1, "two"],
+        "grid": {"$buffer": 3}
+    }
+    assert [path for path, _ in buffers] == ["projection.year", "projection.wealth", "locations.cost", "grid"]
+    assert all(array.dtype == np.dtype("<f8") for _, array in buffers)
+    assert buffers[1][1].tolist() == [10.5, 20.5]
+    assert buffers[3][1].shape == (2, 3)
+
+def test_float64_body_round_trips_the_json_result():
+    with TestClient(app) as client:
+        as_json = client.post("/simulate", json=PAYLOAD)
+        as_float64 = client.post("/simulate", json=PAYLOAD, headers={"Accept": encoding.FLOAT64})
+    
+    assert as_float64.status_code == 200
+    assert as_float64.headers["content-type"] == encoding.FLOAT64
+    assert int(as_float64.headers["content-length"]) == len(as_float64.content)
+    metadata, buffers = decode_float64(as_float64.content)
+    expected_metadata, expected_buffers = encoding.split_buffers(as_json.json())
+    assert metadata == expected_metadata
+    assert [path for path, _ in buffers] == [path for path, _ in expected_buffers]
+    for (_, values), (_, expected) in zip(buffers, expected_buffers):
+        assert np.array_equal(values, expected)
+
+def test_negotiation_follows_q_values_then_header_order():
+    negotiate = encoding.negotiate
+    assert negotiate(None) == negotiate("") == encoding.JSON
+    assert negotiate(f"{encoding.JSON};q=0.5, {encoding.FLOAT64}") == encoding.FLOAT64
+    assert negotiate(f"{encoding.FLOAT64};q=0.2, {encoding.JSON}") == encoding.JSON
+    # Equal quality: the first listed wins
+    assert negotiate(f"{encoding.FLOAT64}, {encoding.JSON}") == encoding.FLOAT64
+    assert negotiate("text/html, */*;q=0.1") == encoding.JSON
+    assert negotiate("application/*") == encoding.JSON
+    # q=0 (or an unreadable q) rules a type out
+    assert negotiate(f"{encoding.FLOAT64};q=0") is None
+    assert negotiate(f"{encoding.FLOAT64};q=high") is None
+    assert negotiate("application/vnd.apache.arrow.stream") is None
+
+def test_unsupported_accept_is_406_with_the_supported_formats():
+    with TestClient(app) as client:
+        response = client.post("/simulate", json=PAYLOAD, headers={"Accept": "application/vnd.apache.arrow.stream"})
+    
+    assert response.status_code == 406
+    assert encoding.JSON in response.json()["detail"] and encoding.FLOAT64 in response.json()["detail"]
@@ -0,0 +1,64 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from agents.actuary.actuary import ActuaryAgent
+from agents.exposure import ExposureStore, to_hour
+from agents.state import RiskAnalysis
+
+START = to_hour("2023-01-01T00")
+# Fourteen whole months, so the trailing year is the last twelve calendar months
+HOURS = int((np.datetime64("2024-03-01T00", "h") - np.datetime64("2023-01-01T00", "h")).astype(int))
+YEAR_START = int((np.datetime64("2023-03-01T00", "h") - np.datetime64("2023-01-01T00", "h")).astype(int))
+
+def lisbon_history(tmp_path):
+    rng = np.random.default_rng(3)
+    aqi = rng.gamma(6.0, 25.0, HOURS).astype(np.float32)
+    aqi[rng.random(HOURS) < 0.1] = np.nan
+    store = ExposureStore(tmp_path)
+    store.append("Lisboa", START, {"aqi": aqi})
+    return store, aqi
+
+def test_trailing_covers_the_last_twelve_months_of_every_metric(tmp_path):
+    store, aqi = lisbon_history(tmp_path)
+    trailing = store.trailing("Lisbon")
+    year = aqi[YEAR_START:].astype(np.float64)
+    year = year[~np.isnan(year)]
+    
+    assert (trailing["from"], trailing["to"], trailing["window_months"]) == ("2023-01-01T00", "2024-03-01T00", 12)
+    assert trailing["aqi"]["hours"] == len(year)
+    assert trailing["aqi"]["mean"] == pytest.approx(year.mean())
+    assert trailing["aqi"]["exceedance_hours"] == int((year > 100).sum())
+    assert abs(trailing["aqi"]["p95"] - np.percentile(year, 95)) <= 5.0
+    # Metrics never appended have no hours rather than zeros
+    assert trailing["safety"] == {"hours": 0, "mean": None, "p95": None, "max": None, "exceedance_hours": 0, "exceedance_share": 0.0}
+    
+    # Every spelling of a reference city shares one history and one cached result
+    assert store.trailing("lisbon") is trailing
+    assert store.trailing("London") is None
+    with pytest.raises(ValueError):
+        store.append("Atlantis", START, {"aqi": [50.0]})
+
+def test_ratings_use_the_history_and_fall_back_to_the_reference_values():
+    plain = RiskAnalysis(air_quality_index=40, safety_score=80, healthcare_wait_time_hours=6)
+    assert (plain.rated_aqi, plain.rated_safety) == (40, 80)
+    
+    # A metric without hours in the window keeps its reference value
+    polluted = RiskAnalysis(40, 80, 6, exposure={"aqi": {"mean": 150.0}, "safety": {"mean": None}})
+    assert (polluted.rated_aqi, polluted.rated_safety) == (150.0, 80)
+    assert polluted.overall_risk_rating == "High" and plain.overall_risk_rating == "Low"
+
+def test_the_actuary_rates_cities_on_their_history(tmp_path):
+    store, _ = lisbon_history(tmp_path)
+    agent = ActuaryAgent(exposure_store=store)
+    
+    lisbon = asyncio.run(agent.analyze_risk("Lisbon"))
+    london = asyncio.run(agent.analyze_risk("London"))
+    assert lisbon.rated_aqi == store.trailing("Lisbon")["aqi"]["mean"] > lisbon.air_quality_index
+    assert lisbon.rated_safety == lisbon.safety_score
+    assert london.exposure is None and london.rated_aqi == london.air_quality_index
+    
+    batch = agent.analyze_risk_batch(["Lisbon", "London", "lisboa"])
+    assert (lisbon.overall_risk_rating, london.overall_risk_rating) == ("High", "Low")
+    assert batch["overall_risk_rating"].tolist() == ["High", "Low", "High"]
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from shared import fx
+
+SNAPSHOT = '{"base": "USD", "as_of": "2024-06-01", "rates": {"USD": 1.0, "EUR": 0.5, "JPY": 128.0, "GBP": 0.8}}'
+
+def test_cross_rates_are_triangulated_through_the_base(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(SNAPSHOT)
+    snapshot = fx.RateSnapshot.from_file(path)
+    
+    assert snapshot.rate("EUR", "JPY") == 256.0
+    assert snapshot.rate("jpy", "eur") == 1 / 256
+    assert np.allclose(snapshot.matrix * snapshot.matrix.T, 1.0)
+    assert snapshot.info() == {"version": snapshot.version, "base": "USD", "as_of": "2024-06-01", "currencies": 4}
+    with pytest.raises(fx.UnknownCurrency):
+        snapshot.rate("USD", "XXX")
+
+def test_arrays_convert_elementwise_and_broadcast(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(SNAPSHOT)
+    snapshot = fx.RateSnapshot.from_file(path)
+    
+    converted = snapshot.convert([10, 256, 8], ["usd", "JPY", "GBP"], "EUR")
+    assert converted.tolist() == [5.0, 1.0, 5.0]
+    # One amount per (profile currency, city currency) pair
+    grid = snapshot.convert(100, np.array([["USD"], ["EUR"]]), ["GBP", "JPY"])
+    assert grid.shape == (2, 2)
+    assert np.allclose(grid, [[80, 12800], [160, 25600]])
+    with pytest.raises(fx.UnknownCurrency, match="ABC, XYZ"):
+        snapshot.indices(["EUR", "xyz", "abc", "XYZ"])
+
+def test_refresh_swaps_snapshots_only_when_the_file_changes(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(SNAPSHOT)
+    service = fx.FxService(path, check_interval=float("inf"))
+    old = service.current()
+    assert service.refresh(force=False) is old
+    assert service.refresh() is old  # same content, same version
+    
+    path.write_text(SNAPSHOT.replace('"EUR": 0.5', '"EUR": 0.25'))
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+    assert service.current() is old  # not re-checked before the interval
+    new = service.refresh(force=False)
+    assert new.version != old.version and service.current() is new
+    # Readers holding the old snapshot keep its rates
+    assert old.rate("USD", "EUR") == 0.5 and new.rate("USD", "EUR") == 0.25
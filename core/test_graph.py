@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from agents import graph, memo
+
+STATE = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+}
+
+# Simulated data-source latency of each agent entry point, in seconds
+AGENT_LATENCY = {
+    "actuary": ("analyze_risk", 0.3),
+    "ghost": ("calculate_expenses", 0.2),
+    "nexus": ("analyze_compliance", 0.1),
+}
+
+def test_agents_run_concurrently_and_the_aggregator_once_after_them(monkeypatch):
+    # Every node has to run, not come from an earlier test's cache
+    monkeypatch.setattr(memo.node_cache, "max_entries", 0)
+    memo.node_cache.clear()
+    finished = {}
+    aggregated = []
+    
+    for agent_name, (method_name, delay) in AGENT_LATENCY.items():
+        agent = getattr(graph, agent_name)
+    
+        async def slow(*args, _agent=agent_name, _original=getattr(agent, method_name), _delay=delay, **kwargs):
+            await asyncio.sleep(_delay)
+            finished[_agent] = time.perf_counter()
+            return await _original(*args, **kwargs)
+    
+        monkeypatch.setattr(agent, method_name, slow)
+    
+    def counting_aggregator(state, _original=graph.aggregator):
+        aggregated.append(time.perf_counter())
+        return _original(state)
+    
+    monkeypatch.setattr(graph, "aggregator", counting_aggregator)
+    app = graph.build_graph()
+    asyncio.run(app.ainvoke(STATE))  # first run pays for imports and data loading
+    finished.clear()
+    aggregated.clear()
+    
+    start = time.perf_counter()
+    result = asyncio.run(app.ainvoke(STATE))
+    elapsed = time.perf_counter() - start
+    
+    slowest = max(delay for _, delay in AGENT_LATENCY.values())
+    second = sorted(delay for _, delay in AGENT_LATENCY.values())[-2]
+    # Close to the slowest agent; a chain would cost at least the two slowest
+    assert slowest <= elapsed < slowest + second
+    assert len(aggregated) == 1
+    assert aggregated[0] >= max(finished.values())
+    assert set(finished) == set(AGENT_LATENCY)
+    assert result["final_report"].net_annual_savings is not None
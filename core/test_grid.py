@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from agents import grid
+from main import app
+
+def test_size_check_counts_every_output_array(monkeypatch):
+    result = grid.simulate_grid("San Francisco", ["Lisbon", "Berlin"], grid.axis(40000, 200000, 5),
+                                grid.axis(1500, 6000, 4), grid.axis(0, 100000, 3), 5)
+    arrays = [result[name] for name in ("annual_income", "monthly_expenses", "current_wealth",
+                                        "net_annual_savings", "final_wealth")]
+    assert grid.output_bytes(2, 5, 4, 3) == sum(array.nbytes for array in arrays)
+    
+    # Checked before anything is broadcast
+    monkeypatch.setattr(grid, "MAX_GRID_BYTES", grid.output_bytes(2, 5, 4, 3) - 1)
+    with pytest.raises(ValueError, match="bytes"):
+        grid.simulate_grid("San Francisco", ["Lisbon", "Berlin"], np.zeros(5), np.zeros(4), np.zeros(3), 5)
+
+def test_oversized_grid_requests_are_rejected():
+    steps = {"start": 0, "stop": 1, "steps": 10000}
+    payload = {
+        "current_city": "San Francisco",
+        "cities": ["Lisbon"],
+        "annual_income": steps,
+        "monthly_expenses": steps,
+        "current_wealth": {"start": 0, "stop": 1, "steps": 1}
+    }
+    with TestClient(app) as client:
+        for path in ("/simulate/grid", "/jobs/grid"):
+            response = client.post(path, json=payload)
+            assert response.status_code == 400
+            assert "cells" in response.json()["detail"]
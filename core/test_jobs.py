@@ -0,0 +1,112 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from agents import batch, jobs
+
+PROFILE = {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+ARGS = ("San Francisco", ["Lisbon", "Berlin"], PROFILE)
+
+def sleep_job(media_type, seconds):
+    time.sleep(seconds)
+    return b"slept", "text/plain"
+
+async def wait_for_status(queue, job_id, statuses, timeout=60):
+    for _ in range(int(timeout / 0.05)):
+        job = await queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.05)
+    raise TimeoutError(job_id)
+
+async def wait_until_finished(queue, job_id, timeout=60):
+    for _ in range(int(timeout / 0.05)):
+        job = await queue.get(job_id)
+        if job["status"] in jobs.FINISHED:
+            return job
+        await asyncio.sleep(0.05)
+    raise TimeoutError(job_id)
+
+def test_jobs_run_in_the_pool_queue_is_bounded_and_queued_jobs_cancel():
+    async def scenario():
+        queue = jobs.JobQueue(jobs.MemoryJobStore(), workers=1, max_queued=2, start_method="fork")
+        await queue.start()
+        try:
+            with pytest.raises(ValueError):
+                await queue.submit("unknown", ())
+    
+            # Nothing is dispatched until this coroutine yields, so both stay queued
+            first = await queue.submit("batch", ARGS)
+            second = await queue.submit("batch", ARGS)
+            assert first["status"] == jobs.QUEUED and queue.depth == 2
+            with pytest.raises(jobs.QueueFull) as full:
+                await queue.submit("batch", ARGS)
+            assert full.value.retry_after >= 1
+    
+            cancelled = await queue.cancel(second["id"])
+            assert cancelled["status"] == jobs.CANCELLED and queue.depth == 1
+            assert (await queue.cancel(second["id"]))["status"] == jobs.CANCELLED
+            assert await queue.cancel("missing") is None
+    
+            done = await wait_until_finished(queue, first["id"])
+            assert done["status"] == jobs.SUCCEEDED
+            body = json.loads(await queue.result(first["id"]))
+            expected = batch.simulate_batch(*ARGS)
+            assert body["data"]["columns"]["net_annual_savings"] == pytest.approx(expected["columns"]["net_annual_savings"])
+            assert done["size"] == len(await queue.result(first["id"]))
+            assert await queue.result(second["id"]) is None
+    
+            stats = queue.stats()
+            assert stats["submitted"] == 2 and stats["rejected"] == 1
+            assert stats[jobs.SUCCEEDED] == 1 and stats[jobs.CANCELLED] == 1
+            assert stats["queue_depth"] == 0 and stats["run_seconds"]["count"] == 1
+        finally:
+            await queue.stop()
+    
+    asyncio.run(scenario())
+
+def test_another_process_sharing_the_store_cancels_queued_and_running_jobs(monkeypatch):
+    # Forked workers inherit the extra job kind
+    monkeypatch.setitem(jobs.KINDS, "sleep", sleep_job)
+    
+    async def scenario():
+        store = jobs.MemoryJobStore()
+        owner = jobs.JobQueue(store, workers=1, start_method="fork")
+        # Another web process: same store, its own (idle) queue
+        other = jobs.JobQueue(store, workers=1, start_method="fork")
+        await owner.start()
+        try:
+            running = await owner.submit("sleep", (0.5,))
+            queued = await owner.submit("sleep", (0.5,))
+            await wait_for_status(owner, running["id"], (jobs.RUNNING,))
+    
+            assert (await other.cancel(running["id"]))["status"] == jobs.CANCELLED
+            assert (await other.cancel(queued["id"]))["status"] == jobs.CANCELLED
+            while owner.running or owner.depth:
+                await asyncio.sleep(0.05)
+    
+            # The owner dropped the running job's result and never started the queued one
+            for job in (running, queued):
+                assert (await owner.get(job["id"]))["status"] == jobs.CANCELLED
+                assert await owner.result(job["id"]) is None
+            assert owner.stats()[jobs.SUCCEEDED] == 0
+            assert owner.stats()["run_seconds"]["count"] == 1
+        finally:
+            await owner.stop()
+    
+    asyncio.run(scenario())
+
+def test_memory_store_expires_records_and_results():
+    now = [0.0]
+    store = jobs.MemoryJobStore(ttl=10, clock=lambda: now[0])
+    
+    async def scenario():
+        await store.save({"id": "a", "status": jobs.QUEUED})
+        await store.save_result("a", b"body")
+        assert (await store.load("a"))["status"] == jobs.QUEUED
+        now[0] = 10
+        assert await store.load("a") is None and await store.load_result("a") is None
+    
+    asyncio.run(scenario())
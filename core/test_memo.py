@@ -0,0 +1,76 @@
+import asyncio
+
+from agents import memo
+from agents.graph import NODE_INPUTS, NODE_UPSTREAM
+
+STATE = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+}
+
+def with_profile(**fields):
+    return {**STATE, "user_profile": {**STATE["user_profile"], **fields}}
+
+def test_keys_depend_only_on_the_fields_a_node_reads():
+    node_memo = memo.NodeMemo(NODE_INPUTS, NODE_UPSTREAM, memo.ResultCache(10))
+    key = node_memo.key
+    
+    # Equal numbers and spellings of the same city share a key
+    assert key("nexus", STATE) == key("nexus", with_profile(annual_income=120000.0))
+    assert key("actuary", STATE) == key("actuary", {**STATE, "target_city": "lisbon"})
+    # Other fields leave a node's key alone; its own fields and the data version do not
+    assert key("actuary", STATE) == key("actuary", with_profile(annual_income=90000))
+    assert key("nexus", STATE) != key("nexus", with_profile(annual_income=90000))
+    assert key("nexus", STATE) != key("nexus", STATE, version="another")
+    # Downstream keys follow their parents
+    assert key("aggregator", STATE) != key("aggregator", with_profile(monthly_expenses=3000))
+    
+    assert memo.simulation_key(STATE) == memo.simulation_key(with_profile(annual_income=120000.0))
+    assert memo.simulation_key(STATE) != memo.simulation_key(with_profile(current_wealth=0))
+
+def test_changing_one_field_reruns_only_the_nodes_reading_it():
+    cache = memo.ResultCache(100)
+    node_memo = memo.NodeMemo(NODE_INPUTS, NODE_UPSTREAM, cache)
+    calls = []
+    
+    def counting(node):
+        async def run(state):
+            calls.append(node)
+            return {node: state["user_profile"]}
+        return node_memo.wrap(node, run)
+    
+    nodes = {node: counting(node) for node in NODE_INPUTS}
+    
+    async def run_all(state):
+        for node in nodes.values():
+            await node(state)
+    
+    asyncio.run(run_all(STATE))
+    asyncio.run(run_all(STATE))
+    assert sorted(calls) == sorted(NODE_INPUTS)
+    
+    calls.clear()
+    asyncio.run(run_all(with_profile(monthly_expenses=3000)))
+    assert calls == ["fiscal_ghost", "aggregator"]
+    assert cache.stats()["namespaces"]["actuary"] == {"hits": 2, "misses": 1}
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = memo.ResultCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {
+        "entries": 2,
+        "max_entries": 2,
+        "evictions": 1,
+        "namespaces": {"default": {"hits": 3, "misses": 1}}
+    }
+    
+    disabled = memo.ResultCache(0)
+    disabled.put("a", 1)
+    assert len(disabled) == 0 and disabled.get("a") is None
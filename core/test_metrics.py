@@ -0,0 +1,39 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from agents.graph import NODES
+from main import app
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Porto",
+    # An income no other test uses, so the simulation cache cannot answer for the graph
+    "user_profile": {"annual_income": 104729, "monthly_expenses": 4000, "current_wealth": 50000}
+}
+
+def sample(text: str, series: str) -> float:
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+def test_metrics_time_every_node_of_a_simulation():
+    with TestClient(app) as client:
+        before = client.get("/metrics").text
+        response = client.post("/simulate", json=PAYLOAD)
+        metrics = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert len(response.headers["x-trace-id"]) == 32
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE equinox_node_seconds histogram" in metrics.text
+    for node in NODES:
+        count = f'equinox_node_seconds_count{{node="{node}"}}'
+        assert sample(metrics.text, count) == sample(before, count) + 1
+        assert sample(metrics.text, f'equinox_node_seconds_bucket{{node="{node}",le="+Inf"}}') == sample(metrics.text, count)
+        assert sample(metrics.text, f'equinox_node_seconds_sum{{node="{node}"}}') > 0
+    
+    request = 'equinox_http_request_seconds_count{method="POST",route="/simulate",status="200"}'
+    assert sample(metrics.text, request) == sample(before, request) + 1
+    lookup = 'equinox_cache_lookups_total{cache="simulations",namespace="simulate",result="miss"}'
+    assert sample(metrics.text, lookup) == sample(before, lookup) + 1
+    assert "# TYPE equinox_job_queue_depth gauge" in metrics.text
@@ -0,0 +1,29 @@
+from dataclasses import replace
+
+import numpy as np
+
+from shared import montecarlo
+from shared.montecarlo import MonteCarloConfig, simulate_wealth
+
+CONFIG = MonteCarloConfig(paths=2_000, years=4, chunk_size=2_000)
+INPUTS = (50_000, 84_000, 33_600)
+
+def test_bands_match_percentiles_of_the_full_wealth_matrix():
+    result = simulate_wealth(*INPUTS, CONFIG)
+    factors = np.stack([year.copy() for year in montecarlo._factor_years(CONFIG)])
+    wealth = INPUTS[0] * factors[:, 0] + INPUTS[1] * factors[:, 1] - INPUTS[2] * factors[:, 2]
+    
+    for percentile in CONFIG.percentiles:
+        assert np.allclose(result["percentiles"][f"p{percentile:g}"], np.percentile(wealth, percentile, axis=1))
+    assert np.allclose(result["mean"], wealth.mean(axis=1))
+    assert result["probability_of_loss"] == (wealth[-1] < INPUTS[0]).mean()
+
+def test_streamed_and_cached_factors_give_the_same_bands(monkeypatch):
+    cached = simulate_wealth(*INPUTS, CONFIG)
+    monkeypatch.setattr(montecarlo, "FACTOR_CACHE_CELLS", 0)
+    # Uncached configs are reduced year by year as they are drawn, in any chunk size
+    for chunk_size in (2_000, 300):
+        streamed = simulate_wealth(*INPUTS, replace(CONFIG, chunk_size=chunk_size))
+        assert np.allclose(streamed["percentiles"]["p50"], cached["percentiles"]["p50"])
+        assert np.allclose(streamed["mean"], cached["mean"])
+        assert streamed["probability_of_loss"] == cached["probability_of_loss"]
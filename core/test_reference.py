@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from agents import reference
+
+def test_first_load_and_trigram_build_happen_once_across_threads(monkeypatch):
+    loads = []
+    load_index = reference._load_index
+    barrier = threading.Barrier(8)
+    
+    def counting_load():
+        loads.append(threading.get_ident())
+        return load_index()
+    
+    def first_use(_):
+        barrier.wait()
+        return reference.get_city_index()
+    
+    monkeypatch.setattr(reference, "_index", None)
+    monkeypatch.setattr(reference, "_load_index", counting_load)
+    with ThreadPoolExecutor(8) as pool:
+        indexes = list(pool.map(first_use, range(8)))
+    assert len(loads) == 1
+    assert all(index is indexes[0] for index in indexes)
+    
+    # Misspellings resolved while the trigram index is being built all find the city
+    index = indexes[0]
+    lisbon = index.resolve("Lisbon")
+    spellings = ["Lisbn", "Lisbonn", "Lsbon", "Lisboon"] * 4
+    barrier = threading.Barrier(len(spellings))
+    
+    def misspelled(city):
+        barrier.wait()
+        return index.resolve(city)
+    
+    with ThreadPoolExecutor(len(spellings)) as pool:
+        assert set(pool.map(misspelled, spellings)) == {lisbon}
+    assert index._trigrams
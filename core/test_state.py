@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import pytest
+
+from agents.graph import get_app
+from agents.state import (ComplianceAnalysis, ExpenseAnalysis, FinalReport, RiskAnalysis, SimulationResult,
+                          WealthProjection, as_data)
+
+BANDS = {"p5": [90.0, 180.0, 270.0], "p50": [100.0, 200.0, 300.0], "p95": [110.0, 220.0, 330.0]}
+
+def test_wealth_projection_keeps_bands_as_one_array_and_expands_per_year():
+    projection = WealthProjection.from_bands("Lisbon", BANDS)
+    assert projection.values.shape == (3, 3) and projection.years == 3
+    assert not projection.values.flags.writeable
+    assert projection.band("p95").tolist() == BANDS["p95"]
+    
+    rows = projection.to_data()
+    assert rows[1] == {"year": 2, "wealth": 200.0, "p5": 180.0, "p50": 200.0, "p95": 220.0, "city": "Lisbon"}
+    # The per-year rows carry every band back out unchanged
+    assert {band: [row[band] for row in rows] for band in BANDS} == BANDS
+    assert WealthProjection.from_bands("Lisbon", {band: [row[band] for row in rows] for band in BANDS}) == projection
+    assert projection != WealthProjection.from_bands("Porto", BANDS)
+
+def test_simulation_result_matches_as_data_of_the_graph_state_and_survives_json():
+    state = asyncio.run(get_app().ainvoke({
+        "current_city": "San Francisco",
+        "target_city": "Lisbon",
+        "user_profile": {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+    }))
+    result = SimulationResult.from_state(state)
+    data = result.to_data()
+    
+    assert isinstance(result.wealth_projection, WealthProjection)
+    assert data == {key: as_data(state[key]) for key in SimulationResult.__slots__}
+    assert json.loads(json.dumps(data)) == data
+    # Derived figures are consistent with the stored ones
+    compliance = data["compliance_analysis"]
+    assert compliance["estimated_tax"] == pytest.approx(
+        compliance["income_tax"] + compliance["social_security"] + compliance["origin_tax"] - compliance["treaty_relief"]
+    )
+    assert compliance["net_wealth_projection"] == pytest.approx(120000 - compliance["estimated_tax"])
+    assert data["wealth_projection"][-1]["wealth"] == result.wealth_projection.band("p50")[-1]
+
+def test_as_data_expands_nested_results_and_passes_other_values_through():
+    report = FinalReport(net_annual_savings=1.5, quality_of_life_score="Low", probability_of_loss=0.25)
+    expenses = ExpenseAnalysis(4000, 0.7, "USD", "EUR", 0.5, "v1")
+    nested = {"report": report, "items": [expenses, None, 3], "label": "x"}
+    
+    assert as_data(nested) == {"report": report.to_data(), "items": [expenses.to_data(), None, 3], "label": "x"}
+    assert expenses.to_data()["projected_expenses_local"] == 4000 * 0.7 * 0.5
+    assert sum(expenses.to_data()["details"].values()) == pytest.approx(4000 * 0.7)
+    
+    risky = RiskAnalysis(air_quality_index=40, safety_score=80, healthcare_wait_time_hours=6,
+                         exposure={"aqi": {"mean": 150.0}, "safety": {"mean": None}})
+    assert risky.to_data()["overall_risk_rating"] == "High"
+    assert risky.to_data()["exposure_history"] == risky.exposure
+    assert "exposure_history" not in RiskAnalysis(40, 80, 6).to_data()
+    assert ComplianceAnalysis(0, 0, 0).tax_rate == 0.0
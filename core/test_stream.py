@@ -0,0 +1,41 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+}
+
+AGENT_EVENTS = {"risk_analysis": "actuary", "expense_analysis": "fiscal_ghost", "compliance_analysis": "nexus"}
+
+def parse_events(body: str):
+    # Every event is an event: line and a data: line, closed by a blank line
+    assert body.endswith("\n\n")
+    events = []
+    for frame in body[:-2].split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+def test_stream_sends_each_agent_then_the_aggregate_then_done():
+    with TestClient(app) as client:
+        response = client.post("/simulate/stream", json=PAYLOAD)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+    
+    names = [name for name, _ in events]
+    assert names[0] == "started"
+    assert events[0][1] == {"nodes": ["actuary", "fiscal_ghost", "nexus", "aggregator"]}
+    # One event per agent, in completion order, before anything from the aggregator
+    assert sorted(names[1:4]) == sorted(AGENT_EVENTS)
+    for name, data in events[1:4]:
+        assert data["node"] == AGENT_EVENTS[name]
+    assert sorted(names[4:6]) == ["final_report", "wealth_projection"]
+    assert all(data["node"] == "aggregator" for _, data in events[4:6])
+    assert events[6:] == [("done", {"status": "success"})]
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+
+from agents.nexus.tax_engine import BRACKETS_PATH, TaxEngine
+
+SCHEDULES = {
+    "version": "test",
+    "jurisdictions": {
+        "AA": {"allowance": 10000, "brackets": [[0, 0.1], [20000, 0.2], [50000, 0.4]],
+               "social_security": [{"rate": 0.05, "cap": 60000}, {"rate": 0.01, "floor": 30000}],
+               "taxes_citizens_abroad": True},
+        "BB": {"brackets": [[0, 0.3]]},
+        "CC": {"brackets": [[0, 0.25]]}
+    },
+    "treaties": [{"countries": ["AA", "BB"], "relief_percentage": 0.5}]
+}
+
+def engine_from(tmp_path, data=SCHEDULES) -> TaxEngine:
+    path = tmp_path / "brackets.json"
+    path.write_text(json.dumps(data))
+    return TaxEngine.from_json(path)
+
+def test_brackets_apply_marginal_rates_above_the_allowance(tmp_path):
+    engine = engine_from(tmp_path)
+    tax = engine.compute("AA", [0, 10000, 30000, 80000])["income_tax"]
+    # Taxable 0, 0, 20000 and 70000: 10% to 20k, 20% to 50k, 40% above
+    assert np.allclose(tax, [0, 0, 2000, 2000 + 6000 + 8000])
+
+def test_social_security_stops_at_caps_and_starts_at_floors(tmp_path):
+    engine = engine_from(tmp_path)
+    social = engine.compute("AA", [20000, 50000, 100000])["social_security"]
+    assert np.allclose(social, [
+        20000 * 0.05,
+        50000 * 0.05 + 20000 * 0.01,
+        60000 * 0.05 + 70000 * 0.01
+    ])
+
+def test_treaty_relieves_double_taxation_in_both_directions(tmp_path):
+    engine = engine_from(tmp_path)
+    assert engine.relief_percentage("AA", "BB") == engine.relief_percentage("BB", "AA") == 0.5
+    
+    moved = engine.compute("BB", 80000, origin="AA")
+    # AA taxes its citizens abroad; the treaty relieves half the smaller of the two income taxes
+    assert moved["income_tax"] == 24000
+    assert moved["origin_tax"] == 16000
+    assert moved["treaty_relief"] == 8000
+    assert moved["total_tax"] == 24000 + 16000 - 8000
+    
+    # No treaty with CC: both income taxes are due in full
+    untreated = engine.compute("CC", 80000, origin="AA")
+    assert untreated["treaty_relief"] == 0
+    assert untreated["total_tax"] == 20000 + 16000
+    
+    # BB taxes by residence, so leaving it leaves its tax behind; staying home has no origin tax
+    assert engine.compute("AA", 80000, origin="BB")["origin_tax"] == 0
+    assert engine.compute("AA", 80000, origin="AA")["total_tax"] == engine.compute("AA", 80000)["total_tax"]
+    # An explicit relief percentage overrides the treaty table
+    assert engine.compute("BB", 80000, origin="AA", relief_percentage=0.25)["treaty_relief"] == 4000
+
+def test_aligned_rows_match_single_jurisdiction_results(tmp_path):
+    engine = engine_from(tmp_path)
+    codes = ["BB", "AA", "ZZ", "CC", "BB"]
+    incomes = np.array([80000, 30000, 50000, 40000, 10000])
+    aligned = engine.compute_aligned(codes, incomes, fallback_rates=np.full(5, 0.2), origin="AA")
+    for row, code in enumerate(codes):
+        if code == "ZZ":
+            continue
+        single = engine.compute(code, incomes[row], origin="AA")
+        for key, values in aligned.items():
+            assert np.isclose(values[row], single[key])
+    # Without a schedule the flat fallback rate is the income tax; the origin's tax still applies
+    assert aligned["income_tax"][2] == 10000
+    assert aligned["total_tax"][2] == 10000 + engine.origin_tax("AA", "ZZ", np.float64(50000))
+
+def test_shipped_schedules_relieve_us_citizens_under_treaties():
+    engine = TaxEngine.from_json(BRACKETS_PATH)
+    lisbon = engine.compute("PT", 120000, origin="US")
+    dubai = engine.compute("AE", 120000, origin="US")
+    assert lisbon["treaty_relief"] == 0.15 * min(lisbon["origin_tax"], lisbon["income_tax"]) > 0
+    assert dubai["origin_tax"] > 0 and dubai["treaty_relief"] == 0
+    assert engine.compute("US", 120000, origin="GB")["origin_tax"] == 0
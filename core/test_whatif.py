@@ -0,0 +1,71 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from agents import memo, whatif
+from agents.graph import get_app
+from agents.state import as_data
+from main import app, initial_state_for, SimulationRequest
+
+PAYLOAD = {
+    "current_city": "San Francisco",
+    "target_city": "Lisbon",
+    "user_profile": {"annual_income": 120000, "monthly_expenses": 4000, "current_wealth": 50000}
+}
+
+def test_unknown_currency_is_rejected_without_touching_the_session():
+    with TestClient(app) as client:
+        bad_start = client.post("/whatif", json={**PAYLOAD, "user_profile": {**PAYLOAD["user_profile"], "currency": "XXX"}})
+        assert bad_start.status_code == 422
+        assert "XXX" in bad_start.json()["detail"]
+    
+        started = client.post("/whatif", json=PAYLOAD).json()
+        session = f"/whatif/{started['session_id']}"
+        bad_tick = client.post(session, json={"user_profile": {"currency": "XXX"}})
+        assert bad_tick.status_code == 422
+        assert client.get(session).json()["data"] == started["data"]
+    
+        tick = client.post(session, json={"user_profile": {"currency": "EUR"}})
+        assert tick.status_code == 200
+        assert tick.json()["recomputed"] == ["fiscal_ghost", "aggregator"]
+
+def node_stats():
+    return {node: dict(stats) for node, stats in memo.node_cache.stats()["namespaces"].items()}
+
+def test_a_tick_reruns_only_dependent_nodes_and_returns_only_changes():
+    state = asyncio.run(get_app().ainvoke(initial_state_for(SimulationRequest(**PAYLOAD))))
+    before = node_stats()
+    
+    new_state, rerun, changes = asyncio.run(whatif.recompute(state, {"monthly_expenses": 3777}))
+    assert rerun == ["fiscal_ghost", "aggregator"]
+    after = node_stats()
+    # Nodes not reading monthly_expenses are not even looked up
+    for node in ("actuary", "nexus"):
+        assert after[node] == before[node]
+    for node in rerun:
+        assert after[node]["misses"] == before[node]["misses"] + 1
+    
+    # Only the outputs of rerun nodes that changed, and within them only the changed fields
+    assert set(changes) == {"expense_analysis", "final_report", "wealth_projection"}
+    for key, fields in changes["expense_analysis"].items():
+        assert as_data(state["expense_analysis"])[key] != as_data(new_state["expense_analysis"])[key] == fields
+    unchanged = set(as_data(state["expense_analysis"])) - set(changes["expense_analysis"])
+    assert unchanged and all(
+        as_data(state["expense_analysis"])[key] == as_data(new_state["expense_analysis"])[key] for key in unchanged
+    )
+    
+    # Dragging the slider back reruns the same nodes, from the memo
+    restored, rerun, changes = asyncio.run(whatif.recompute(new_state, {"monthly_expenses": 4000}))
+    assert rerun == ["fiscal_ghost", "aggregator"]
+    assert node_stats()["fiscal_ghost"]["hits"] > after["fiscal_ghost"]["hits"]
+    assert node_stats()["aggregator"]["misses"] == after["aggregator"]["misses"]
+    assert {key: as_data(restored[key]) for key in whatif.OUTPUT_KEYS} == {key: as_data(state[key]) for key in whatif.OUTPUT_KEYS}
+    
+    # A delta equal to the current profile reruns nothing and changes nothing
+    assert asyncio.run(whatif.recompute(state, {"annual_income": 120000}))[1:] == ([], {})
+
+def test_diff_keeps_only_changed_leaves():
+    old = {"a": 1, "b": {"c": 1, "d": [1, 2]}, "e": None}
+    new = {"a": 1, "b": {"c": 1, "d": [1, 3]}, "e": {"f": 2}}
+    assert whatif.diff(old, new) == {"b": {"d": [1, 3]}, "e": {"f": 2}}
+    assert whatif.diff(old, old) == {}
@@ -0,0 +1,7 @@
+"""
+Modules used by both the core and the backend app: numerical models and
+reference data that must give the same answer whichever API serves them.
+
+Each app's `agents` package puts the repository root on sys.path, so
+`shared` imports the same way from core/ and backend/.
+"""
@@ -0,0 +1,171 @@
+"""
+Response encodings negotiated from the Accept header.
+
+Simulation results are mostly small metadata around a few numeric arrays
+(projection years, percentile bands, per-city or per-location columns).
+Besides plain JSON, application/x-float64-le ships those arrays as packed
+little-endian float64: a JSON header followed by the raw buffers, each
+8-byte aligned, so a client can np.frombuffer() them in place.
+
+Every numeric list is replaced in the header by {"$buffer": i}, and the
+header's "buffers" entry i names its path and offset. Lists of
+same-shaped records are turned into one list per field first, and so are
+maps of two or more same-shaped records (e.g. results per location), with
+the map's keys kept under "$index".
+JSON goes through orjson when it is installed.
+"""
+
+import json
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+JSON = "application/json"
+FLOAT64 = "application/x-float64-le"
+
+FLOAT64_MAGIC = b"F64B"
+
+
+def available_formats() -> List[str]:
+    return [JSON, FLOAT64]
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Best supported media type for an Accept header, JSON when there is
+    none or it allows anything; None if nothing acceptable is supported.
+    """
+    if not accept:
+        return JSON
+    offered = available_formats()
+    ranked = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranked.append((-quality, position, media_type.lower()))
+    for _, _, media_type in sorted(ranked):
+        if media_type in offered:
+            return media_type
+        if media_type in ("*/*", "application/*"):
+            return JSON
+    return None
+
+
+def dumps_json(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(data)).encode()
+
+
+def _is_record_list(value: Any) -> bool:
+    return (
+        bool(value) and isinstance(value[0], dict)
+        and all(isinstance(item, dict) and item.keys() == value[0].keys() for item in value)
+    )
+
+
+def _is_record_map(value: Dict) -> bool:
+    records = list(value.values())
+    return len(records) > 1 and _is_record_list(records)
+
+
+def split_buffers(data: Any) -> Tuple[Any, List[Tuple[str, np.ndarray]]]:
+    """Metadata with numeric arrays swapped for {"$buffer": i}, and the arrays."""
+    buffers: List[Tuple[str, np.ndarray]] = []
+
+    def walk(value: Any, path: str) -> Any:
+        if isinstance(value, np.ndarray) and value.dtype.kind in "fiu":
+            buffers.append((path, np.ascontiguousarray(value, dtype="<f8")))
+            return {"$buffer": len(buffers) - 1}
+        if isinstance(value, dict):
+            if _is_record_map(value):
+                records = list(value.values())
+                columns = {key: [record[key] for record in records] for key in records[0]}
+                return walk({"$index": list(value), **columns}, path)
+            return {key: walk(item, f"{path}.{key}" if path else str(key)) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            if _is_record_list(value):
+                return walk({key: [item[key] for item in value] for key in value[0]}, path)
+            if value and isinstance(value[0], (int, float)) and not isinstance(value[0], bool):
+                # Converted in C; mixed lists come back as strings or objects
+                array = np.asarray(value)
+                if array.dtype.kind in "fiu":
+                    return walk(array, path)
+            if not any(isinstance(item, (dict, list, tuple, np.ndarray)) for item in value):
+                return value
+            return [walk(item, f"{path}[{i}]") for i, item in enumerate(value)]
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        return value
+
+    return walk(data, ""), buffers
+
+
+def _header(metadata: Any, buffers: List[Tuple[str, np.ndarray]], offsets: List[int]) -> Dict[str, Any]:
+    return {
+        "metadata": metadata,
+        "buffers": [
+            {"path": path, "offset": offset, "length": int(array.size), "shape": list(array.shape)}
+            for (path, array), offset in zip(buffers, offsets)
+        ]
+    }
+
+
+def encode_float64(data: Any) -> Iterator[bytes]:
+    """
+    FLOAT64 body as chunks: magic, uint32 header length, JSON header
+    (padded to 8 bytes), then each buffer. Offsets in the header count
+    from the end of the header. The arrays are yielded as memoryviews,
+    not copied.
+    """
+    metadata, buffers = split_buffers(data)
+    offsets, position = [], 0
+    for _, array in buffers:
+        offsets.append(position)
+        position += array.nbytes
+    header = dumps_json(_header(metadata, buffers, offsets))
+    header += b" " * (-(len(FLOAT64_MAGIC) + 4 + len(header)) % 8)
+
+    yield FLOAT64_MAGIC + struct.pack("<I", len(header)) + header
+    for _, array in buffers:
+        yield memoryview(array).cast("B")
+
+
+def encode_body(data: Any, media_type: str) -> bytes:
+    """Whole body for data in a media type returned by negotiate."""
+    if media_type == FLOAT64:
+        return b"".join(encode_float64(data))
+    return dumps_json(data)
+
+
+def encoded_response(data: Any, media_type: str) -> Response:
+    """Response for data in a media type returned by negotiate."""
+    if media_type == FLOAT64:
+        chunks = list(encode_float64(data))
+
+        async def body():
+            for chunk in chunks:
+                yield chunk
+
+        return StreamingResponse(
+            body(),
+            media_type=FLOAT64,
+            headers={"Content-Length": str(sum(len(chunk) for chunk in chunks))}
+        )
+    return Response(dumps_json(data), media_type=JSON)
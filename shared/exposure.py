@@ -0,0 +1,456 @@
+"""
+Hourly air quality and safety history per city, for both apps' Actuary.
+
+Each city's hourly series are raw float32 files, one per metric, that only
+ever grow at the end and are memory-mapped for reading. Next to each
+series, a file of per-month aggregates (valid hours, sum, max, hours past
+the metric's threshold and a fixed-bin histogram) is brought up to date
+on every append by re-aggregating only the month the stored series ends
+in plus the new hours. Annual means, tail percentiles, exceedance hours,
+seasonal peaks and rolling windows over any span of months are computed
+from the aggregates, so a decade of hours is never read again or loaded
+into memory. Percentiles are read off the histogram and are exact to the
+bin width (1 unit below 100, 5 units up to 500).
+
+Each app subclasses ExposureStore with its own city_key: core keys
+histories by the reference city id, the backend by the normalized city
+name. The store's VERSION file changes with every append, so results
+cached from an older history can be told apart.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+# Hours aggregated per pass while appending, so a long backfill is aggregated in bounded memory
+CHUNK_HOURS = 24 * 366
+# Months in the trailing window the Actuary rates a city on
+TRAILING_MONTHS = 12
+# Seconds between checks of the VERSION file for appends by other processes (0 checks on every call)
+EXPOSURE_CHECK_INTERVAL = float(os.getenv("EXPOSURE_CHECK_INTERVAL", "60"))
+
+
+@dataclass(frozen=True)
+class Metric:
+    threshold: float
+    above: bool = True  # hours above the threshold count as exceedances (below it when False)
+
+
+METRICS = {
+    "pm25": Metric(35.0),  # µg/m³, the 24-hour PM2.5 standard applied to single hours
+    "aqi": Metric(100.0),
+    "safety": Metric(65.0, above=False),  # 0-100 score, higher is safer
+}
+
+# Histogram bins shared by every metric: 1 wide below 100, 5 wide up to 500, then one open bin
+EDGES = np.concatenate([np.arange(0, 100, 1.0), np.arange(100, 505, 5.0)])
+BINS = len(EDGES)
+
+MONTH_DTYPE = np.dtype([
+    ("month", "<i4"),  # months since 1970-01
+    ("hours", "<u4"),  # hours with a value
+    ("sum", "<f8"),
+    ("max", "<f4"),
+    ("exceed", "<u4"),
+    ("hist", "<u4", (BINS,)),
+])
+
+Hour = Union[int, str, np.datetime64]
+
+
+def to_hour(value: Hour) -> int:
+    """Hours since 1970-01-01T00 UTC."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(np.datetime64(value, "h").astype(np.int64))
+
+
+def hour_label(hour: int) -> str:
+    return str(np.datetime64(hour, "h"))
+
+
+def aggregate(values: np.ndarray, first_hour: int, metric: Metric) -> np.ndarray:
+    """Per-month records for consecutive hourly values starting at first_hour; NaN hours are skipped."""
+    months = np.arange(first_hour, first_hour + len(values)).astype("datetime64[h]").astype("datetime64[M]").astype(np.int64)
+    first = int(months[0])
+    count = int(months[-1]) - first + 1
+    valid = ~np.isnan(values)
+    offsets, values = months[valid] - first, values[valid]
+
+    records = np.zeros(count, dtype=MONTH_DTYPE)
+    records["month"] = np.arange(first, first + count)
+    records["hours"] = np.bincount(offsets, minlength=count)
+    records["sum"] = np.bincount(offsets, weights=values, minlength=count)
+    exceeded = values > metric.threshold if metric.above else values < metric.threshold
+    records["exceed"] = np.bincount(offsets[exceeded], minlength=count)
+    maxima = np.full(count, np.nan)
+    np.fmax.at(maxima, offsets, values)
+    records["max"] = maxima
+    bins = np.clip(np.searchsorted(EDGES, values, side="right") - 1, 0, BINS - 1)
+    records["hist"] = np.bincount(offsets * BINS + bins, minlength=count * BINS).reshape(count, BINS)
+    return records
+
+
+def merge(records: Optional[np.ndarray], more: np.ndarray) -> np.ndarray:
+    """Concatenates month records, combining the month both end and start in."""
+    if records is None or not len(records):
+        return more
+    if records["month"][-1] != more["month"][0]:
+        return np.concatenate([records, more])
+    last, first = records[-1:].copy(), more[0]
+    for field in ("hours", "sum", "exceed", "hist"):
+        last[field] += first[field]
+    last["max"] = np.fmax(last["max"], first["max"])
+    return np.concatenate([records[:-1], last, more[1:]])
+
+
+def hist_percentile(hist: np.ndarray, q: float, maximum: np.ndarray) -> np.ndarray:
+    """
+    q-th percentile from histograms over the last axis, interpolated within
+    the bin it falls in; the open last bin ends at the observed maximum.
+    """
+    hist = np.asarray(hist, dtype=np.float64)
+    cumulative = np.cumsum(hist, axis=-1)
+    total = cumulative[..., -1]
+    target = q / 100 * total
+    index = np.argmax(cumulative >= target[..., None], axis=-1)
+    in_bin = np.take_along_axis(hist, index[..., None], axis=-1)[..., 0]
+    before = np.take_along_axis(cumulative, index[..., None], axis=-1)[..., 0] - in_bin
+    low = EDGES[index]
+    high = np.where(index < BINS - 1, EDGES[np.minimum(index + 1, BINS - 1)], maximum)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = np.where(in_bin > 0, (target - before) / in_bin, 0.0)
+        value = np.minimum(low + fraction * (high - low), maximum)
+    return np.where(total > 0, value, np.nan)
+
+
+def _empty_stats(q: float) -> Dict[str, Any]:
+    return {"hours": 0, "mean": None, f"p{q:g}": None, "max": None, "exceedance_hours": 0, "exceedance_share": 0.0}
+
+
+def _grouped_stats(records: np.ndarray, starts: np.ndarray, q: float = 95) -> List[Dict[str, Any]]:
+    """Statistics for each run of month records beginning at `starts`, with one percentile pass for all runs."""
+    if not len(records):
+        return [_empty_stats(q)]
+    hours = np.add.reduceat(records["hours"].astype(np.int64), starts)
+    sums = np.add.reduceat(records["sum"], starts)
+    exceed = np.add.reduceat(records["exceed"].astype(np.int64), starts)
+    maxima = np.fmax.reduceat(records["max"].astype(np.float64), starts)
+    percentiles = hist_percentile(np.add.reduceat(records["hist"], starts, axis=0), q, maxima)
+
+    stats = []
+    for count, total, exceeded, maximum, percentile in zip(
+            hours.tolist(), sums.tolist(), exceed.tolist(), maxima.tolist(), percentiles.tolist()):
+        if not count:
+            stats.append(_empty_stats(q))
+            continue
+        stats.append({
+            "hours": count,
+            "mean": total / count,
+            f"p{q:g}": percentile,
+            "max": maximum,
+            "exceedance_hours": exceeded,
+            "exceedance_share": exceeded / count
+        })
+    return stats
+
+
+def _stats(records: np.ndarray, q: float = 95) -> Dict[str, Any]:
+    return _grouped_stats(records, np.array([0]), q)[0]
+
+
+def _annual(records: np.ndarray, q: float) -> List[Dict[str, Any]]:
+    if not len(records):
+        return []
+    years = records["month"] // 12 + 1970
+    starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    return [{"year": int(years[start]), **stats} for start, stats in zip(starts, _grouped_stats(records, starts, q))]
+
+
+def _seasonal(records: np.ndarray, metric: str, q: float) -> Dict[str, Any]:
+    month_of_year = records["month"] % 12
+    hours = np.bincount(month_of_year, weights=records["hours"], minlength=12)
+    sums = np.bincount(month_of_year, weights=records["sum"], minlength=12)
+    if not np.any(hours):
+        return {"monthly_means": [None] * 12, "peak_month": None, "peak": None}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(hours > 0, sums / hours, np.nan)
+    # The worst month: highest for pollution, lowest for safety
+    peak = int(np.nanargmax(means) if METRICS[metric].above else np.nanargmin(means))
+    return {
+        "monthly_means": [None if np.isnan(mean) else float(mean) for mean in means],
+        "peak_month": peak + 1,
+        "peak": _stats(records[month_of_year == peak], q)
+    }
+
+
+class CityHistory:
+    """Read-only view of one city's series and monthly aggregates as of its last completed append."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        meta = json.loads((self.directory / "meta.json").read_text())
+        self.city_id = self.directory.name
+        self.name = meta["name"]
+        self.start_hour = meta["start_hour"]
+        self.hours = meta["hours"]
+        self.month_count = meta["months"]
+
+    @property
+    def end_hour(self) -> int:
+        return self.start_hour + self.hours
+
+    def series(self, metric: str) -> np.ndarray:
+        """Hourly values from start_hour, memory-mapped; NaN where an hour has no value."""
+        return np.memmap(self.directory / f"{metric}.f4", dtype="<f4", mode="r", shape=(self.hours,))
+
+    def months(self, metric: str) -> np.ndarray:
+        return np.memmap(self.directory / f"{metric}.months", dtype=MONTH_DTYPE, mode="r", shape=(self.month_count,))
+
+    def window(self, metric: str, months: Optional[int] = None, q: float = 95) -> Dict[str, Any]:
+        """Statistics over the last `months` months (all of them by default)."""
+        records = self.months(metric)
+        return _stats(records[-months:] if months else records, q)
+
+    def annual(self, metric: str, q: float = 95) -> List[Dict[str, Any]]:
+        """Statistics per calendar year."""
+        return _annual(np.asarray(self.months(metric)), q)
+
+    def seasonal(self, metric: str, q: float = 95) -> Dict[str, Any]:
+        """Mean per calendar month over all years, and the month that peaks."""
+        return _seasonal(np.asarray(self.months(metric)), metric, q)
+
+    def rolling(self, metric: str, months: int = TRAILING_MONTHS, q: float = 95) -> Dict[str, np.ndarray]:
+        """Trailing `months`-month statistics ending at every month, from cumulative sums of the aggregates."""
+        records = self.months(metric)
+
+        def window_sums(values: np.ndarray) -> np.ndarray:
+            cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0, dtype=np.float64)])
+            ends = np.arange(1, len(values) + 1)
+            return cumulative[ends] - cumulative[np.maximum(ends - months, 0)]
+
+        hours = window_sums(records["hours"])
+        maxima = np.asarray(records["max"], dtype=np.float64)
+        padded = np.concatenate([np.full(months - 1, np.nan), maxima])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            window_max = np.fmax.reduce(np.lib.stride_tricks.sliding_window_view(padded, months), axis=1)
+            mean = np.where(hours > 0, window_sums(records["sum"]) / hours, np.nan)
+        return {
+            "month": records["month"].astype("datetime64[M]"),
+            "hours": hours.astype(np.int64),
+            "mean": mean,
+            f"p{q:g}": hist_percentile(window_sums(records["hist"]), q, window_max),
+            "max": window_max,
+            "exceedance_hours": window_sums(records["exceed"]).astype(np.int64)
+        }
+
+    def trailing(self, months: int = TRAILING_MONTHS) -> Dict[str, Any]:
+        """Statistics over the last `months` months for every metric: what a RiskAnalysis carries."""
+        return {
+            "from": hour_label(self.start_hour),
+            "to": hour_label(self.end_hour),
+            "window_months": months,
+            **{metric: self.window(metric, months) for metric in METRICS}
+        }
+
+    def summary(self, window_months: int = TRAILING_MONTHS) -> Dict[str, Any]:
+        """Trailing window, long-term, per-year and seasonal statistics for every metric."""
+        metrics = {}
+        for metric in METRICS:
+            # A decade of months is a few hundred KB; each metric's is read once
+            records = np.array(self.months(metric))
+            metrics[metric] = {
+                "trailing": _stats(records[-window_months:]),
+                "long_term": _stats(records),
+                "annual": _annual(records, 95),
+                "seasonal": _seasonal(records, metric, 95)
+            }
+        return {
+            "city": self.name,
+            "city_id": self.city_id,
+            "from": hour_label(self.start_hour),
+            "to": hour_label(self.end_hour),
+            "hours": self.hours,
+            "window_months": window_months,
+            "metrics": metrics
+        }
+
+
+class ExposureStore:
+    """
+    Directory of city histories. One writer appends; any number of readers,
+    in any process, map the files and see each append once its meta.json is
+    replaced. Statistics are cached per store version, which other
+    processes' appends change at most check_interval seconds later (this
+    process's, immediately).
+
+    Subclasses decide where a city's history lives with city_key.
+    """
+
+    def __init__(self, directory: Path, check_interval: float = EXPOSURE_CHECK_INTERVAL):
+        self.directory = Path(directory)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._checked = 0.0
+        self._cache_version: Optional[str] = None
+        self._cache: Dict[tuple, Optional[Dict[str, Any]]] = {}
+
+    def city_key(self, city: str) -> str:
+        """Directory name of the history `city` refers to."""
+        raise NotImplementedError
+
+    def city_name(self, city: str) -> str:
+        """Name a new history is recorded under; a ValueError refuses the city."""
+        return city
+
+    @property
+    def version(self) -> str:
+        """Changes with every append; "none" while the store is empty."""
+        if self._version is None or time.monotonic() - self._checked >= self.check_interval:
+            self._version = self._read_version()
+            self._checked = time.monotonic()
+        return self._version
+
+    def _read_version(self) -> str:
+        try:
+            stat = (self.directory / "VERSION").stat()
+        except FileNotFoundError:
+            return "none"
+        # Every append replaces the file, so a new inode as well as a new mtime
+        return f"{stat.st_ino:x}.{stat.st_mtime_ns:x}"
+
+    def cities(self) -> List[str]:
+        if not self.directory.exists():
+            return []
+        return sorted(path.name for path in self.directory.iterdir() if (path / "meta.json").exists())
+
+    def history(self, city: str) -> Optional[CityHistory]:
+        """History of `city`, if one has been appended."""
+        directory = self.directory / self.city_key(city)
+        if not (directory / "meta.json").exists():
+            return None
+        return CityHistory(directory)
+
+    def is_cached(self, city: str, window_months: int = TRAILING_MONTHS) -> bool:
+        """Whether summary() answers from memory, without reading any aggregates."""
+        version = self.version
+        return version == "none" or (version == self._cache_version and ("summary", self.city_key(city), window_months) in self._cache)
+
+    def trailing(self, city: str) -> Optional[Dict[str, Any]]:
+        """CityHistory.trailing() for a city, or None without a history; shared until the next append."""
+        return self._cached(city, "trailing", CityHistory.trailing)
+
+    def summary(self, city: str, window_months: int = TRAILING_MONTHS) -> Optional[Dict[str, Any]]:
+        """CityHistory.summary() for a city, or None without a history; shared until the next append."""
+        return self._cached(city, "summary", lambda history: history.summary(window_months), window_months)
+
+    def _cached(self, city: str, kind: str, compute: Callable[[CityHistory], Dict[str, Any]], *args) -> Optional[Dict[str, Any]]:
+        version = self.version
+        if version == "none":
+            return None
+        if version != self._cache_version:
+            self._cache, self._cache_version = {}, version
+        key = (kind, self.city_key(city), *args)
+        if key not in self._cache:
+            history = self.history(city)
+            self._cache[key] = compute(history) if history else None
+        return self._cache[key]
+
+    def append(self, city: str, start: Hour, values: Dict[str, Iterable[float]]) -> CityHistory:
+        """
+        Appends consecutive hourly values from `start` for any of METRICS
+        (the others get NaN). Hours between the stored end and `start` are
+        NaN; starting before the stored end is an error.
+        """
+        unknown = set(values) - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+        columns = {metric: np.asarray(column, dtype="<f4") for metric, column in values.items()}
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) != 1 or 0 in lengths:
+            raise ValueError("Metrics must have the same, non-zero number of hours")
+        length = lengths.pop()
+        start_hour = to_hour(start)
+        key = self.city_key(city)
+
+        with self._lock:
+            directory = self.directory / key
+            directory.mkdir(parents=True, exist_ok=True)
+            meta_path = directory / "meta.json"
+            if meta_path.exists():
+                meta = json.loads(meta_path.read_text())
+            else:
+                meta = {"name": self.city_name(city), "start_hour": start_hour, "hours": 0, "months": 0}
+            end_hour = meta["start_hour"] + meta["hours"]
+            if start_hour < end_hour:
+                raise ValueError(f"{city} already has hours up to {hour_label(end_hour)}; cannot append from {hour_label(start_hour)}")
+            gap = start_hour - end_hour
+            total = meta["hours"] + gap + length
+
+            # The last stored month may be partial: it is re-aggregated with the new hours
+            if meta["hours"]:
+                last_month = np.datetime64(end_hour - 1, "h").astype("datetime64[M]")
+                tail_hour = max(meta["start_hour"], int(last_month.astype("datetime64[h]").astype(np.int64)))
+                kept_months = meta["months"] - 1
+            else:
+                tail_hour, kept_months = start_hour, 0
+
+            months = 0
+            for metric in METRICS:
+                column = columns.get(metric)
+                series_path = directory / f"{metric}.f4"
+                # Files only grow: anything past meta's length is a failed append, overwritten here
+                with open(series_path, "r+b" if series_path.exists() else "w+b") as handle:
+                    handle.seek(meta["hours"] * 4)
+                    handle.write(np.full(gap, np.nan, dtype="<f4").tobytes())
+                    handle.write((column if column is not None else np.full(length, np.nan, dtype="<f4")).tobytes())
+
+                series = np.memmap(series_path, dtype="<f4", mode="r", shape=(total,))
+                records = None
+                for chunk_start in range(tail_hour - meta["start_hour"], total, CHUNK_HOURS):
+                    chunk = np.asarray(series[chunk_start:chunk_start + CHUNK_HOURS], dtype=np.float64)
+                    records = merge(records, aggregate(chunk, meta["start_hour"] + chunk_start, METRICS[metric]))
+                del series
+
+                months_path = directory / f"{metric}.months"
+                with open(months_path, "r+b" if months_path.exists() else "w+b") as handle:
+                    handle.seek(kept_months * MONTH_DTYPE.itemsize)
+                    handle.write(records.tobytes())
+                months = kept_months + len(records)
+
+            # Readers see the append once meta.json is replaced, and drop cached results once VERSION is
+            meta.update(hours=total, months=months)
+            _replace(meta_path, json.dumps(meta))
+            _replace(self.directory / "VERSION", uuid.uuid4().hex)
+            self._version, self._checked = self._read_version(), time.monotonic()
+            return CityHistory(directory)
+
+    def append_csv(self, city: str, path: Path) -> CityHistory:
+        """Appends rows of (hour, metric...) from a CSV; hours may be unsorted or missing."""
+        with open(path, newline="", encoding="utf-8") as handle:
+            rows = list(csv.DictReader(handle))
+        if not rows:
+            raise ValueError(f"No rows in {path}")
+        metrics = [metric for metric in METRICS if metric in rows[0]]
+        hours = np.array([to_hour(row["hour"]) for row in rows])
+        first = int(hours.min())
+        columns = {metric: np.full(int(hours.max()) - first + 1, np.nan) for metric in metrics}
+        for metric, column in columns.items():
+            column[hours - first] = [float(row[metric]) if row[metric] else np.nan for row in rows]
+        return self.append(city, first, columns)
+
+
+def _replace(path: Path, text: str):
+    staging = path.with_name(path.name + ".tmp")
+    staging.write_text(text)
+    os.replace(staging, path)
+
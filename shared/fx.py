@@ -0,0 +1,160 @@
+"""
+Exchange rates as a dense currency x currency matrix.
+
+The source is a snapshot file quoting every currency against one base
+(shared/data/fx_rates.json: {"base": "USD", "as_of": ..., "rates": {"EUR": 0.93,
+...}}). Every cross rate is triangulated through the base once, when the
+snapshot is loaded, into an N x N matrix: matrix[i, j] is how many units
+of currency j one unit of currency i buys. Converting an array of amounts
+between arrays of currencies is then one fancy-indexing gather and one
+multiply.
+
+A snapshot never changes after it is built. Refreshing builds a new one
+next to the old and swaps the service's reference to it in a single
+assignment, so readers never lock: each computation takes `current()`
+once and uses that snapshot throughout, and reports its `version` (a hash
+of the snapshot file) with its results. Each process re-checks the file
+at most every FX_CHECK_INTERVAL seconds, so worker processes pick up a
+new snapshot too.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+SNAPSHOT_PATH = Path(os.getenv("FX_RATES_PATH", DATA_DIR / "fx_rates.json"))
+# Seconds between checks of the snapshot file for a newer version (0 checks on every call)
+FX_CHECK_INTERVAL = float(os.getenv("FX_CHECK_INTERVAL", "60"))
+
+Currencies = Union[str, Iterable[str], np.ndarray]
+
+
+class UnknownCurrency(KeyError):
+    pass
+
+
+class RateSnapshot:
+    def __init__(self, base: str, rates: Dict[str, float], as_of: Optional[str], version: str):
+        rates = {code.upper(): float(rate) for code, rate in rates.items()}
+        if base.upper() not in rates:
+            raise ValueError(f"Snapshot has no rate for its base currency {base}")
+        codes = sorted(rates)
+        base_rates = np.array([rates[code] for code in codes], dtype=np.float64)
+        if not np.all(base_rates > 0):
+            raise ValueError("Exchange rates must be positive")
+
+        self.base = base.upper()
+        self.as_of = as_of
+        self.version = version
+        # Sorted, so a whole array of codes is resolved with one searchsorted
+        self.codes = np.array(codes)
+        self.index = {code: i for i, code in enumerate(codes)}
+        # One unit of i is 1 / base_rates[i] of the base, which buys base_rates[j] of j
+        self.matrix = np.outer(1.0 / base_rates, base_rates)
+        self.matrix.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def from_file(cls, path: Path = SNAPSHOT_PATH) -> "RateSnapshot":
+        content = Path(path).read_bytes()
+        snapshot = json.loads(content)
+        version = hashlib.sha256(content).hexdigest()[:12]
+        return cls(snapshot["base"], snapshot["rates"], snapshot.get("as_of"), version)
+
+    def indices(self, currencies: Currencies) -> np.ndarray:
+        """Matrix rows of an array of currency codes."""
+        codes = np.asarray(currencies, dtype=str)
+        flat = codes.ravel()
+        rows = self._search(flat)
+        unknown = self.codes[rows] != flat
+        if np.any(unknown):
+            # Upper-casing is slow on big arrays, so only misses get a second try
+            retry = np.char.upper(flat[unknown])
+            rows[unknown] = self._search(retry)
+            missing = self.codes[rows[unknown]] != retry
+            if np.any(missing):
+                raise UnknownCurrency(f"Unknown currency: {', '.join(sorted(set(retry[missing].tolist())))}")
+        return rows.reshape(codes.shape)
+
+    def _search(self, codes: np.ndarray) -> np.ndarray:
+        return np.minimum(np.searchsorted(self.codes, codes), len(self.codes) - 1)
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """Units of to_currency one unit of from_currency buys."""
+        try:
+            return float(self.matrix[self.index[from_currency.upper()], self.index[to_currency.upper()]])
+        except KeyError as e:
+            raise UnknownCurrency(f"Unknown currency: {e.args[0]}") from None
+
+    def rates(self, from_currencies: Currencies, to_currencies: Currencies) -> np.ndarray:
+        """Elementwise rates; either side may be one code or an array of them."""
+        return self.matrix[self.indices(from_currencies), self.indices(to_currencies)]
+
+    def convert(self, amounts, from_currencies: Currencies, to_currencies: Currencies) -> np.ndarray:
+        """Amounts converted elementwise, broadcasting like any NumPy operation."""
+        return np.asarray(amounts, dtype=np.float64) * self.rates(from_currencies, to_currencies)
+
+    def info(self) -> Dict[str, object]:
+        return {"version": self.version, "base": self.base, "as_of": self.as_of, "currencies": len(self)}
+
+
+class FxService:
+    """
+    Holds the current snapshot. Readers take `current()` without locking;
+    `refresh` swaps in a new snapshot with one reference assignment.
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_PATH, check_interval: float = FX_CHECK_INTERVAL):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._snapshot: Optional[RateSnapshot] = None
+        self._mtime_ns: Optional[int] = None
+        self._checked = 0.0
+        # Serializes refreshes only; readers never take it
+        self._refresh_lock = threading.Lock()
+
+    def current(self) -> RateSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._checked >= self.check_interval:
+            return self.refresh(force=False)
+        return snapshot
+
+    def refresh(self, force: bool = True) -> RateSnapshot:
+        """
+        Reload the snapshot file; unless forced, only when its modification
+        time changed. The old snapshot stays valid for readers holding it.
+        """
+        with self._refresh_lock:
+            self._checked = time.monotonic()
+            mtime_ns = self.path.stat().st_mtime_ns
+            if self._snapshot is not None and not force and mtime_ns == self._mtime_ns:
+                return self._snapshot
+            snapshot = RateSnapshot.from_file(self.path)
+            if self._snapshot is None or snapshot.version != self._snapshot.version:
+                self._snapshot = snapshot
+            self._mtime_ns = mtime_ns
+            return self._snapshot
+
+
+_service: Optional[FxService] = None
+
+
+def get_fx() -> FxService:
+    global _service
+    if _service is None:
+        _service = FxService()
+    return _service
+
+
+def current() -> RateSnapshot:
+    """The snapshot to use for one computation, start to finish."""
+    return get_fx().current()
@@ -0,0 +1,350 @@
+"""
+Metrics, trace spans and structured logging for both apps.
+
+Metrics are kept in-process and rendered in the Prometheus text format on
+/metrics. Every request is timed through `InstrumentationMiddleware`; each
+app times its own units of work with `timed` (graph nodes in core, agent
+methods in backend, see their agents/instrumentation.py). Each timed call
+is a span of the request's trace: exported through OpenTelemetry when an
+SDK is configured, and logged at DEBUG either way.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+import bisect
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import sys
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - spans are then only logged
+    otel_trace = None
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+METRIC_PREFIX = os.getenv("METRIC_PREFIX", "equinox")
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger(__name__)
+
+
+# --- Metrics ---
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = f"{METRIC_PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values) -> Any:
+        """Child for one label combination; keep it to skip the lookup on hot paths."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}_total{_labels(self.labelnames, key)} {_number(child.value)}"
+            for key, child in self._children.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(child.sum)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {child.count}")
+        return lines
+
+
+@dataclass
+class Family:
+    """Samples computed at scrape time from counters kept elsewhere (e.g. cache stats)."""
+    name: str
+    kind: str
+    documentation: str
+    labelnames: Sequence[str]
+    values: Dict[Tuple[str, ...], float] = field(default_factory=dict)
+
+    def samples(self) -> List[str]:
+        name = f"{METRIC_PREFIX}_{self.name}" + ("_total" if self.kind == "counter" else "")
+        return [f"{name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in self.values.items()]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self.metrics.append(metric)
+
+    def render(self, families: Iterable[Family] = ()) -> str:
+        """Prometheus text exposition (version 0.0.4)."""
+        lines = []
+        for metric in list(self.metrics) + list(families):
+            name = metric.name if isinstance(metric, _Metric) else f"{METRIC_PREFIX}_{metric.name}"
+            if metric.kind == "counter":
+                name += "_total"
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUEST_SECONDS = Histogram("http_request_seconds", "HTTP request duration by route", ("method", "route", "status"))
+
+
+# --- Tracing ---
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    attributes: Dict[str, Any]
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("equinox_span", default=None)
+_tracer = otel_trace.get_tracer(__name__) if otel_trace is not None else None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Child span of the current one (or a new trace); mirrored to OpenTelemetry
+    once an SDK tracer provider is set, and logged at DEBUG with its duration when it ends.
+    """
+    parent = _current_span.get()
+    exporting = _tracer is not None and not isinstance(otel_trace.get_tracer_provider(), otel_trace.ProxyTracerProvider)
+    otel_span = _tracer.start_as_current_span(name, attributes=attributes) if exporting else nullcontext()
+    with otel_span as exported:
+        context = exported.get_span_context() if exported is not None else None
+        if context is not None and context.is_valid:
+            trace_id, span_id = f"{context.trace_id:032x}", f"{context.span_id:016x}"
+        else:
+            trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+            span_id = f"{random.getrandbits(64):016x}"
+        current = Span(name, trace_id, span_id, parent.span_id if parent else None, attributes)
+        token = _current_span.set(current)
+        start = perf_counter()
+        status = "ok"
+        try:
+            yield current
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            _current_span.reset(token)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("span", extra={
+                    "span": name, "trace_id": trace_id, "span_id": span_id, "parent_id": current.parent_id,
+                    "duration_ms": round((perf_counter() - start) * 1000, 3), "status": status, **attributes
+                })
+
+
+def timed(name: str, func: Callable, duration: _HistogramChild, errors: _CounterChild) -> Callable:
+    """func (sync or async) observing its duration, counting errors and opening a span per call."""
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                with span(name):
+                    return await func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                duration.observe(perf_counter() - start)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            with span(name):
+                return func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            duration.observe(perf_counter() - start)
+    return wrapper
+
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware opening the root span of each HTTP request, timing it by
+    route template and returning the trace id in X-Trace-Id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = perf_counter()
+        with span("http.request", method=scope["method"], path=scope["path"]) as current:
+            async def send_with_trace(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", current.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                # Route template, not the raw path, to keep label values bounded
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_REQUEST_SECONDS.labels(scope["method"], route, status).observe(perf_counter() - start)
+
+
+# --- Logging ---
+
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extra fields and the trace id."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_FIELDS)
+        current = _current_span.get()
+        if current is not None:
+            entry.setdefault("trace_id", current.trace_id)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """
+    Root handler on stderr (JSON lines or plain text) at LOG_LEVEL; per-call
+    agent logs are DEBUG, so at the default INFO they cost a level check.
+    """
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    # httpx logs every request at INFO; keep that for DEBUG runs
+    logging.getLogger("httpx").setLevel(logging.NOTSET if root.level <= logging.DEBUG else logging.WARNING)
+    if not any(getattr(handler, "_equinox", False) for handler in root.handlers):
+        handler = logging.StreamHandler(sys.stderr)
+        handler._equinox = True
+        root.addHandler(handler)
+    for handler in root.handlers:
+        if getattr(handler, "_equinox", False):
+            handler.setFormatter(
+                JsonFormatter() if fmt == "json" else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+            )
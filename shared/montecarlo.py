@@ -0,0 +1,171 @@
+"""
+Monte Carlo wealth projection.
+
+Simulates N paths x Y years of investment returns, inflation, FX moves on
+local-currency expenses and one-off expense shocks, all as NumPy array
+operations, and summarizes the wealth distribution as percentile bands.
+
+For fixed random draws, wealth is linear in the inputs:
+
+    wealth[path, year] = initial_wealth * A + annual_net_income * B - annual_expenses * C
+
+where A is the compounded return, B the compounded inflation-indexed
+income stream and C the compounded expense stream (FX and shocks
+included). The draws only depend on the config, so A, B and C are
+simulated once per config and cached; each projection is then three
+multiply-adds and the percentiles, cheap enough for every slider tick.
+An income on its own (no starting wealth or expenses) is a scaled copy of
+one cached unit-income run, see simulate_income.
+
+Paths advance one year at a time: each year's draws update a per-path
+state (compounded factors, price level, FX) and the year's wealth is
+reduced to its percentiles, mean and loss share before the next year is
+drawn, so memory grows with paths, never with paths x years. Draws are
+made `chunk_size` paths at a time. Configs above FACTOR_CACHE_CELLS paths
+x years are not cached and regenerate their factors on every call. Each
+random factor has its own generator spawned from the seed, so results
+depend only on the seed, never on the chunk size.
+"""
+
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .projection import INVESTMENT_RETURN, PROJECTION_YEARS
+
+
+@dataclass(frozen=True)
+class MonteCarloConfig:
+    paths: int = 10_000
+    years: int = PROJECTION_YEARS
+    mean_return: float = INVESTMENT_RETURN
+    return_volatility: float = 0.12
+    mean_inflation: float = 0.025
+    inflation_volatility: float = 0.01
+    fx_volatility: float = 0.08  # yearly log-move of the expense currency vs income currency
+    shock_probability: float = 0.05  # chance per year of a one-off expense shock
+    shock_size: float = 0.25  # shock as a fraction of that year's expenses
+    percentiles: Sequence[float] = field(default=(5, 25, 50, 75, 95))
+    seed: Optional[int] = 42
+    chunk_size: int = 10_000
+
+
+DEFAULT_CONFIG = MonteCarloConfig()
+
+# Largest paths x years whose factors are kept in memory (3 float64 each)
+FACTOR_CACHE_CELLS = 2_000_000
+
+
+def _factor_years(config: MonteCarloConfig) -> Iterator[np.ndarray]:
+    """
+    Factors A, B, C for every path, one year at a time: shape (3, paths)
+    per year. The array is updated in place when the next year is drawn.
+    """
+    returns_rng, inflation_rng, fx_rng, shock_rng = [
+        np.random.default_rng(seed) for seed in np.random.SeedSequence(config.seed).spawn(4)
+    ]
+    compounded = np.zeros((3, config.paths))
+    compounded[0] = 1.0
+    price_level = np.ones(config.paths)
+    fx_log = np.zeros(config.paths)
+    for _ in range(config.years):
+        for start in range(0, config.paths, config.chunk_size):
+            rows = slice(start, min(start + config.chunk_size, config.paths))
+            paths = rows.stop - rows.start
+            returns = returns_rng.normal(config.mean_return, config.return_volatility, paths)
+            inflation = inflation_rng.normal(config.mean_inflation, config.inflation_volatility, paths)
+            fx_log[rows] += fx_rng.normal(0.0, config.fx_volatility, paths)
+            shocks = shock_rng.random(paths) < config.shock_probability
+
+            # Income and expenses both track inflation; expenses also move with FX
+            price_level[rows] *= 1.0 + inflation
+            expense_level = price_level[rows] * np.exp(fx_log[rows]) * (1.0 + config.shock_size * shocks)
+
+            compounded[:, rows] *= 1.0 + returns
+            compounded[1, rows] += price_level[rows]
+            compounded[2, rows] += expense_level
+        yield compounded
+
+
+@lru_cache(maxsize=8)
+def _cached_factors(config: MonteCarloConfig) -> np.ndarray:
+    """Every year's factors: shape (years, 3, paths)."""
+    factors = np.stack([year.copy() for year in _factor_years(config)])
+    factors.flags.writeable = False
+    return factors
+
+
+def _percentiles(values: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    """np.percentile's linear interpolation, via a full sort (faster than selection here)."""
+    ordered = np.sort(values)
+    positions = np.asarray(percentiles, dtype=np.float64) / 100 * (len(ordered) - 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, len(ordered) - 1)
+    fraction = positions - lower
+    return ordered[lower] * (1 - fraction) + ordered[upper] * fraction
+
+
+def simulate_wealth(initial_wealth: float, annual_net_income: float, annual_expenses: float,
+                    config: MonteCarloConfig = DEFAULT_CONFIG) -> Dict[str, Any]:
+    """
+    Project wealth over config.years for config.paths random paths.
+    Returns percentile bands and the mean per year, plus the share of
+    paths that end below the starting wealth.
+    """
+    if config.paths * config.years <= FACTOR_CACHE_CELLS:
+        years = _cached_factors(config)
+    else:
+        years = _factor_years(config)
+
+    # Each year is reduced as soon as its wealth is known; only one row of paths is alive
+    bands = np.empty((len(config.percentiles), config.years))
+    mean = []
+    for year, factors in enumerate(years):
+        wealth = initial_wealth * factors[0] + annual_net_income * factors[1] - annual_expenses * factors[2]
+        bands[:, year] = _percentiles(wealth, config.percentiles)
+        mean.append(float(wealth.mean()))
+
+    return {
+        "paths": config.paths,
+        "years": config.years,
+        "seed": config.seed,
+        "percentiles": {
+            f"p{percentile:g}": band.astype(float).tolist()
+            for percentile, band in zip(config.percentiles, bands)
+        },
+        "mean": mean,
+        # wealth holds the final year
+        "probability_of_loss": float((wealth < initial_wealth).mean())
+    }
+
+
+@lru_cache(maxsize=8)
+def _unit_income(config: MonteCarloConfig) -> Dict[str, Any]:
+    return simulate_wealth(0.0, 1.0, 0.0, config)
+
+
+def simulate_income(annual_net_income: float, config: MonteCarloConfig = DEFAULT_CONFIG) -> Dict[str, Any]:
+    """
+    simulate_wealth for an income alone, without starting wealth or
+    expenses. Wealth is then annual_net_income x B on every path, so the
+    result is one cached unit-income run scaled; a negative income swaps
+    each percentile for its mirror.
+    """
+    if annual_net_income < 0:
+        unit = _unit_income(replace(config, percentiles=tuple(100 - percentile for percentile in config.percentiles)))
+        probability_of_loss = 1.0 - unit["probability_of_loss"]
+    else:
+        unit = _unit_income(config)
+        probability_of_loss = unit["probability_of_loss"] if annual_net_income > 0 else 0.0
+    bands = unit["percentiles"].values()
+    return {
+        **unit,
+        "percentiles": {
+            f"p{percentile:g}": [annual_net_income * value for value in band]
+            for percentile, band in zip(config.percentiles, bands)
+        },
+        "mean": [annual_net_income * value for value in unit["mean"]],
+        "probability_of_loss": probability_of_loss
+    }
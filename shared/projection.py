@@ -0,0 +1,34 @@
+"""
+Deterministic wealth projection shared by the vectorized endpoints, the
+backend's Nexus and the Monte Carlo model: each year the current wealth
+earns the expected investment return and the year's savings are added on
+top.
+"""
+
+from typing import List
+
+import numpy as np
+
+PROJECTION_YEARS = 5
+INVESTMENT_RETURN = 0.05  # 5% expected investment return
+
+
+def project_wealth(current_wealth: float, savings: float, years: int = PROJECTION_YEARS) -> List[float]:
+    """
+    Expected end-of-year wealth for each of the next `years` years.
+    """
+    projection = []
+    for _ in range(years):
+        current_wealth = current_wealth * (1 + INVESTMENT_RETURN) + savings
+        projection.append(current_wealth)
+    return projection
+
+
+def project_wealth_batch(current_wealth: float, savings: np.ndarray, years: int = PROJECTION_YEARS) -> np.ndarray:
+    """
+    Vectorized project_wealth for many cities at once.
+    Returns a (cities, years) array of end-of-year wealth.
+    """
+    growth = (1 + INVESTMENT_RETURN) ** np.arange(1, years + 1, dtype=np.float64)
+    # Closed form of the yearly recursion: compounded wealth + annuity of savings
+    return current_wealth * growth + np.outer(savings, (growth - 1) / INVESTMENT_RETURN)